@@ -1,17 +1,34 @@
 # make it available at the package level
 
-from .flow_control.card import Card
+from .flow_control.card import Card, CardSet, CARDS
 from .flow_control.deck import Deck
 from .flow_control.player import Player
+from .flow_control.event_log import EventLog, HandHistory
 from .flow_control.handplayed import HandPlayed
 from .flow_control.hdplayed import HdPlayed
 from .flow_control.headsupgame import HeadsUpGame
 from .flow_control.hugame import HuGame
+from .flow_control.vecgame import VecHuGame
 
 from .hand_evaluation.hand import Hand, \
-    compare_two_hands, tie_breaking, evaluate_hand_ranking
+    compare_two_hands, tie_breaking, evaluate_hand_ranking, showdown
+from .hand_evaluation.evaluator import evaluate_cards, \
+    evaluate_card_ids, evaluate_keys, strength_to_ranking, evaluate_batch, \
+    compare_batch
+from .hand_evaluation.isomorphism import canonical_form, hand_index, \
+    hand_from_index, flop_index, flop_from_index, preflop_class
+from .hand_evaluation.preflop import load_preflop_equity_matrix, \
+    preflop_equity, preflop_win_rate, preflop_class_win_rate
+from .hand_evaluation.equity_cache import EquityCache
+from .hand_evaluation.range_equity import range_vs_range_equity
+from .hand_evaluation.river_index import RiverIndex, get_river_index
+from .hand_evaluation.flop_equity import load_flop_equity_table, \
+    flop_win_rate
+from .hand_evaluation.buckets import bucket_id
+from .hand_evaluation.draws import analyze_draws, get_draws
 from .hand_evaluation.hand_potential import estimate_win_rate, \
-    monte_carlo_simulation
+    estimate_win_rate_adaptive, monte_carlo_simulation, enumerate_outcomes, \
+    hand_potential, effective_hand_strength
 
 from .opponents.randomplayer import RandomPlayer
 from .opponents.humanplayer import HumanPlayer
@@ -1,6 +1,5 @@
 
 import logging
-import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use('Agg')
@@ -17,7 +16,7 @@ from ..opponents.humanplayer import HumanPlayer
 from ..opponents.randomplayer import RandomPlayer
 from ..opponents.fixedpolicyplayer import StartingHandPlayer, \
     StrengthHandPlayer, FishPlayer
-from ..globals import MODELS_DIR
+from ..globals import MODELS_DIR, ACTIONS, ACTION_IDS, ACTIONS_BY_MASK
 
 logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
                     level=logging.DEBUG)
@@ -55,36 +54,58 @@ def pickle_memory(agent):
     outfile.close()
 
 
-def rescale_reward(reward_to_scale, starting_stack):
+def translate_action(possible_actions, action):
     """
-    Rescale state by using min-max normalization
+    Translate the numerical action of the agent into an action of the game
 
-    Args: reward_to_scale (int)
+    Args:
+        possible_actions (list): set of str action the agent can choose from
+        action (int): 0 to check or call, 1 to bet or raise, 2 to fold, or
+        check when it is free
 
-    Returns: scaled_reward (float) - belongs to [-1, 1] interval
+    Returns:
+        (int): code of the action in ACTIONS
     """
-    return reward_to_scale / starting_stack
+    if action == 0:
+        if 'check' in possible_actions:
+            str_action = 'check'
+        elif 'call' in possible_actions:
+            str_action = 'call'
+        else:
+            str_action = 'all-in'
+    elif action == 1:
+        if 'bet' in possible_actions:
+            str_action = 'bet'
+        elif 'raise' in possible_actions:
+            str_action = 'raise'
+        elif 'all-in' in possible_actions:
+            str_action = 'all-in'
+        else:
+            str_action = 'call'
+    else:
+        if 'check' in possible_actions:
+            str_action = 'check'
+        else:
+            str_action = 'fold'
+    return ACTION_IDS[str_action]
+
+
+# code of the action applied for each numerical action of the agent, for each
+# legal-action bitmask of the game
+AGENT_ACTION_CODES = tuple(tuple(translate_action(possible_actions, action)
+                                 for action in range(3))
+                           for possible_actions in ACTIONS_BY_MASK)
 
 
-def rescale_state(state_to_scale, starting_stack):
+def rescale_reward(reward_to_scale, starting_stack):
     """
     Rescale state by using min-max normalization
 
-    Args: state_to_scale (array)
+    Args: reward_to_scale (int)
 
-    Returns: scaled_state (list)
+    Returns: scaled_reward (float) - belongs to [-1, 1] interval
     """
-    scaled_state = state_to_scale.copy()
-    # stacks and pot size
-    for i in [0, 1, -1]:
-        scaled_state[i] = (state_to_scale[i] - 0) / (starting_stack * 2 - 0)
-    # cards
-    for k in range(3, 10):
-        scaled_state[k] = (state_to_scale[k] - 0) / (52 - 0)
-    # action sequences
-    for j in range(10, 14):
-        scaled_state[j] = (state_to_scale[j] - 0) / (24 - 0)
-    return scaled_state
+    return reward_to_scale / starting_stack
 
 
 def run_hands(nb_episodes=500, starting_stack=1000, big_blind=20,
@@ -129,7 +150,8 @@ def run_hands(nb_episodes=500, starting_stack=1000, big_blind=20,
                    big_blind,
                    is_fixed_limit,
                    Deck().deal_cards(9),
-                   0)
+                   0,
+                   explain_showdown=False)
 
     # total reward for episode
     total_reward = 0
@@ -167,10 +189,8 @@ def run_hands(nb_episodes=500, starting_stack=1000, big_blind=20,
             # TODO: is it the right thing to do?
             while hand_over:
                 state, hand_over = env.initial_step()
-        # rescale state - pre-processing stage
-        state = rescale_state(state, starting_stack)
-        # reshape state into something ANN understands
-        state = np.reshape(np.array(state), [15])
+        # copy the normalized state, updated in place by the environment
+        state = state.copy()
 
         while not env.game_over:
 
@@ -183,43 +203,20 @@ def run_hands(nb_episodes=500, starting_stack=1000, big_blind=20,
                 first_action_type_list.append(action)
                 waiting_for_first_action = False
 
-            # translate numerical action into str action
-            possible_actions = env.current_hand.possible_actions
-            logging.debug("possible actions: {}".format(possible_actions))
-            if action == 0:
-                if 'check' in possible_actions:
-                    str_action = 'check'
-                elif 'call' in possible_actions:
-                    str_action = 'call'
-                else:
-                    str_action = 'all-in'
-            elif action == 1:
-                if 'bet' in possible_actions:
-                    str_action = 'bet'
-                elif 'raise' in possible_actions:
-                    str_action = 'raise'
-                elif 'all-in' in possible_actions:
-                    str_action = 'all-in'
-                else:
-                    str_action = 'call'
-            else:
-                if 'check' in possible_actions:
-                    str_action = 'check'
-                else:
-                    str_action = 'fold'
-            logging.debug("action applied: {}".format(str_action))
+            # translate numerical action into the code of an action
+            action_code = AGENT_ACTION_CODES[
+                env.current_hand.legal_actions][action]
+            logging.debug("action applied: %s", ACTIONS[action_code])
 
             # apply action into environment and observe feedback
             next_state, reward, game_done, hand_over, info = \
-                env.step(str_action)
+                env.step(action_code)
 
-            # rescale state and reward - pre-processing stage
-            next_state = rescale_state(next_state, starting_stack)
+            # copy the normalized state, updated in place by the environment,
+            # and rescale reward - pre-processing stage
+            next_state = next_state.copy()
             reward = rescale_reward(reward, starting_stack)
 
-            # reshape state into something ANN understands
-            next_state = np.reshape(np.array(next_state), [15])
-
             # add sequence to memory
             if agent_cls == DQNAgent:
                 agent.remember(state, action, reward, next_state, hand_over)
@@ -274,10 +271,9 @@ def run_hands(nb_episodes=500, starting_stack=1000, big_blind=20,
                         first_action_type_list)
 
                     break
-                # rescale state - pre-processing stage
-                state = rescale_state(state, starting_stack)
-                # reshape state into something ANN understands
-                state = np.reshape(np.array(state), [15])
+                # copy the normalized state, updated in place by the
+                # environment
+                state = state.copy()
                 # reinitialize variable
                 waiting_for_first_action = True
                 # recurrent agent specific tasks
@@ -354,7 +350,8 @@ def run_games(nb_episodes=500, starting_stack=1000, big_blind=20,
                                     type(opponent).__name__)))
 
     # create the environment
-    env = HuGame(max_nb_hands, big_blind, agent, opponent, is_fixed_limit)
+    env = HuGame(max_nb_hands, big_blind, agent, opponent, is_fixed_limit,
+                 explain_showdown=False)
 
     # total reward for episode
     total_reward = 0
@@ -395,10 +392,8 @@ def run_games(nb_episodes=500, starting_stack=1000, big_blind=20,
             # TODO: is it the right thing to do?
             while hand_over:
                 state, hand_over = env.initial_step()
-        # rescale state - pre-processing stage
-        state = rescale_state(state, starting_stack)
-        # reshape state into something ANN understands
-        state = np.reshape(np.array(state), [15])
+        # copy the normalized state, updated in place by the environment
+        state = state.copy()
 
         while not env.game_over:
 
@@ -411,43 +406,20 @@ def run_games(nb_episodes=500, starting_stack=1000, big_blind=20,
                 first_action_type_list.append(action)
                 waiting_for_first_action = False
 
-            # translate numerical action into str action
-            possible_actions = env.current_hand.possible_actions
-            logging.debug("possible actions: {}".format(possible_actions))
-            if action == 0:
-                if 'check' in possible_actions:
-                    str_action = 'check'
-                elif 'call' in possible_actions:
-                    str_action = 'call'
-                else:
-                    str_action = 'all-in'
-            elif action == 1:
-                if 'bet' in possible_actions:
-                    str_action = 'bet'
-                elif 'raise' in possible_actions:
-                    str_action = 'raise'
-                elif 'all-in' in possible_actions:
-                    str_action = 'all-in'
-                else:
-                    str_action = 'call'
-            else:
-                if 'check' in possible_actions:
-                    str_action = 'check'
-                else:
-                    str_action = 'fold'
-            logging.debug("action applied: {}".format(str_action))
+            # translate numerical action into the code of an action
+            action_code = AGENT_ACTION_CODES[
+                env.current_hand.legal_actions][action]
+            logging.debug("action applied: %s", ACTIONS[action_code])
 
             # apply action into environment and observe feedback
             next_state, reward, game_done, hand_over, info = \
-                env.step(str_action)
+                env.step(action_code)
 
-            # rescale state and reward - pre-processing stage
-            next_state = rescale_state(next_state, starting_stack)
+            # copy the normalized state, updated in place by the environment,
+            # and rescale reward - pre-processing stage
+            next_state = next_state.copy()
             reward = rescale_reward(reward, starting_stack)
 
-            # reshape state into something ANN understands
-            next_state = np.reshape(np.array(next_state), [15])
-
             # add sequence to memory
             if agent_cls == DQNAgent:
                 agent.remember(state, action, reward, next_state, hand_over)
@@ -502,10 +474,9 @@ def run_games(nb_episodes=500, starting_stack=1000, big_blind=20,
                         first_action_type_list)
 
                     break
-                # rescale state - pre-processing stage
-                state = rescale_state(state, starting_stack)
-                # reshape state into something ANN understands
-                state = np.reshape(np.array(state), [15])
+                # copy the normalized state, updated in place by the
+                # environment
+                state = state.copy()
                 # reinitialize variable
                 waiting_for_first_action = True
                 # recurrent agent specific tasks
@@ -46,9 +46,15 @@ def prettify_suit(suit_str):
         return PRETTY_SUIT_DICT[suit_str]
 
 
+# cards created so far, keyed by (rank, suit)
+_INTERNED_CARDS = {}
+
+
 class Card(object):
     """
     Instantiating the object returns a card object from a 52-card deck
+    Cards are interned: Card(14, "C") always returns the same object, so
+    that cards can be compared and hashed by identity
 
     Attributes:
         rank (int): rank of the card from 2 to 14
@@ -56,19 +62,34 @@ class Card(object):
         pretty_rank (str): rank in prettified str format for face cards
         pretty_suit (str): suit in prettified symbol
         numerical_id (int): unique numerical id for the card, [1-52]
+        id (int): unique integer id for the card, [0-51]
+        mask (int): bit of the card in a 64-bit CardSet mask, 1 << id
     """
+    __slots__ = ('rank', 'suit', 'pretty_rank', 'pretty_suit',
+                 'numerical_id', 'id', 'mask')
 
-    def __init__(self, numeric_rank, suit):
+    def __new__(cls, numeric_rank, suit):
         """
         Instantiating the object using a numeric rank and a one letter suit
         e.g. Card(14,"C")
         """
-        self.rank = numeric_rank
-        self.suit = suit
-        self.pretty_rank = prettify_rank(self.rank)
-        self.pretty_suit = prettify_suit(self.suit)
-        self.numerical_id = 4 * (self.rank - 2) + NUMERICAL_SUIT_DICT[
-            self.suit]
+        card = _INTERNED_CARDS.get((numeric_rank, suit))
+        if card is None:
+            card = super(Card, cls).__new__(cls)
+            card.rank = numeric_rank
+            card.suit = suit
+            card.pretty_rank = prettify_rank(card.rank)
+            card.pretty_suit = prettify_suit(card.suit)
+            card.numerical_id = 4 * (card.rank - 2) + NUMERICAL_SUIT_DICT[
+                card.suit]
+            card.id = card.numerical_id - 1
+            card.mask = 1 << card.id
+            _INTERNED_CARDS[(numeric_rank, suit)] = card
+        return card
+
+    def __reduce__(self):
+        # unpickling goes through __new__ and gets the interned card back
+        return Card, (self.rank, self.suit)
 
     def __str__(self):
         return str(self.rank) + self.suit
@@ -76,5 +97,86 @@ class Card(object):
     def __repr__(self):
         return self.pretty_rank + self.pretty_suit
 
+
+class CardSet(object):
+    """
+    Set of cards stored as a 64-bit mask, bit i being set if the card with
+    id i belongs to the set. Membership, addition and removal are O(1).
+    Used for hands, boards and dead cards.
+
+    Attributes:
+        mask (int): bitmask of the cards in the set
+    """
+    __slots__ = ('mask',)
+
+    def __init__(self, cards=None, mask=0):
+        """
+        Instantiate a set from an iterable of Card objects, or a mask
+        e.g. CardSet([Card(14,"C"),Card(13,"C")])
+        """
+        self.mask = mask
+        if cards is not None:
+            for card in cards:
+                self.mask |= card.mask
+
+    @classmethod
+    def full(cls):
+        """ Returns the set of the 52 cards of a deck """
+        return cls(mask=FULL_DECK_MASK)
+
+    def add(self, card):
+        """ Add a Card object to the set """
+        self.mask |= card.mask
+
+    def remove(self, card):
+        """ Remove a Card object from the set, if present """
+        self.mask &= ~card.mask
+
+    def ids(self):
+        """ Returns the list of card ids in the set, in increasing order """
+        mask = self.mask
+        card_ids = []
+        while mask:
+            low_bit = mask & -mask
+            card_ids.append(low_bit.bit_length() - 1)
+            mask ^= low_bit
+        return card_ids
+
+    def cards(self):
+        """ Returns the list of Card objects in the set """
+        return [CARDS[card_id] for card_id in self.ids()]
+
+    def __contains__(self, card):
+        return bool(self.mask & card.mask)
+
+    def __iter__(self):
+        return iter(self.cards())
+
+    def __len__(self):
+        return bin(self.mask).count('1')
+
+    def __or__(self, other):
+        return CardSet(mask=self.mask | other.mask)
+
+    def __and__(self, other):
+        return CardSet(mask=self.mask & other.mask)
+
+    def __sub__(self, other):
+        return CardSet(mask=self.mask & ~other.mask)
+
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        return isinstance(other, CardSet) and self.mask == other.mask
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __repr__(self):
+        return repr(self.cards())
+
+
+# the 52 canonical cards, indexed by card id
+CARDS = tuple(Card(numeric_rank, suit)
+              for numeric_rank in range(2, 15)
+              for suit in sorted(NUMERICAL_SUIT_DICT,
+                                 key=NUMERICAL_SUIT_DICT.get))
+FULL_DECK_MASK = (1 << 52) - 1
@@ -2,7 +2,7 @@
 import random
 import logging
 
-from .card import Card
+from .card import CARDS, CardSet
 
 logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
                     level=logging.INFO)
@@ -22,10 +22,8 @@ class Deck(object):
         Instantiating the object does not need any argument
         It creates all the cards needed in a 52-card deck
         """
-        # initialize deck
-        self.cards = [Card(numeric_rank, suit)
-                      for numeric_rank in range(2, 15)
-                      for suit in ['S', 'C', 'D', 'H']]
+        # initialize deck from the interned cards
+        self.cards = list(CARDS)
 
     def deal_cards(self, number_cards):
         """
@@ -50,9 +48,10 @@ class Deck(object):
         Returns possible remaining cards in deck based on list of visible one
 
         Args:
-            list_of_cards (list): list of Card objects
+            list_of_cards (list): list of Card objects, or a CardSet
 
         Returns:
             list: list containing remaining cards, as Card objects
         """
-        return [card for card in self.cards if card not in list_of_cards]
+        dead_mask = CardSet(list_of_cards).mask
+        return [card for card in self.cards if not card.mask & dead_mask]
@@ -0,0 +1,343 @@
+import logging
+import numpy as np
+
+from .card import CARDS
+from ..hand_evaluation.hand import Hand
+from ..hand_evaluation.isomorphism import preflop_class
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+# events a hand is made of, in the order of their integer codes, all-in
+# variants being told apart as they read differently
+EVENTS = ('fold', 'check', 'call', 'bet', 'raise', 'bet all-in',
+          'raise all-in', 'call all-in', 'flop', 'turn', 'river', 'showdown',
+          'win', 'split')
+EVENT_IDS = {event: code for code, event in enumerate(EVENTS)}
+
+# text of player events, formatted with the name of the player and the
+# amount of the event
+EVENT_FORMATS = ("{} folds\n",
+                 "{} checks\n",
+                 "{} calls\n",
+                 "{} bets {}\n",
+                 "{} raises {}\n",
+                 "{} bets {}, and is all-in\n",
+                 "{} raises {}, and is all-in\n",
+                 "{} calls {}, and is all-in\n")
+
+STAGES = ('pre-flop', 'flop', 'turn', 'river', 'showdown')
+POSITIONS = ('Big Blind', 'Small Blind')
+
+# number of events a log holds before growing, enough for any fixed-limit
+# hand
+MAX_EVENTS = 64
+
+# number of board cards seen on each street
+_NB_BOARD_CARDS = (0, 3, 4, 5, 5)
+
+
+class EventLog(object):
+    """
+    Compact log of a hand, recorded on the hot path as integer codes in
+    preallocated arrays, one row per event. Human-readable and json hand
+    histories are rendered from it on demand, so that hands nobody reads
+    never pay for string formatting.
+
+    Seats are 0 for the big blind and 1 for the small blind, -1 for events
+    of no player, e.g. dealing the flop.
+
+    Attributes:
+        hand_number (int): number of the hand
+        is_fixed_limit (bool): fixed limit game if True, no-limit if False
+        big_blind (int): initial compulsory stake
+        small_blind (int): second initial compulsory stake
+        names (tuple): names of the big blind and small blind players
+        stacks (tuple): stacks of the big blind and small blind players
+        before posting the blinds
+        card_ids (list): ids of the nine cards dealt, hole cards of the big
+        blind then of the small blind, flop, turn and river
+        explain_showdown (bool): whether rendered histories detail the best
+        combination of each player at showdown
+        street (int): index of the current stage in STAGES
+        nb_events (int): number of events recorded
+        streets (np.ndarray): stage of each event
+        seats (np.ndarray): seat of the player of each event
+        codes (np.ndarray): code of each event in EVENTS
+        amounts (np.ndarray): amount of each event, 0 if none
+        json_hists (list): json hand history of each seat as last rendered,
+        None if not rendered yet during the hand
+        nb_rendered (list): number of events each json hand history covers
+    """
+
+    def __init__(self, capacity=MAX_EVENTS):
+        """
+        Instantiate an empty log, to be started for each hand
+        e.g. EventLog()
+        """
+        self.hand_number = 0
+        self.is_fixed_limit = True
+        self.big_blind = 0
+        self.small_blind = 0
+        self.names = ('', '')
+        self.stacks = (0, 0)
+        self.card_ids = []
+        self.explain_showdown = True
+        self.street = 0
+        self.nb_events = 0
+        self.streets = np.zeros(capacity, dtype=np.int8)
+        self.seats = np.zeros(capacity, dtype=np.int8)
+        self.codes = np.zeros(capacity, dtype=np.int8)
+        self.amounts = np.zeros(capacity, dtype=np.int64)
+        self.json_hists = [None, None]
+        self.nb_rendered = [0, 0]
+
+    def start(self, hand_number, is_fixed_limit, big_blind, small_blind,
+              names, stacks, cards, explain_showdown=True):
+        """
+        Clear the log for a new hand, keeping its arrays
+
+        Args:
+            hand_number (int): number of the hand
+            is_fixed_limit (bool): fixed limit game if True, no-limit if False
+            big_blind (int): initial compulsory stake
+            small_blind (int): second initial compulsory stake
+            names (tuple): names of the big blind and small blind players
+            stacks (tuple): stacks of the big blind and small blind players
+            cards (list): the nine Card objects dealt, in the order of
+            card_ids
+            explain_showdown (bool): whether rendered histories detail the
+            best combination of each player at showdown
+        """
+        self.hand_number = hand_number
+        self.is_fixed_limit = is_fixed_limit
+        self.big_blind = big_blind
+        self.small_blind = small_blind
+        self.names = tuple(names)
+        self.stacks = tuple(stacks)
+        self.card_ids = [card.id for card in cards]
+        self.explain_showdown = explain_showdown
+        self.street = 0
+        self.nb_events = 0
+        self.json_hists = [None, None]
+        self.nb_rendered = [0, 0]
+
+    def record(self, event, seat=-1, amount=0):
+        """
+        Append an event to the log, dealing events moving it to the next
+        stage
+
+        Args:
+            event (str): event among EVENTS
+            seat (int): seat of the player of the event, -1 if none
+            amount (int): amount of the event, 0 if none
+        """
+        code = EVENT_IDS[event]
+        if code in (8, 9, 10, 11):
+            # flop, turn, river and showdown
+            self.street = code - 7
+        if self.nb_events == len(self.codes):
+            self._grow()
+        self.streets[self.nb_events] = self.street
+        self.seats[self.nb_events] = seat
+        self.codes[self.nb_events] = code
+        self.amounts[self.nb_events] = amount
+        self.nb_events += 1
+
+    def _grow(self):
+        """ Double the capacity of the log, for long no-limit hands """
+        capacity = 2 * len(self.codes)
+        for name in ('streets', 'seats', 'codes', 'amounts'):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def copy(self):
+        """
+        Returns:
+            (class.EventLog): independent copy of the log, trimmed to its
+            events
+        """
+        log = EventLog(capacity=max(self.nb_events, 1))
+        log.start(self.hand_number, self.is_fixed_limit, self.big_blind,
+                  self.small_blind, self.names, self.stacks, [],
+                  self.explain_showdown)
+        log.card_ids = list(self.card_ids)
+        log.street = self.street
+        log.nb_events = self.nb_events
+        for name in ('streets', 'seats', 'codes', 'amounts'):
+            getattr(log, name)[:self.nb_events] = \
+                getattr(self, name)[:self.nb_events]
+        return log
+
+    def events(self, start=0):
+        """
+        Args:
+            start (int): index of the first event, default 0
+
+        Returns:
+            (list): (stage, seat, event, amount) tuple of each event from
+            start on
+        """
+        return [(STAGES[street], seat, EVENTS[code], amount)
+                for street, seat, code, amount in zip(
+                    self.streets[start:self.nb_events].tolist(),
+                    self.seats[start:self.nb_events].tolist(),
+                    self.codes[start:self.nb_events].tolist(),
+                    self.amounts[start:self.nb_events].tolist())]
+
+    def hole_cards(self, seat):
+        """ Hole cards of a seat, as Card objects """
+        return [CARDS[card_id]
+                for card_id in self.card_ids[2 * seat:2 * seat + 2]]
+
+    def board(self, street=None):
+        """ Board cards seen on a stage, the current one by default """
+        if street is None:
+            street = self.street
+        return [CARDS[card_id]
+                for card_id in self.card_ids[4:4 + _NB_BOARD_CARDS[street]]]
+
+    def _showdown_summary(self, pot_size):
+        """
+        Summary of the showdown, the five cards making each best combination
+        being only looked for when the showdown is explained
+        """
+        lines = ["***** Summary: \n"]
+        for seat in (0, 1):
+            hole_cards = self.hole_cards(seat)
+            if self.explain_showdown:
+                hand = Hand(hole_cards)
+                hand.add_public_cards(self.board(4))
+                lines.append("{} shows {}, best hand is {}, {}\n"
+                             .format(self.names[seat], hole_cards,
+                                     hand.best_combination,
+                                     hand.human_readable_rank()))
+            else:
+                lines.append("{} shows {}\n".format(self.names[seat],
+                                                    hole_cards))
+        lines.append("Pot size: {}\n".format(pot_size))
+        return "".join(lines)
+
+    def to_text(self, seat):
+        """
+        Render the human-readable hand history seen from a seat
+
+        Args:
+            seat (int): 0 for the big blind, 1 for the small blind
+
+        Returns:
+            (str): hand history
+        """
+        game_type = 'Fixed Limit Texas Hold-em' if self.is_fixed_limit \
+            else "No Limit Texas Hold-em"
+        lines = ["\n***** Hand #{} history\n".format(self.hand_number),
+                 "User: {}\n".format(self.names[seat]),
+                 "Position: {}\n".format(POSITIONS[seat]),
+                 "Game type: {}\n".format(game_type),
+                 "Stacks: {} ({}), {} ({})\n".format(
+                     self.names[0], self.stacks[0], self.names[1],
+                     self.stacks[1]),
+                 "{} posts small blind({}) {} posts big blind({})\n".format(
+                     self.names[1], self.small_blind, self.names[0],
+                     self.big_blind),
+                 "***** Dealing private cards to {}: {}\n".format(
+                     self.names[seat], self.hole_cards(seat))]
+        flop, turn, river = self.board(1), self.board(2)[3:], \
+            self.board(3)[4:]
+        for _, event_seat, event, amount in self.events():
+            if event == 'flop':
+                lines.append("***** Dealing flop: {}\n".format(flop))
+            elif event == 'turn':
+                lines.append("***** Dealing turn: {} - {}\n"
+                             .format(flop, turn))
+            elif event == 'river':
+                lines.append("***** Dealing river: {} - {} - {}\n"
+                             .format(flop, turn, river))
+            elif event == 'showdown':
+                lines.append(self._showdown_summary(amount))
+            elif event == 'win':
+                lines.append("{} wins the pot: +{}$\n"
+                             .format(self.names[event_seat], amount))
+            elif event == 'split':
+                lines.append("Splitting the pot\n")
+            else:
+                lines.append(EVENT_FORMATS[EVENT_IDS[event]].format(
+                    self.names[event_seat], amount))
+        return "".join(lines)
+
+    def to_json(self, seat):
+        """
+        Render the machine-readable hand history seen from a seat, as read
+        by players taking actions. The history of each seat is kept, and
+        only extended with the events recorded since it was last rendered,
+        so that asking for it before every decision does not render the
+        whole hand again.
+
+        Args:
+            seat (int): 0 for the big blind, 1 for the small blind
+
+        Returns:
+            (dict): hand history in json format, its pre flop info and
+            community cards being shared with later renders
+        """
+        json_hist = self.json_hists[seat]
+        if json_hist is None:
+            json_hist = {'position': {POSITIONS[seat]},
+                         'preflop': {'hole_cards': self.hole_cards(seat),
+                                     'class_id': preflop_class(
+                                         self.card_ids[2 * seat:
+                                                       2 * seat + 2])},
+                         'community_cards': self.board(),
+                         'actions': []}
+            self.json_hists[seat] = json_hist
+        if self.nb_rendered[seat] < self.nb_events:
+            json_hist['actions'].extend(
+                (stage, POSITIONS[event_seat], event, amount)
+                for stage, event_seat, event, amount
+                in self.events(self.nb_rendered[seat]) if event_seat >= 0)
+            json_hist['community_cards'] = self.board()
+            self.nb_rendered[seat] = self.nb_events
+        return {'position': {POSITIONS[seat]},
+                'preflop': json_hist['preflop'],
+                'community_cards': json_hist['community_cards'],
+                'actions': list(json_hist['actions'])}
+
+
+class HandHistory(object):
+    """
+    Hand history of a hand seen from one seat, rendered from the event log
+    of the hand only when read
+
+    Attributes:
+        event_log (class.EventLog): log of the hand
+        seat (int): 0 for the big blind, 1 for the small blind
+    """
+
+    def __init__(self, event_log, seat):
+        """
+        Instantiate a view on the log of a hand
+        e.g. HandHistory(EventLog(), 0)
+        """
+        self.event_log = event_log
+        self.seat = seat
+
+    def copy(self):
+        """
+        Returns:
+            (class.HandHistory): view on an independent copy of the log, to
+            be kept once the log is reused for the next hand
+        """
+        return HandHistory(self.event_log.copy(), self.seat)
+
+    def to_json(self):
+        """ Hand history in json format """
+        return self.event_log.to_json(self.seat)
+
+    def __str__(self):
+        """ Human-readable hand history """
+        return self.event_log.to_text(self.seat)
+
+    def __repr__(self):
+        return self.__str__()
@@ -2,7 +2,8 @@
 import logging
 from itertools import cycle
 
-from ..hand_evaluation.hand import Hand, compare_two_hands
+from .event_log import EventLog
+from ..hand_evaluation.hand import Hand, showdown
 from ..opponents.humanplayer import HumanPlayer
 from ..globals import SEQUENCE_ACTIONS_ID
 
@@ -28,70 +29,50 @@ class HandPlayed(object):
         flop (list): list of communal cards coming on the flop
         turn (list): list containing communal card coming on the turn
         river (list): list containing communal card coming on the river
-        hand_history_BB (str): hand history object seen from BB player
-        hand_history_SB (str): hand history object seen from SB player
-        json_hand_hist_BB (dict): hand history in json format
-        json_hand_hist_SB (dict): hand history in json format
+        event_log (class.EventLog): log of the hand, from which hand
+        histories are rendered on demand
+        hand_history_BB (str): hand history seen from BB player, rendered
+        when read
+        hand_history_SB (str): hand history seen from SB player, rendered
+        when read
+        json_hand_hist_BB (dict): hand history in json format, rendered
+        when read
+        json_hand_hist_SB (dict): hand history in json format, rendered
+        when read
         state_SB (array): state of the environment as seen from SB player
         state_BB (array): state of the environment as seen from BB player
         hand_number (int): index to keep track of number of the hand played
+        explain_showdown (bool): whether hand histories detail the best
+        combination of each player at showdown
     """
 
-    def _initialize_hand_history(self, player):
+    def _initialize_state(self, player):
         """
-        Initialize hand history for a given player
+        Initialize state of the environment for a given player
 
         Args:
             player (subclass.Player): class object Player
 
         Returns:
-            str_out (str): human readable hand history
-            json_out (dict): machine readable hand history
             state_out (array): state of the environment in numerical format
         """
         # check what position the player is in
         if player == self.playerBB:
             stack = self.playerBB.stack
             opponent_stack = self.playerSB.stack
-            position = "Big Blind"
+            position = 1
             private_cards = self.handBB.private_cards
-            simp_rep = self.handBB.get_simp_preflop_rep()
         else:
             stack = self.playerSB.stack
             opponent_stack = self.playerBB.stack
-            position = "Small Blind"
+            position = 0
             private_cards = self.handSB.private_cards
-            simp_rep = self.handSB.get_simp_preflop_rep()
-
-        if self.is_fixed_limit:
-            game_type = 'Fixed Limit Texas Hold-em'
-        else:
-            game_type = "No Limit Texas Hold-em"
-
-        str_out = "\n***** Hand #{} history\n".format(self.hand_nb) \
-                  + "User: {}\n".format(player.name) \
-                  + "Position: {}\n".format(position) \
-                  + "Game type: {}\n".format(game_type) \
-                  + "Stacks: {} ({}), {} ({})\n".format(self.playerBB.name,
-                                                        self.playerBB.stack,
-                                                        self.playerSB.name,
-                                                        self.playerSB.stack) \
-                  + "{} posts small blind({}) {} posts big " \
-                    "blind({})\n".format(self.playerSB.name, self.small_blind,
-                                         self.playerBB.name, self.big_blind) \
-                  + "***** Dealing private cards " \
-                    "to {}: {}\n".format(player.name, private_cards)
-
-        json_out = {'position': {position},
-                    'preflop': {'hole_cards': private_cards,
-                                'simp_rep': simp_rep},
-                    'community_cards': []}
 
         # STACKS - POSITION - CARDS, private&common - ACTION seq.- POT SIZE
         state_out = [
             stack,
             opponent_stack,
-            0 if position == 'Small Blind' else 1,
+            position,
             private_cards[0].numerical_id,
             private_cards[1].numerical_id,
             0,
@@ -105,14 +86,30 @@ class HandPlayed(object):
             0,
             self.pot_size]
 
-        return str_out, json_out, state_out
+        return state_out
+
+    @property
+    def hand_history_BB(self):
+        """ Human-readable hand history seen from BB player """
+        return self.event_log.to_text(0)
+
+    @property
+    def hand_history_SB(self):
+        """ Human-readable hand history seen from SB player """
+        return self.event_log.to_text(1)
 
-    def update_hand_histories(self, text):
-        self.hand_history_BB += text
-        self.hand_history_SB += text
+    @property
+    def json_hand_hist_BB(self):
+        """ Hand history in json format seen from BB player """
+        return self.event_log.to_json(0)
+
+    @property
+    def json_hand_hist_SB(self):
+        """ Hand history in json format seen from SB player """
+        return self.event_log.to_json(1)
 
     def __init__(self, player1, player2, big_blind,
-                 is_fixed_limit, cards, hand_number):
+                 is_fixed_limit, cards, hand_number, explain_showdown=True):
         """
         Instantiate a hand played object based on players, parameters,
         and list of 9 randomly drawn cards
@@ -124,6 +121,7 @@ class HandPlayed(object):
         self.big_blind = big_blind
         self.is_fixed_limit = is_fixed_limit
         self.hand_nb = hand_number
+        self.explain_showdown = explain_showdown
         self.pot_size = 0
         self.small_blind = int(big_blind / 2)
         self.handBB = Hand([cards[0], cards[1]])
@@ -131,10 +129,14 @@ class HandPlayed(object):
         self.flop = [cards[4], cards[5], cards[6]]
         self.turn = [cards[7]]
         self.river = [cards[8]]
-        self.hand_history_BB, self.json_hand_hist_BB, self.state_BB = \
-            self._initialize_hand_history(self.playerBB)
-        self.hand_history_SB, self.json_hand_hist_SB, self.state_SB = \
-            self._initialize_hand_history(self.playerSB)
+        self.event_log = EventLog()
+        self.event_log.start(hand_number, is_fixed_limit, big_blind,
+                             self.small_blind,
+                             (self.playerBB.name, self.playerSB.name),
+                             (self.playerBB.stack, self.playerSB.stack),
+                             cards, explain_showdown=explain_showdown)
+        self.state_BB = self._initialize_state(self.playerBB)
+        self.state_SB = self._initialize_state(self.playerSB)
 
     def get_possible_actions(self, player, imbalance_size,
                              other_player_is_all_in, nb_actions):
@@ -168,7 +170,7 @@ class HandPlayed(object):
             return ['check', 'bet']
 
     def get_action_from_player(self, player, actions, imbalance_size,
-                               other_player_is_all_in, json_hand_hist):
+                               other_player_is_all_in, seat):
         """
         Getting actions from players, method will vary depending on type of
         player (i.e. which class or subclass it belongs to)
@@ -179,7 +181,8 @@ class HandPlayed(object):
             imbalance_size (int): pre action imbalance size, i.e.
             positive if one player has put more into the pot than the other
             other_player_is_all_in (bool): explicit, to set up maximum bet
-            json_hand_hist (dict): hand history in json format
+            seat (int): seat of the player, 0 for the big blind, 1 for the
+            small blind
 
         Returns:
             has_folded (bool): let know whether someone folded
@@ -189,17 +192,18 @@ class HandPlayed(object):
         """
 
         # getting action from player
-        choice = player.take_action(actions, hand_hist=json_hand_hist)
+        choice = player.take_action(actions,
+                                    hand_hist=self.event_log.to_json(seat))
 
         # return meaningful parameters accordingly
         if choice == 'fold':
-            self.update_hand_histories("{} folds\n".format(player.name))
+            self.event_log.record('fold', seat)
             return True, False, imbalance_size, choice
         elif choice == 'check':
-            self.update_hand_histories("{} checks\n".format(player.name))
+            self.event_log.record('check', seat)
             return False, False, 0, choice
         elif choice == 'call':
-            self.update_hand_histories("{} calls\n".format(player.name))
+            self.event_log.record('call', seat)
             player.bet_amount(imbalance_size)
             self.pot_size += imbalance_size
             return False, False, 0, choice
@@ -214,11 +218,9 @@ class HandPlayed(object):
             self.pot_size += bet_size
             # check if player is all in
             if player.stack == 0:
-                self.update_hand_histories("{} bets {}, and is all-in\n"
-                                           .format(player.name, bet_size))
+                self.event_log.record('bet all-in', seat, bet_size)
                 return False, True, bet_size, choice
-            self.update_hand_histories("{} bets {}\n".format(player.name,
-                                                             bet_size))
+            self.event_log.record('bet', seat, bet_size)
             return False, False, bet_size, choice
         elif choice == 'raise':
             # minimum raise is calling the imbalance and doubling it
@@ -237,16 +239,11 @@ class HandPlayed(object):
             # check if player is all in
             if player.stack == 0:
                 if amount_on_top > 0:
-                    self.update_hand_histories("{} raises {}, and is all-in\n"
-                                               .format(player.name,
-                                                       amount_on_top))
+                    self.event_log.record('raise all-in', seat, amount_on_top)
                 else:
-                    self.update_hand_histories("{} calls {}, and is all-in\n"
-                                               .format(player.name,
-                                                       raise_size))
+                    self.event_log.record('call all-in', seat, raise_size)
                 return False, True, amount_on_top, choice
-            self.update_hand_histories("{} raises {}\n".format(player.name,
-                                                               amount_on_top))
+            self.event_log.record('raise', seat, amount_on_top)
             return False, False, amount_on_top, choice
         elif choice == 'all-in':
             if other_player_is_all_in:
@@ -257,11 +254,9 @@ class HandPlayed(object):
             self.pot_size += all_in_amount
             amount_on_top = all_in_amount - imbalance_size
             if amount_on_top > 0:
-                self.update_hand_histories("{} bets {}, and is all-in\n"
-                                           .format(player.name, amount_on_top))
+                self.event_log.record('bet all-in', seat, amount_on_top)
             else:
-                self.update_hand_histories("{} calls {}, and is all-in\n"
-                                           .format(player.name, all_in_amount))
+                self.event_log.record('call all-in', seat, all_in_amount)
             return False, True, amount_on_top, choice
 
     def betting_round(self, stage='pre-flop'):
@@ -310,16 +305,12 @@ class HandPlayed(object):
 
             # get action from player, using context and hand history, execute
             # action and update attributes of betting round
-            if is_action_on_bb:
-                json_hand_hist = self.json_hand_hist_BB
-            else:
-                json_hand_hist = self.json_hand_hist_SB
-
+            seat = 0 if is_action_on_bb else 1
             has_folded, is_all_in, imbalance_size, choice = \
                 self.get_action_from_player(player, actions,
                                             imbalance_size,
                                             someone_has_gone_all_in,
-                                            json_hand_hist)
+                                            seat)
 
             # update action trail with choice of player
             if choice in ['call', 'check', 'all-in']:
@@ -356,9 +347,7 @@ class HandPlayed(object):
             if has_folded:
                 player = action_cycle.__next__()
                 player.win_pot(self.pot_size)
-                self.update_hand_histories('{} wins the pot: +{}$'
-                                           .format(player.name,
-                                                   self.pot_size))
+                self.event_log.record('win', 1 - seat, self.pot_size)
                 return True, False
 
             # update variables
@@ -390,16 +379,16 @@ class HandPlayed(object):
             (None): if someone folds before showdown
         """
         # blinds
-        logging.debug('{} is Big Blind'.format(self.playerBB.name))
+        logging.debug('%s is Big Blind', self.playerBB.name)
         self.playerBB.bet_amount(self.big_blind)
         self.playerSB.bet_amount(self.small_blind)
         self.pot_size += self.big_blind + self.small_blind
 
         # players' private cards
-        logging.debug('{} has {}'.format(self.playerBB.name,
-                                         self.handBB.private_cards))
-        logging.debug('{} has {}'.format(self.playerSB.name,
-                                         self.handSB.private_cards))
+        logging.debug('%s has %s', self.playerBB.name,
+                      self.handBB.private_cards)
+        logging.debug('%s has %s', self.playerSB.name,
+                      self.handSB.private_cards)
 
         # first betting round, pre-flop
         someone_has_folded, someone_is_all_in = \
@@ -408,11 +397,8 @@ class HandPlayed(object):
             self.pot_size = 0  # reset pot size in case want to replay hand
             return None
 
-        logging.debug('Flop comes {}'.format(self.flop))
-        self.json_hand_hist_BB['community_cards'] += self.flop
-        self.json_hand_hist_SB['community_cards'] += self.flop
-        self.update_hand_histories("***** Dealing flop: {}\n"
-                                   .format(self.flop))
+        logging.debug('Flop comes %s', self.flop)
+        self.event_log.record('flop')
         # for lack of a better idea for now...
         self.state_BB[5] = self.flop[0].numerical_id
         self.state_BB[6] = self.flop[1].numerical_id
@@ -431,11 +417,8 @@ class HandPlayed(object):
                 self.pot_size = 0  # reset pot size in case want to replay hand
                 return None
 
-        logging.debug('Turn comes {}'.format(self.turn))
-        self.json_hand_hist_BB['community_cards'] += self.turn
-        self.json_hand_hist_SB['community_cards'] += self.turn
-        self.update_hand_histories("***** Dealing turn: {} - {}\n"
-                                   .format(self.flop, self.turn))
+        logging.debug('Turn comes %s', self.turn)
+        self.event_log.record('turn')
         # for lack of a better idea for now...
         self.state_SB[8] = self.turn[0].numerical_id
         self.state_BB[8] = self.turn[0].numerical_id
@@ -450,11 +433,8 @@ class HandPlayed(object):
                 self.pot_size = 0  # reset pot size in case want to replay hand
                 return None
 
-        logging.debug('River comes {}'.format(self.river))
-        self.json_hand_hist_BB['community_cards'] += self.river
-        self.json_hand_hist_SB['community_cards'] += self.river
-        self.update_hand_histories("***** Dealing river: {} - {} - {}\n"
-                                   .format(self.flop, self.turn, self.river))
+        logging.debug('River comes %s', self.river)
+        self.event_log.record('river')
         # for lack of a better idea for now...
         self.state_SB[9] = self.river[0].numerical_id
         self.state_BB[9] = self.river[0].numerical_id
@@ -469,39 +449,18 @@ class HandPlayed(object):
                 self.pot_size = 0  # reset pot size in case want to replay hand
                 return None
 
-        # Evaluate best combinations
-        self.handBB.update_best_combination()
-        self.handSB.update_best_combination()
-        # Evaluate winner at showdown
-        self.update_hand_histories("***** Summary: \n"
-                                   "{} shows {}, best hand is {}, {}\n"
-                                   "{} shows {}, best hand is {}, {}\n"
-                                   "Pot size: {}\n"
-                                   .format(self.playerBB.name,
-                                           self.handBB.private_cards,
-                                           self.handBB.best_combination,
-                                           self.handBB.human_readable_rank(),
-                                           self.playerSB.name,
-                                           self.handSB.private_cards,
-                                           self.handSB.best_combination,
-                                           self.handSB.human_readable_rank(),
-                                           self.pot_size))
-
-        # evaluate winner at showdown
-        winner = compare_two_hands(self.handBB, self.handSB)
-        if winner == 'hand1':
+        # Evaluate winner at showdown, from integer strengths only
+        winner = showdown(self.handBB, self.handSB)
+        self.event_log.record('showdown', amount=self.pot_size)
+        if winner == 1:
             self.playerBB.win_pot(self.pot_size)
-            self.update_hand_histories('{} wins the pot: +{}$'
-                                       .format(self.playerBB.name,
-                                               self.pot_size))
-        elif winner == 'hand2':
+            self.event_log.record('win', 0, self.pot_size)
+        elif winner == -1:
             self.playerSB.win_pot(self.pot_size)
-            self.update_hand_histories('{} wins the pot: +{}$'
-                                       .format(self.playerSB.name,
-                                               self.pot_size))
+            self.event_log.record('win', 1, self.pot_size)
         else:
             self.playerBB.split_pot(self.pot_size)
             self.playerSB.split_pot(self.pot_size)
-            self.update_hand_histories("Splitting the pot")
+            self.event_log.record('split', amount=self.pot_size)
 
         self.pot_size = 0  # reset pot size in case want to replay hand
@@ -1,31 +1,40 @@
 
 import logging
-from itertools import cycle
+import numpy as np
 
 from ..flow_control.deck import Deck
-from ..hand_evaluation.hand import Hand, compare_two_hands
+from ..flow_control.event_log import EventLog, HandHistory
+from ..hand_evaluation.hand import Hand, showdown
 from ..agent.dqnagent import DQNAgent, DRQNAgent
 from ..opponents.humanplayer import HumanPlayer
-from ..globals import SEQUENCE_ACTIONS_ID
+from ..globals import SEQUENCE_ACTIONS_ID, NB_CARDS, MAX_SEQUENCE_ID, \
+    ACTIONS, ACTION_IDS, ACTIONS_BY_MASK, CHECK, CALL, BET, RAISE, ALL_IN, \
+    FOLD
 
 logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
                     level=logging.DEBUG)
 
 
-def create_stage_generator():
-    """
-    Create the sequence of stages the hand can go through
-    """
-    stage_sequence = ['pre-flop', 'flop', 'turn', 'river', 'showdown']
-    for i in stage_sequence:
-        yield i
+# sequence of stages the hand can go through
+STAGE_SEQUENCE = ('pre-flop', 'flop', 'turn', 'river', 'showdown')
+
+# legal-action bitmasks of the betting situations
+CHECK_OR_BET = 1 << CHECK | 1 << BET
+CALL_RAISE_OR_FOLD = 1 << CALL | 1 << RAISE | 1 << FOLD
+CALL_OR_FOLD = 1 << CALL | 1 << FOLD
+ALL_IN_OR_FOLD = 1 << ALL_IN | 1 << FOLD
+
+# symbol of each action in action sequences
+ACTION_SYMBOLS = ('C', 'C', 'B', 'B', 'C', 'F')
 
 
 class HdPlayed(object):
     """
     Hand being played object managing flow control for the hand played
     between two poker players, based on the current parameters of the game.
-    Keeps track of what is happening during the hand as well.
+    Keeps track of what is happening during the hand as well. The object is
+    meant to be re-dealt in place from one hand to the next, reusing its
+    Hand objects, event log and states.
 
     Attributes:
         # parameters
@@ -41,20 +50,39 @@ class HdPlayed(object):
         turn (list): list containing communal card coming on the turn
         river (list): list containing communal card coming on the river
         hand_number (int): index to keep track of number of the hand played
+        explain_showdown (bool): whether hand histories detail the best
+        combination of each player at showdown
+        deck (class.Deck): 52-card deck new hands are drawn from on reset
         # variables
+        stage_idx (int): index of the current stage in STAGE_SEQUENCE
         pot_size (int): size of the pot on that hand
         hand_over (bool): indicating whether hand is over
+        legal_actions (int): bitmask of the legal actions of the active
+        player, bit i being set when action of code i in ACTIONS is legal
+        possible_actions (list): names of the legal actions, as shown to
+        players
         # hand history objects
-        hand_history_BB (str): hand history object seen from BB player
-        hand_history_SB (str): hand history object seen from SB player
-        json_hand_hist_BB (dict): hand history in json format
-        json_hand_hist_SB (dict): hand history in json format
-        state_SB (array): state of the environment as seen from SB player
-        state_BB (array): state of the environment as seen from BB player
+        event_log (class.EventLog): log of the hand, from which hand
+        histories are rendered on demand
+        hand_history_BB (str): hand history seen from BB player, rendered
+        when read
+        hand_history_SB (str): hand history seen from SB player, rendered
+        when read
+        json_hand_hist_BB (dict): hand history in json format, rendered
+        when read
+        json_hand_hist_SB (dict): hand history in json format, rendered
+        when read
+        chips_scale (float): inverse of the chips in play, stacks and pot
+        size being normalized by the initial stacks of both players
+        state_SB (np.ndarray): normalized float32 state of the environment as
+        seen from SB player, updated in place
+        state_BB (np.ndarray): normalized float32 state of the environment as
+        seen from BB player, updated in place
     """
 
     def __init__(self, hero_is_big_blind, player_hero, player_villain,
-                 big_blind, is_fixed_limit, cards, hand_number):
+                 big_blind, is_fixed_limit, cards, hand_number,
+                 explain_showdown=True):
         """
         Instantiate a hand played object based on players, parameters,
         and list of 9 randomly drawn cards
@@ -62,48 +90,68 @@ class HdPlayed(object):
         'Mike'), 10, True, Deck().deal_cards(9), 3)
         """
         # parameters
-        self.hero_is_big_blind = hero_is_big_blind
         self.player_hero = player_hero
         self.player_villain = player_villain
+        self.big_blind = big_blind
+        self.is_fixed_limit = is_fixed_limit
+        self.explain_showdown = explain_showdown
+        self.small_blind = int(big_blind / 2)
+        # objects reused from one hand to the next
+        self.deck = Deck()
+        self.handBB = Hand([cards[0], cards[1]])
+        self.handSB = Hand([cards[2], cards[3]])
+        self.event_log = EventLog()
+        self.chips_scale = 1 / (player_hero.initial_stack +
+                                player_villain.initial_stack)
+        self.state_BB = np.zeros(15, dtype=np.float32)
+        self.state_SB = np.zeros(15, dtype=np.float32)
+        self.deal(hero_is_big_blind, cards, hand_number)
+
+    def deal(self, hero_is_big_blind, cards, hand_number):
+        """
+        Re-initialise the hand in place for a new hand, without allocating
+        new Hand objects, event log or states
+        e.g. hand.deal(False, Deck().deal_cards(9), 4)
+
+        Args:
+            hero_is_big_blind (bool): position of the hero
+            cards (list): the nine Card objects dealt, hole cards of the big
+            blind then of the small blind, flop, turn and river
+            hand_number (int): index of the hand played
+        """
+        # parameters
+        self.hero_is_big_blind = hero_is_big_blind
         if self.hero_is_big_blind:
             self.playerBB = self.player_hero
             self.playerSB = self.player_villain
         else:
             self.playerBB = self.player_villain
             self.playerSB = self.player_hero
-        self.big_blind = big_blind
-        self.is_fixed_limit = is_fixed_limit
         self.hand_nb = hand_number
-        self.small_blind = int(big_blind / 2)
-        self.handBB = Hand([cards[0], cards[1]])
-        self.handSB = Hand([cards[2], cards[3]])
-        self.flop = [cards[4], cards[5], cards[6]]
-        self.turn = [cards[7]]
-        self.river = [cards[8]]
+        self.handBB.reset(cards[0:2])
+        self.handSB.reset(cards[2:4])
+        self.flop = cards[4:7]
+        self.turn = cards[7:8]
+        self.river = cards[8:9]
         # variables
-        self.stage_sequence = create_stage_generator()
+        self.stage_idx = -1
         self.pot_size = 0
         self.hero_reward = 0
         self.hand_over = False
         self.someone_has_folded = False
         self.someone_is_all_in = False
         self.stage = ""
-        # betting round variables
+        # betting round variables, small blind acting first pre-flop
         self.imbalance_size = self.big_blind - self.small_blind
-        self.action_cycle = cycle([self.playerSB, self.playerBB])
-        self.is_action_on_bb_cycle = cycle([False, True])
         self.nb_actions = 0
-        self.active_player = self.action_cycle.__next__()
-        self.is_action_on_bb = self.is_action_on_bb_cycle.__next__()
+        self.is_action_on_bb = False
+        self.active_player = self.playerSB
         self.action_trail = ''
-        self.possible_actions = self._get_possible_actions()
+        self.legal_actions = self._get_legal_actions()
         # hand history objects
-        self.hand_history_BB, self.json_hand_hist_BB, self.state_BB = \
-            self._initialize_hand_history(self.playerBB)
-        self.hand_history_SB, self.json_hand_hist_SB, self.state_SB = \
-            self._initialize_hand_history(self.playerSB)
-        # active hand history
-        self.active_json_hist = self._get_active_json_hist()
+        self._start_event_log(cards)
+        self._initialize_state(self.state_BB, self.playerBB)
+        self._initialize_state(self.state_SB, self.playerSB)
 
     def _next_stage(self):
         """
@@ -111,20 +159,20 @@ class HdPlayed(object):
         Update relevant attributes for the betting round accordingly and
         log important information
         """
-        self.stage = self.stage_sequence.__next__()
+        self.stage_idx += 1
+        self.stage = STAGE_SEQUENCE[self.stage_idx]
 
         if self.stage != 'pre-flop':
-            self.action_cycle = cycle([self.playerBB, self.playerSB])
-            self.is_action_on_bb_cycle = cycle([True, False])
+            # big blind acts first after the flop
             self.imbalance_size = 0
             self.nb_actions = 0
-            self.active_player = self.action_cycle.__next__()
-            self.is_action_on_bb = self.is_action_on_bb_cycle.__next__()
+            self.is_action_on_bb = True
+            self.active_player = self.playerBB
             self.action_trail = ''
 
         if self.stage == "pre-flop":
             # blinds
-            logging.debug('{} is Big Blind'.format(self.playerBB.name))
+            logging.debug('%s is Big Blind', self.playerBB.name)
             # check if one of the players is all in under the blind
             if self.playerSB.stack <= self.small_blind:
                 self.someone_is_all_in = True
@@ -158,86 +206,54 @@ class HdPlayed(object):
                 self.pot_size += self.big_blind + self.small_blind
                 self.imbalance_size = self.big_blind - self.small_blind
             # log players' private cards
-            logging.debug('{} has {}'.format(self.playerBB.name,
-                                             self.handBB.private_cards))
-            logging.debug('{} has {}'.format(self.playerSB.name,
-                                             self.handSB.private_cards))
+            logging.debug('%s has %s', self.playerBB.name,
+                          self.handBB.private_cards)
+            logging.debug('%s has %s', self.playerSB.name,
+                          self.handSB.private_cards)
 
         elif self.stage == "flop":
             # log cards
-            logging.debug('Flop comes {}'.format(self.flop))
-            self.json_hand_hist_BB['community_cards'] += self.flop
-            self.json_hand_hist_SB['community_cards'] += self.flop
-            self.update_hand_histories("***** Dealing flop: {}\n"
-                                       .format(self.flop))
+            logging.debug('Flop comes %s', self.flop)
+            self.event_log.record('flop')
             # log states - for lack of a better idea for now...
-            self.state_BB[5] = self.flop[0].numerical_id
-            self.state_BB[6] = self.flop[1].numerical_id
-            self.state_BB[7] = self.flop[2].numerical_id
-            self.state_SB[5] = self.flop[0].numerical_id
-            self.state_SB[6] = self.flop[1].numerical_id
-            self.state_SB[7] = self.flop[2].numerical_id
+            self.state_BB[5] = self.flop[0].numerical_id / NB_CARDS
+            self.state_BB[6] = self.flop[1].numerical_id / NB_CARDS
+            self.state_BB[7] = self.flop[2].numerical_id / NB_CARDS
+            self.state_SB[5:8] = self.state_BB[5:8]
             # integrate info into hands
             self.handBB.add_public_cards(self.flop)
             self.handSB.add_public_cards(self.flop)
 
         elif self.stage == "turn":
             # log cards
-            logging.debug('Turn comes {}'.format(self.turn))
-            self.json_hand_hist_BB['community_cards'] += self.turn
-            self.json_hand_hist_SB['community_cards'] += self.turn
-            self.update_hand_histories("***** Dealing turn: {} - {}\n"
-                                       .format(self.flop, self.turn))
+            logging.debug('Turn comes %s', self.turn)
+            self.event_log.record('turn')
             # log states - for lack of a better idea for now...
-            self.state_SB[8] = self.turn[0].numerical_id
-            self.state_BB[8] = self.turn[0].numerical_id
+            self.state_SB[8] = self.turn[0].numerical_id / NB_CARDS
+            self.state_BB[8] = self.turn[0].numerical_id / NB_CARDS
             # integrate info into hands
             self.handBB.add_public_cards(self.turn)
             self.handSB.add_public_cards(self.turn)
 
         elif self.stage == "river":
             # log cards
-            logging.debug('River comes {}'.format(self.river))
-            self.json_hand_hist_BB['community_cards'] += self.river
-            self.json_hand_hist_SB['community_cards'] += self.river
-            self.update_hand_histories("***** Dealing river: {} - {} - {}\n"
-                                       .format(self.flop, self.turn,
-                                               self.river))
+            logging.debug('River comes %s', self.river)
+            self.event_log.record('river')
             # log states - for lack of a better idea for now...
-            self.state_SB[9] = self.river[0].numerical_id
-            self.state_BB[9] = self.river[0].numerical_id
+            self.state_SB[9] = self.river[0].numerical_id / NB_CARDS
+            self.state_BB[9] = self.river[0].numerical_id / NB_CARDS
             # integrate info into hands
             self.handBB.add_public_cards(self.river)
             self.handSB.add_public_cards(self.river)
 
         elif self.stage == "showdown":
             self.hand_over = True
-            # Evaluate best combinations
-            self.handBB.update_best_combination()
-            self.handSB.update_best_combination()
-            # Evaluate winner at showdown
-            self.update_hand_histories("***** Summary: \n"
-                                       "{} shows {}, best hand is {}, {}\n"
-                                       "{} shows {}, best hand is {}, {}\n"
-                                       "Pot size: {}\n"
-                                       .format(self.playerBB.name,
-                                               self.handBB.private_cards,
-                                               self.handBB.best_combination,
-                                               self.handBB
-                                               .human_readable_rank(),
-                                               self.playerSB.name,
-                                               self.handSB.private_cards,
-                                               self.handSB.best_combination,
-                                               self.handSB
-                                               .human_readable_rank(),
-                                               self.pot_size))
-            # evaluate winner at showdown
-            winner = compare_two_hands(self.handBB, self.handSB)
-            if winner == 'hand1':
+            # Evaluate winner at showdown, from integer strengths only
+            winner = showdown(self.handBB, self.handSB)
+            self.event_log.record('showdown', amount=self.pot_size)
+            if winner == 1:
                 self.playerBB.win_pot(self.pot_size)
-                self.update_hand_histories('{} wins the pot: +{}$'
-                                           .format(self.playerBB.name,
-                                                   self.pot_size))
+                self.event_log.record('win', 0, self.pot_size)
                 if self.hero_is_big_blind:
                     self.hero_reward = \
                         (self.pot_size - self.imbalance_size) / 2
@@ -245,11 +261,9 @@ class HdPlayed(object):
                     self.hero_reward = \
                         -(self.pot_size - self.imbalance_size) / 2
 
-            elif winner == 'hand2':
+            elif winner == -1:
                 self.playerSB.win_pot(self.pot_size)
-                self.update_hand_histories('{} wins the pot: +{}$'
-                                           .format(self.playerSB.name,
-                                                   self.pot_size))
+                self.event_log.record('win', 1, self.pot_size)
                 if self.hero_is_big_blind:
                     self.hero_reward = \
                         -(self.pot_size - self.imbalance_size) / 2
@@ -260,77 +274,93 @@ class HdPlayed(object):
             else:
                 self.playerBB.split_pot(self.pot_size)
                 self.playerSB.split_pot(self.pot_size)
-                self.update_hand_histories("Splitting the pot")
+                self.event_log.record('split', amount=self.pot_size)
                 self.hero_reward = 0
 
     def _get_hero_hand_history(self):
         """
-        Get the human-readable hand history from the hero point of view
+        Get the hand history from the hero point of view, rendered as text
+        only when printed
         """
         if self.hero_is_big_blind:
-            return self.hand_history_BB
+            return HandHistory(self.event_log, 0)
         else:
-            return self.hand_history_SB
+            return HandHistory(self.event_log, 1)
 
     def _get_hero_state(self):
         """
-        Get the state of the environment from the hero point of view
+        Get the state of the environment from the hero point of view, a view
+        on the buffer updated in place, to be copied to be kept
         """
         if self.hero_is_big_blind:
             return self.state_BB
         else:
             return self.state_SB
 
-    def _get_possible_actions(self):
+    def _get_legal_actions(self):
         """
-        Getting possible actions at any moment of the betting round, based on
-        context, and player whose turn it is
+        Getting legal actions at any moment of the betting round, based on
+        context, and player whose turn it is, as a bitmask
         """
         if self.imbalance_size > 0:
             if self.imbalance_size >= self.active_player.stack:
-                return ['all-in', 'fold']
+                return ALL_IN_OR_FOLD
             else:
                 if self.someone_is_all_in:
-                    return ['call', 'fold']
+                    return CALL_OR_FOLD
                 else:
                     if self.is_fixed_limit:
                         # if number of actions above threshold, bet is capped
                         if self.nb_actions >= 4:
-                            return ['call', 'fold']
-                    return ['call', 'raise', 'fold']
+                            return CALL_OR_FOLD
+                    return CALL_RAISE_OR_FOLD
         else:
-            return ['check', 'bet']
+            return CHECK_OR_BET
 
     def _update_possible_actions(self):
         """
-        Update set of possible actions for active player at any given moment
+        Update legal actions for active player at any given moment
         """
-        self.possible_actions = self._get_possible_actions()
+        self.legal_actions = self._get_legal_actions()
+
+    @property
+    def possible_actions(self):
+        """ Names of the legal actions of the active player """
+        return ACTIONS_BY_MASK[self.legal_actions]
 
     def _get_active_json_hist(self):
         """
         Get json hand history from the point of view of the active player
         """
         if self.is_action_on_bb:
-            return self.json_hand_hist_BB
-        return self.json_hand_hist_SB
+            return self.event_log.to_json(0)
+        return self.event_log.to_json(1)
+
+    def _get_other_player(self):
+        """
+        Get the player who is not active
+        """
+        if self.is_action_on_bb:
+            return self.playerSB
+        return self.playerBB
 
     def _enforce_action(self, action):
         """
         Update attributes based on action taken by player
         Also, calls the function to update the state accordingly
+
+        Args:
+            action (int): code of the action in ACTIONS
         """
-        if action == 'fold':
-            self.update_hand_histories("{} folds\n"
-                                       .format(self.active_player.name))
+        seat = 0 if self.is_action_on_bb else 1
+        if action == FOLD:
+            self.event_log.record('fold', seat)
             self.someone_has_folded = True
             self.hand_over = True
             # attribute winnings to other player
-            other_player = self.action_cycle.__next__()
+            other_player = self._get_other_player()
             other_player.win_pot(self.pot_size)
-            self.update_hand_histories('{} wins the pot: {}$'
-                                       .format(other_player.name,
-                                               self.pot_size))
+            self.event_log.record('win', 1 - seat, self.pot_size)
             # update reward
             if self.hero_is_big_blind:
                 if self.is_action_on_bb:
@@ -347,18 +377,16 @@ class HdPlayed(object):
                     self.hero_reward = \
                         -(self.pot_size - self.imbalance_size) / 2
 
-        elif action == 'check':
-            self.update_hand_histories("{} checks\n"
-                                       .format(self.active_player.name))
+        elif action == CHECK:
+            self.event_log.record('check', seat)
 
-        elif action == 'call':
-            self.update_hand_histories("{} calls\n"
-                                       .format(self.active_player.name))
+        elif action == CALL:
+            self.event_log.record('call', seat)
             self.active_player.bet_amount(self.imbalance_size)
             self.pot_size += self.imbalance_size
             self.imbalance_size = 0
 
-        elif action == 'bet':
+        elif action == BET:
             if self.is_fixed_limit:
                 if self.stage in ['turn', 'river']:
                     bet_size = min(self.big_blind * 2,
@@ -373,17 +401,13 @@ class HdPlayed(object):
             self.active_player.bet_amount(bet_size)
             self.pot_size += bet_size
             if self.active_player.stack == 0:  # check if player is all in
-                self.update_hand_histories("{} bets {}, and is all-in\n"
-                                           .format(self.active_player.name,
-                                                   bet_size))
+                self.event_log.record('bet all-in', seat, bet_size)
                 self.someone_is_all_in = True
             else:
-                self.update_hand_histories("{} bets {}\n"
-                                           .format(self.active_player.name,
-                                                   bet_size))
+                self.event_log.record('bet', seat, bet_size)
             self.imbalance_size = bet_size
 
-        elif action == 'raise':
+        elif action == RAISE:
             # minimum raise is calling the imbalance and doubling it
             # except pre-flop where the imbalance is the sb but the raise
             # needs to be at least the bb - or if all in
@@ -403,18 +427,12 @@ class HdPlayed(object):
             amount_on_top = raise_size - self.imbalance_size
             if self.active_player.stack == 0:  # check if player is all in
                 if amount_on_top > 0:
-                    self.update_hand_histories("{} raises {}, and is all-in\n"
-                                               .format(self.active_player.name,
-                                                       amount_on_top))
+                    self.event_log.record('raise all-in', seat, amount_on_top)
                 else:
-                    self.update_hand_histories("{} calls {}, and is all-in\n"
-                                               .format(self.active_player.name,
-                                                       raise_size))
+                    self.event_log.record('call all-in', seat, raise_size)
                 self.someone_is_all_in = True
             else:
-                self.update_hand_histories("{} raises {}\n"
-                                           .format(self.active_player.name,
-                                                   amount_on_top))
+                self.event_log.record('raise', seat, amount_on_top)
             self.imbalance_size = amount_on_top
             # if someone has gone all-in, there may be an imbalance left and
             # the first player to have moved may have had more chips,
@@ -423,12 +441,12 @@ class HdPlayed(object):
                 # player will always be the first mover
                 # they can't be a negative imbalance if the person who
                 # concludes the betting round has more chips
-                self.action_cycle.__next__() \
+                self._get_other_player() \
                     .get_back_from_pot(-self.imbalance_size)
                 self.pot_size += self.imbalance_size
                 self.imbalance_size = 0
 
-        elif action == 'all-in':
+        elif action == ALL_IN:
             if self.someone_is_all_in:
                 all_in_amount = min(self.active_player.stack,
                                     self.imbalance_size)
@@ -439,13 +457,9 @@ class HdPlayed(object):
             self.pot_size += all_in_amount
             amount_on_top = all_in_amount - self.imbalance_size
             if amount_on_top > 0:
-                self.update_hand_histories("{} bets {}, and is all-in\n"
-                                           .format(self.active_player.name,
-                                                   amount_on_top))
+                self.event_log.record('bet all-in', seat, amount_on_top)
             else:
-                self.update_hand_histories("{} calls {}, and is all-in\n"
-                                           .format(self.active_player.name,
-                                                   all_in_amount))
+                self.event_log.record('call all-in', seat, all_in_amount)
             self.imbalance_size = amount_on_top
             # if someone has gone all-in, there may be an imbalance left and
             # the first player to have moved may have had more chips,
@@ -454,7 +468,7 @@ class HdPlayed(object):
                 # player will always be the first mover
                 # they can't be a negative imbalance if the person who
                 # concludes the betting round has more chips
-                self.action_cycle.__next__()\
+                self._get_other_player() \
                     .get_back_from_pot(-self.imbalance_size)
                 self.pot_size += self.imbalance_size
                 self.imbalance_size = 0
@@ -468,8 +482,11 @@ class HdPlayed(object):
         """
         Update attributes in order to change turn
         """
-        self.active_player = self.action_cycle.__next__()
-        self.is_action_on_bb = self.is_action_on_bb_cycle.__next__()
+        self.is_action_on_bb = not self.is_action_on_bb
+        if self.is_action_on_bb:
+            self.active_player = self.playerBB
+        else:
+            self.active_player = self.playerSB
 
     def _is_betting_round_over(self):
         """
@@ -483,36 +500,35 @@ class HdPlayed(object):
     def _update_state(self, action):
         """
         Update state based on action taken by player
+
+        Args:
+            action (int): code of the action in ACTIONS
         """
 
-        if action in ['call', 'check', 'all-in']:
-            self.action_trail += 'C'
-        elif action in ['bet', 'raise']:
-            self.action_trail += 'B'
-        elif action == 'fold':
-            self.action_trail += 'F'
+        self.action_trail += ACTION_SYMBOLS[action]
 
         # update stacks and pot size
-        self.state_BB[0] = self.playerBB.stack
-        self.state_BB[1] = self.playerSB.stack
-        self.state_SB[0] = self.playerSB.stack
-        self.state_SB[1] = self.playerBB.stack
-        self.state_BB[-1] = self.pot_size
-        self.state_SB[-1] = self.pot_size
+        self.state_BB[0] = self.playerBB.stack * self.chips_scale
+        self.state_BB[1] = self.playerSB.stack * self.chips_scale
+        self.state_SB[0] = self.state_BB[1]
+        self.state_SB[1] = self.state_BB[0]
+        self.state_BB[-1] = self.pot_size * self.chips_scale
+        self.state_SB[-1] = self.state_BB[-1]
 
         # need to update action trail for the stage
+        sequence_id = SEQUENCE_ACTIONS_ID[self.action_trail] / MAX_SEQUENCE_ID
         if self.stage == 'pre-flop':
-            self.state_BB[-5] = SEQUENCE_ACTIONS_ID[self.action_trail]
-            self.state_SB[-5] = SEQUENCE_ACTIONS_ID[self.action_trail]
+            self.state_BB[-5] = sequence_id
+            self.state_SB[-5] = sequence_id
         elif self.stage == 'flop':
-            self.state_BB[-4] = SEQUENCE_ACTIONS_ID[self.action_trail]
-            self.state_SB[-4] = SEQUENCE_ACTIONS_ID[self.action_trail]
+            self.state_BB[-4] = sequence_id
+            self.state_SB[-4] = sequence_id
         elif self.stage == 'turn':
-            self.state_BB[-3] = SEQUENCE_ACTIONS_ID[self.action_trail]
-            self.state_SB[-3] = SEQUENCE_ACTIONS_ID[self.action_trail]
+            self.state_BB[-3] = sequence_id
+            self.state_SB[-3] = sequence_id
         elif self.stage == 'river':
-            self.state_BB[-2] = SEQUENCE_ACTIONS_ID[self.action_trail]
-            self.state_SB[-2] = SEQUENCE_ACTIONS_ID[self.action_trail]
+            self.state_BB[-2] = sequence_id
+            self.state_SB[-2] = sequence_id
 
     def initial_step(self):
         """
@@ -546,11 +562,13 @@ class HdPlayed(object):
                                                     hand_hist=self.
                                                     _get_active_json_hist())
             # enforce action
-            self._enforce_action(action)
+            self._enforce_action(ACTION_IDS[action])
 
-            if not self.hand_over:
-                # change whose turn it is
-                self._next_turn()
+            # opponent may fold its small blind
+            if self.hand_over:
+                break
+            # change whose turn it is
+            self._next_turn()
 
         # update possible actions
         self._update_possible_actions()
@@ -563,7 +581,8 @@ class HdPlayed(object):
         Method to take a step into the hand for the agent
 
         Args:
-            action (str): action selected by agent
+            action (int): code in ACTIONS of the action selected by agent,
+            its name being accepted as well
 
         Returns:
             next_state (array): numerical representation of environment
@@ -572,7 +591,11 @@ class HdPlayed(object):
             info (object): hand history for debugging purposes
         """
         # make sure action is valid
-        assert(action in self.possible_actions)
+        if isinstance(action, str):
+            action = ACTION_IDS[action]
+        assert self.legal_actions >> action & 1, \
+            "Illegal action {}, legal actions are {}" \
+            .format(ACTIONS[action], self.possible_actions)
 
         # enforce action from agent
         self._enforce_action(action)
@@ -594,15 +617,15 @@ class HdPlayed(object):
         if self._is_betting_round_over():
             self._next_stage()
             logging.debug("Betting round is over, going to next stage, "
-                          "on to {}".format(self.active_player.name))
+                          "on to %s", self.active_player.name)
             # if showdown, hand is over:
             if self.hand_over:
                 return self._get_hero_state(), self.hero_reward, \
                        self.hand_over, self._get_hero_hand_history()
         else:  # if not action is on the opponent
             self._next_turn()
-            logging.debug("Betting round continues, on to {}"
-                          .format(self.active_player.name))
+            logging.debug("Betting round continues, on to %s",
+                          self.active_player.name)
 
         # let the opponent play if it is its turn to - can be twice in a row
         while self.active_player == self.player_villain:
@@ -623,7 +646,7 @@ class HdPlayed(object):
                                                     _get_active_json_hist())
 
             # enforce action
-            self._enforce_action(action)
+            self._enforce_action(ACTION_IDS[action])
 
             # check if hand is over
             if self.hand_over:
@@ -642,18 +665,18 @@ class HdPlayed(object):
             if self._is_betting_round_over():
                 self._next_stage()
                 logging.debug("Betting round is over, going to next stage, "
-                              "on to {}".format(self.active_player.name))
+                              "on to %s", self.active_player.name)
                 # if showdown, hand is over:
                 if self.hand_over:
                     return self._get_hero_state(), self.hero_reward, \
                            self.hand_over, self._get_hero_hand_history()
             else:  # if not, action continues
                 self._next_turn()
-                logging.debug("Betting round continues, on to {}"
-                              .format(self.active_player.name))
+                logging.debug("Betting round continues, on to %s",
+                              self.active_player.name)
 
-            # update possible actions
-            self._update_possible_actions()
+        # update possible actions, hero may be first to act on a new stage
+        self._update_possible_actions()
 
         # return new state and reward (if any) for the agent to see
         return self._get_hero_state(), self.hero_reward, self.hand_over, self\
@@ -664,120 +687,73 @@ class HdPlayed(object):
         Method to reset environment by dealing a new hand, resetting stacks and 
         changing positions
         """
-        # update the hand count and change positions
-        self.hand_nb += 1
-        self.hero_is_big_blind = not self.hero_is_big_blind
-        if self.hero_is_big_blind:
-            self.playerBB = self.player_hero
-            self.playerSB = self.player_villain
-        else:
-            self.playerBB = self.player_villain
-            self.playerSB = self.player_hero
         # reset stacks
-        self.playerSB.reset_stack()
-        self.playerBB.reset_stack()
-        # deal a new hand
-        cards = Deck().deal_cards(9)
-        self.handBB = Hand([cards[0], cards[1]])
-        self.handSB = Hand([cards[2], cards[3]])
-        self.flop = [cards[4], cards[5], cards[6]]
-        self.turn = [cards[7]]
-        self.river = [cards[8]]        
-        # variables
-        self.stage_sequence = create_stage_generator()
-        self.pot_size = 0
-        self.hero_reward = 0
-        self.hand_over = False
-        self.someone_has_folded = False
-        self.someone_is_all_in = False
-        self.stage = ""
-        # betting round variables
-        self.imbalance_size = self.big_blind - self.small_blind
-        self.action_cycle = cycle([self.playerSB, self.playerBB])
-        self.is_action_on_bb_cycle = cycle([False, True])
-        self.nb_actions = 0
-        self.active_player = self.action_cycle.__next__()
-        self.is_action_on_bb = self.is_action_on_bb_cycle.__next__()
-        self.action_trail = ''
-        self.possible_actions = self._get_possible_actions()
-        # hand history objects
-        self.hand_history_BB, self.json_hand_hist_BB, self.state_BB = \
-            self._initialize_hand_history(self.playerBB)
-        self.hand_history_SB, self.json_hand_hist_SB, self.state_SB = \
-            self._initialize_hand_history(self.playerSB)
-        # active hand history
-        self.active_json_hist = self._get_active_json_hist()
-        
-    def _initialize_hand_history(self, player):
+        self.player_hero.reset_stack()
+        self.player_villain.reset_stack()
+        # deal a new hand, updating the hand count and changing positions
+        self.deal(not self.hero_is_big_blind, self.deck.deal_cards(9),
+                  self.hand_nb + 1)
+
+    def _start_event_log(self, cards):
         """
-        Initialize hand history for a given player
+        Start the event log of the hand
 
         Args:
-            player (subclass.Player): class object Player
+            cards (list): the nine Card objects dealt, hole cards of the big
+            blind then of the small blind, flop, turn and river
+        """
+        self.event_log.start(self.hand_nb, self.is_fixed_limit,
+                             self.big_blind, self.small_blind,
+                             (self.playerBB.name, self.playerSB.name),
+                             (self.playerBB.stack, self.playerSB.stack),
+                             cards, explain_showdown=self.explain_showdown)
 
-        Returns:
-            str_out (str): human readable hand history
-            json_out (dict): machine readable hand history
-            state_out (array): state of the environment in numerical format
+    def _initialize_state(self, state, player):
+        """
+        Initialize in place the state of the environment for a given player
+
+        Args:
+            state (np.ndarray): normalized float32 state of the environment,
+            of length 15
+            player (subclass.Player): class object Player
         """
         # check what position the player is in
         if player == self.playerBB:
             stack = self.playerBB.stack
             opponent_stack = self.playerSB.stack
-            position = "Big Blind"
+            position = 1
             private_cards = self.handBB.private_cards
-            simp_rep = self.handBB.get_simp_preflop_rep()
         else:
             stack = self.playerSB.stack
             opponent_stack = self.playerBB.stack
-            position = "Small Blind"
+            position = 0
             private_cards = self.handSB.private_cards
-            simp_rep = self.handSB.get_simp_preflop_rep()
-
-        if self.is_fixed_limit:
-            game_type = 'Fixed Limit Texas Hold-em'
-        else:
-            game_type = "No Limit Texas Hold-em"
-
-        str_out = "\n***** Hand #{} history\n".format(self.hand_nb) \
-                  + "User: {}\n".format(player.name) \
-                  + "Position: {}\n".format(position) \
-                  + "Game type: {}\n".format(game_type) \
-                  + "Stacks: {} ({}), {} ({})\n".format(self.playerBB.name,
-                                                        self.playerBB.stack,
-                                                        self.playerSB.name,
-                                                        self.playerSB.stack) \
-                  + "{} posts small blind({}) {} posts big " \
-                    "blind({})\n".format(self.playerSB.name, self.small_blind,
-                                         self.playerBB.name, self.big_blind) \
-                  + "***** Dealing private cards " \
-                    "to {}: {}\n".format(player.name, private_cards)
-
-        json_out = {'position': {position},
-                    'preflop': {'hole_cards': private_cards,
-                                'simp_rep': simp_rep},
-                    'community_cards': []}
 
         # STACKS - POSITION - CARDS, private&common - ACTION seq.- POT SIZE
-        state_out = [
-            stack,
-            opponent_stack,
-            0 if position == 'Small Blind' else 1,
-            private_cards[0].numerical_id,
-            private_cards[1].numerical_id,
-            0,
-            0,
-            0,
-            0,
-            0,
-            0,
-            0,
-            0,
-            0,
-            self.pot_size]
-
-        return str_out, json_out, state_out
-
-    def update_hand_histories(self, text):
-        self.hand_history_BB += text
-        self.hand_history_SB += text
+        state[0] = stack * self.chips_scale
+        state[1] = opponent_stack * self.chips_scale
+        state[2] = position
+        state[3] = private_cards[0].numerical_id / NB_CARDS
+        state[4] = private_cards[1].numerical_id / NB_CARDS
+        state[5:14] = 0
+        state[14] = self.pot_size * self.chips_scale
+
+    @property
+    def hand_history_BB(self):
+        """ Human-readable hand history seen from BB player """
+        return self.event_log.to_text(0)
+
+    @property
+    def hand_history_SB(self):
+        """ Human-readable hand history seen from SB player """
+        return self.event_log.to_text(1)
+
+    @property
+    def json_hand_hist_BB(self):
+        """ Hand history in json format seen from BB player """
+        return self.event_log.to_json(0)
+
+    @property
+    def json_hand_hist_SB(self):
+        """ Hand history in json format seen from SB player """
+        return self.event_log.to_json(1)
@@ -3,6 +3,7 @@ import random
 import logging
 
 from .handplayed import HandPlayed
+from .event_log import HandHistory
 from .deck import Deck
 
 logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
@@ -24,8 +25,8 @@ class HeadsUpGame(object):
         player_hero (subclass.Player): first player, our Hero
         player_villain (subclass.Player): second player, our Villain
         deck (class.Deck): 52-card deck
-        hero_game_history (list): game history object from the point of view of
-        our hero player
+        hero_game_history (list): HandHistory of each hand from the point of
+        view of our hero player, rendered when printed
     """
 
     def __init__(self, max_nb_hands, big_blind,
@@ -70,8 +71,9 @@ class HeadsUpGame(object):
                                           self.hand_number)
                 # start playing the hand given current attributes
                 current_hand.play()
-                logging.debug("{}".format(current_hand.hand_history_BB))
-                self.hero_game_history.append(current_hand.hand_history_BB)
+                history = HandHistory(current_hand.event_log, 0)
+                logging.debug("%s", history)
+                self.hero_game_history.append(history)
             else:
                 current_hand = HandPlayed(self.player_villain,
                                           self.player_hero,
@@ -81,8 +83,9 @@ class HeadsUpGame(object):
                                           self.hand_number)
                 # start playing the hand given current attributes
                 current_hand.play()
-                logging.debug("{}".format(current_hand.hand_history_SB))
-                self.hero_game_history.append(current_hand.hand_history_SB)
+                history = HandHistory(current_hand.event_log, 1)
+                logging.debug("%s", history)
+                self.hero_game_history.append(history)
             # check if one player is out of chips
             if self.player_hero.stack == 0:
                 logging.info('{} won the game'
@@ -20,18 +20,23 @@ class HuGame(object):
         big_blind (int): initial compulsory stake
         is_fixed_limit (bool): fixed limit game if True, no-limit if False
         hero_is_big_blind (bool): randomly selected initial position
-        current_hand (HdPlayed): hand being played
+        current_hand (HdPlayed): hand being played, the same object being
+        re-dealt in place from one hand to the next
         hand_number (int): index to keep track of number of hands played
         player_hero (subclass.Player): first player, our Hero
         player_villain (subclass.Player): second player, our Villain
         deck (class.Deck): 52-card deck
         game_over (bool): boolean indicating if game is over
-        hero_game_history (list): game history object from the point of view of
-        our hero player
+        hero_game_history (list): HandHistory of each hand from the point of
+        view of our hero player, rendered when printed
+        explain_showdown (bool): whether hand histories detail the best
+        combination of each player at showdown, to be turned off for bulk
+        simulations
     """
 
     def __init__(self, max_nb_hands, big_blind,
-                 player_hero, player_villain, is_fixed_limit):
+                 player_hero, player_villain, is_fixed_limit,
+                 explain_showdown=True):
         """
         Instantiate a game object based on parameters and players' object
         e.g. HuGame(100, 10, RandomPlayer(100,"Joe"), FishPlayer(100,
@@ -41,6 +46,7 @@ class HuGame(object):
         self.max_nb_hands = max_nb_hands
         self.big_blind = big_blind
         self.is_fixed_limit = is_fixed_limit
+        self.explain_showdown = explain_showdown
         # initialising variables
         self.hero_is_big_blind = random.choice([True, False])
         self.hand_number = 0
@@ -54,7 +60,8 @@ class HuGame(object):
     def _deal_hand(self):
         """
         Method to draw nine cards randomly from deck, 5 common + 2 per player,
-        and create a HdPlayed object
+        and deal them to the HdPlayed object of the table, created on the
+        first hand and reset in place afterwards
 
         Returns:
              HdPlayed object
@@ -64,13 +71,19 @@ class HuGame(object):
         self.hero_is_big_blind = not self.hero_is_big_blind
         # draw nine cards randomly from deck, 5 common + 2 per player
         # current position determines which player plays big blind
-        return HdPlayed(self.hero_is_big_blind,
-                        self.player_hero,
-                        self.player_villain,
-                        self.big_blind,
-                        self.is_fixed_limit,
-                        self.deck.deal_cards(9),
-                        self.hand_number)
+        cards = self.deck.deal_cards(9)
+        if self.current_hand is None:
+            return HdPlayed(self.hero_is_big_blind,
+                            self.player_hero,
+                            self.player_villain,
+                            self.big_blind,
+                            self.is_fixed_limit,
+                            cards,
+                            self.hand_number,
+                            explain_showdown=self.explain_showdown)
+        self.current_hand.deal(self.hero_is_big_blind, cards,
+                               self.hand_number)
+        return self.current_hand
 
     def _is_game_over(self):
         """
@@ -98,26 +111,27 @@ class HuGame(object):
         self.player_villain.reset_stack()
         self.game_over = False
         self.hero_game_history = []
-        self.current_hand = None
 
     def step(self, action):
         """
         Method to take a step into the game for the agent
 
         Args:
-            action (str): action selected by agent
+            action (int): code in ACTIONS of the action selected by agent,
+            its name being accepted as well
 
         Returns:
             next_state (array): numerical representation of environment
             reward (int): numerical reward
             game_over (bool): indicating if game is over
             hand_done (bool): indicating if hand is done
-            info (object): hand histories for debugging purposes
+            info (object): hand histories for debugging purposes, only valid
+            until the next hand is dealt
         """
         next_state, reward, hand_done, info = self.current_hand.step(action)
         if hand_done:
-            # adding hand history
-            self.hero_game_history.append(info)
+            # adding a copy of the hand history, the log being reused
+            self.hero_game_history.append(info.copy())
             # check if game is over
             self.game_over = self._is_game_over()
         return next_state, reward, self.game_over, hand_done, info
@@ -136,6 +150,6 @@ class HuGame(object):
         # get initial state from it
         state, hand_done, info = self.current_hand.initial_step()
         if hand_done:
-            # adding hand history
-            self.hero_game_history.append(info)
+            # adding a copy of the hand history, the log being reused
+            self.hero_game_history.append(info.copy())
         return state, hand_done
@@ -0,0 +1,440 @@
+import logging
+import numpy as np
+
+from ..hand_evaluation.evaluator import evaluate_batch
+from ..globals import SEQUENCE_ACTIONS_ID, NB_CARDS, MAX_SEQUENCE_ID, \
+    CHECK, CALL, BET, RAISE, ALL_IN, FOLD
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+# actions of the agent, as translated by run_games
+PASSIVE, AGGRESSIVE, FOLD_OR_CHECK = range(3)
+
+# id of each action sequence followed by a check/call, a bet/raise or a fold,
+# -1 if the sequence cannot happen
+_SEQUENCES = {action_id: sequence
+              for sequence, action_id in SEQUENCE_ACTIONS_ID.items()}
+NEXT_SEQUENCE_ID = np.array(
+    [[SEQUENCE_ACTIONS_ID.get(_SEQUENCES[action_id] + symbol, -1)
+      for symbol in ('C', 'B', 'F')]
+     for action_id in range(len(SEQUENCE_ACTIONS_ID))], dtype=np.int64)
+
+# symbol of each move in action sequences, 0 for C, 1 for B, 2 for F
+_MOVE_SYMBOLS = np.array([0, 0, 1, 1, 0, 2], dtype=np.int64)
+
+
+def fish_policy(observations, legal_actions):
+    """
+    Vectorized policy of FishPlayer, which always checks or calls
+
+    Args:
+        observations (np.ndarray): observations of the players, [n, 15]
+        legal_actions (np.ndarray): legal-action masks of the players, [n, 3]
+
+    Returns:
+        (np.ndarray): actions of the players, [n]
+    """
+    del legal_actions
+    return np.full(len(observations), PASSIVE, dtype=np.int64)
+
+
+class VecHuGame(object):
+    """
+    Vectorized environment running many independent fixed-limit heads-up
+    games in lockstep, one per table, the whole state of the tables being
+    held in NumPy arrays. It plays the same rules as HuGame with HdPlayed
+    hands, the villain acting through a vectorized policy.
+
+    Each step takes one action of the agent per table among PASSIVE (check
+    or call), AGGRESSIVE (bet or raise) and FOLD_OR_CHECK (fold, or check
+    when free), translated as in run_games. Tables whose hand is over are
+    dealt a new hand right away, hands the villain folds before the agent
+    acts being played through, and games are started over once max_nb_hands
+    hands have been played or a player is out of chips.
+
+    Attributes:
+        nb_tables (int): number of tables played in lockstep
+        max_nb_hands (int): maximum number of hands of a game
+        big_blind (int): initial compulsory stake
+        small_blind (int): second initial compulsory stake
+        starting_stack (int): stack of both players at the start of a game
+        villain_policy (callable): vectorized policy of the villain, mapping
+        observations and legal-action masks of its tables to actions
+        rng (np.random.Generator): random generator dealing the cards
+        stacks (np.ndarray): stacks of hero and villain, [nb_tables, 2]
+        hero_is_big_blind (np.ndarray): position of hero on each table
+        hand_number (np.ndarray): number of hands played in current game
+        cards (np.ndarray): card ids of each table, hole cards of the big
+        blind then of the small blind, flop, turn and river, [nb_tables, 9]
+        stages (np.ndarray): stage of each hand, 0 for pre-flop up to 4 for
+        showdown
+        pots (np.ndarray): size of the pot on each table
+        imbalances (np.ndarray): amount to call on each table
+        nb_actions (np.ndarray): number of actions in current betting round
+        sequences (np.ndarray): action sequence id of each betting round,
+        [nb_tables, 4]
+        is_action_on_hero (np.ndarray): whether hero is the active player
+        someone_is_all_in (np.ndarray): whether a player is all-in
+        hand_over (np.ndarray): whether the hand is over
+        games_over (np.ndarray): whether the game of a table was over and
+        started over during the last step
+        final_observations (np.ndarray): observations of hero on each table
+        at the end of the last step, before new hands were dealt
+    """
+
+    def __init__(self, nb_tables, max_nb_hands, big_blind, starting_stack,
+                 villain_policy=None, seed=None):
+        """
+        Instantiate the tables, to be started with reset
+        e.g. VecHuGame(256, 100, 20, 1000)
+        """
+        self.nb_tables = nb_tables
+        self.max_nb_hands = max_nb_hands
+        self.big_blind = big_blind
+        self.small_blind = int(big_blind / 2)
+        self.starting_stack = starting_stack
+        self.villain_policy = fish_policy if villain_policy is None \
+            else villain_policy
+        self.rng = np.random.default_rng(seed)
+        self.stacks = np.zeros((nb_tables, 2), dtype=np.int64)
+        self.hero_is_big_blind = np.zeros(nb_tables, dtype=bool)
+        self.hand_number = np.zeros(nb_tables, dtype=np.int64)
+        self.cards = np.zeros((nb_tables, 9), dtype=np.int64)
+        self.stages = np.zeros(nb_tables, dtype=np.int64)
+        self.pots = np.zeros(nb_tables, dtype=np.int64)
+        self.imbalances = np.zeros(nb_tables, dtype=np.int64)
+        self.nb_actions = np.zeros(nb_tables, dtype=np.int64)
+        self.sequences = np.zeros((nb_tables, 4), dtype=np.int64)
+        self.is_action_on_hero = np.zeros(nb_tables, dtype=bool)
+        self.someone_is_all_in = np.zeros(nb_tables, dtype=bool)
+        self.hand_over = np.zeros(nb_tables, dtype=bool)
+        self.games_over = np.zeros(nb_tables, dtype=bool)
+        self.final_observations = np.zeros((nb_tables, 15), dtype=np.float32)
+
+    def reset(self):
+        """
+        Start a new game on every table
+
+        Returns:
+            observations (np.ndarray): observations of hero, [nb_tables, 15]
+            legal_actions (np.ndarray): legal-action masks of hero,
+            [nb_tables, 3]
+        """
+        tables = np.arange(self.nb_tables)
+        self.hero_is_big_blind[:] = self.rng.random(self.nb_tables) < 0.5
+        self.games_over[:] = False
+        self._start_games(tables)
+        self._deal_until_hero_acts(tables)
+        return self.observe(tables), self.legal_actions(tables)
+
+    def step(self, actions):
+        """
+        Apply one action of hero per table, let the villain answer, and deal
+        new hands on tables whose hand is over
+
+        Args:
+            actions (np.ndarray): actions of hero, [nb_tables], among
+            PASSIVE, AGGRESSIVE and FOLD_OR_CHECK
+
+        Returns:
+            observations (np.ndarray): observations of hero, [nb_tables, 15],
+            in the new hand on tables whose hand is over
+            rewards (np.ndarray): rewards of hero, [nb_tables]
+            dones (np.ndarray): whether the hand of a table is over
+            legal_actions (np.ndarray): legal-action masks of hero,
+            [nb_tables, 3]
+        """
+        tables = np.arange(self.nb_tables)
+        rewards = np.zeros(self.nb_tables)
+        self._apply_moves(tables, self._to_moves(tables, np.asarray(actions)),
+                          rewards)
+        self._play_villain(rewards)
+        dones = self.hand_over.copy()
+        self.final_observations[:] = self.observe(tables)
+        self.games_over[:] = False
+        done_tables = np.flatnonzero(dones)
+        if len(done_tables):
+            self._deal_until_hero_acts(done_tables)
+        return self.observe(tables), rewards, dones, \
+            self.legal_actions(tables)
+
+    def observe(self, tables, of_hero=True):
+        """
+        Observations of a player on some tables, laid out and normalized as
+        the states of HdPlayed: STACKS - POSITION - CARDS, private&common -
+        ACTION seq. - POT SIZE, with 0 for cards not seen yet
+
+        Args:
+            tables (np.ndarray): indices of the tables
+            of_hero (bool): observations of hero if True, of villain if False
+
+        Returns:
+            (np.ndarray): float32 observations, [len(tables), 15]
+        """
+        player = 0 if of_hero else 1
+        is_big_blind = self.hero_is_big_blind[tables] == of_hero
+        cards = self.cards[tables]
+        chips_scale = 1 / (2 * self.starting_stack)
+        observations = np.zeros((len(tables), 15), dtype=np.float32)
+        observations[:, 0] = self.stacks[tables, player] * chips_scale
+        observations[:, 1] = self.stacks[tables, 1 - player] * chips_scale
+        observations[:, 2] = is_big_blind
+        # card numerical ids are card ids + 1
+        observations[:, 3:5] = np.where(is_big_blind[:, None],
+                                        cards[:, 0:2], cards[:, 2:4]) + 1
+        stages = self.stages[tables, None]
+        observations[:, 5:8] = (cards[:, 4:7] + 1) * (stages >= 1)
+        observations[:, 8] = (cards[:, 7] + 1) * (stages[:, 0] >= 2)
+        observations[:, 9] = (cards[:, 8] + 1) * (stages[:, 0] >= 3)
+        observations[:, 3:10] /= NB_CARDS
+        observations[:, 10:14] = self.sequences[tables] / MAX_SEQUENCE_ID
+        observations[:, 14] = self.pots[tables] * chips_scale
+        return observations
+
+    def legal_actions(self, tables):
+        """
+        Legal-action masks of the active player on some tables, an action
+        being legal when it is not translated into another one: AGGRESSIVE
+        when a bet or a raise is possible, FOLD_OR_CHECK when facing a bet
+
+        Args:
+            tables (np.ndarray): indices of the tables
+
+        Returns:
+            (np.ndarray): boolean masks, [len(tables), 3]
+        """
+        free, short, capped = self._betting_context(tables)
+        masks = np.ones((len(tables), 3), dtype=bool)
+        masks[:, AGGRESSIVE] = free | (~short & ~capped)
+        masks[:, FOLD_OR_CHECK] = ~free
+        return masks
+
+    def _active_player(self, tables):
+        """ Column of the active player in stacks, 0 for hero """
+        return np.where(self.is_action_on_hero[tables], 0, 1)
+
+    def _betting_context(self, tables):
+        """
+        Whether the active player can check, can only go all-in to call,
+        and cannot raise any more
+
+        Args:
+            tables (np.ndarray): indices of the tables
+
+        Returns:
+            (np.ndarray): free to check, nothing to call
+            (np.ndarray): amount to call is not below the stack
+            (np.ndarray): raising is capped, or someone is all-in
+        """
+        imbalances = self.imbalances[tables]
+        stacks = self.stacks[tables, self._active_player(tables)]
+        free = imbalances == 0
+        short = ~free & (imbalances >= stacks)
+        capped = self.someone_is_all_in[tables] | \
+            (self.nb_actions[tables] >= 4)
+        return free, short, capped
+
+    def _to_moves(self, tables, actions):
+        """
+        Translate actions of the active player into moves, as run_games does
+
+        Args:
+            tables (np.ndarray): indices of the tables
+            actions (np.ndarray): PASSIVE, AGGRESSIVE or FOLD_OR_CHECK
+
+        Returns:
+            (np.ndarray): codes of ACTIONS
+        """
+        free, short, capped = self._betting_context(tables)
+        passive = np.where(free, CHECK, np.where(short, ALL_IN, CALL))
+        aggressive = np.where(free, BET, np.where(
+            short, ALL_IN, np.where(capped, CALL, RAISE)))
+        fold = np.where(free, CHECK, FOLD)
+        return np.choose(actions, [passive, aggressive, fold])
+
+    def _apply_moves(self, tables, moves, rewards):
+        """
+        Enforce the moves of the active player on some tables, then move on
+        to the next player, stage or hand
+
+        Args:
+            tables (np.ndarray): indices of the tables
+            moves (np.ndarray): codes of ACTIONS
+            rewards (np.ndarray): rewards of hero of all tables, updated
+            when hands are over
+        """
+        player = self._active_player(tables)
+        stacks = self.stacks[tables, player]
+        imbalances = self.imbalances[tables]
+        big_blind = self.big_blind
+
+        # amount put into the pot
+        bet_sizes = np.where(self.stages[tables] >= 2, 2 * big_blind,
+                             big_blind)
+        amounts = np.zeros(len(tables), dtype=np.int64)
+        amounts[moves == CALL] = imbalances[moves == CALL]
+        amounts = np.where(moves == BET, np.minimum(bet_sizes, stacks),
+                           amounts)
+        amounts = np.where(moves == RAISE, imbalances + np.minimum(
+            np.maximum(imbalances, big_blind), stacks - imbalances), amounts)
+        amounts = np.where(moves == ALL_IN, np.where(
+            self.someone_is_all_in[tables], np.minimum(stacks, imbalances),
+            stacks), amounts)
+        self.stacks[tables, player] = stacks - amounts
+        self.pots[tables] += amounts
+        betting = (moves == BET) | (moves == RAISE) | (moves == ALL_IN)
+        self.someone_is_all_in[tables] |= betting & (stacks == amounts)
+
+        # amount left to call, the first mover getting back what the other
+        # player could not cover
+        new_imbalances = np.where(betting, amounts - imbalances,
+                                  np.where(moves == CALL, 0, imbalances))
+        uncovered = np.minimum(new_imbalances, 0)
+        self.stacks[tables, 1 - player] -= uncovered
+        self.pots[tables] += uncovered
+        self.imbalances[tables] = new_imbalances - uncovered
+
+        # action sequence of the betting round
+        stages = np.minimum(self.stages[tables], 3)
+        sequence_ids = NEXT_SEQUENCE_ID[self.sequences[tables, stages],
+                                        _MOVE_SYMBOLS[moves]]
+        assert (sequence_ids >= 0).all(), \
+            "Unknown sequence of actions in a betting round"
+        self.sequences[tables, stages] = sequence_ids
+        self.nb_actions[tables] += 1
+
+        # folds, the pot going to the other player
+        folded = moves == FOLD
+        if folded.any():
+            fold_tables = tables[folded]
+            winners = 1 - player[folded]
+            self.stacks[fold_tables, winners] += self.pots[fold_tables]
+            rewards[fold_tables] = np.where(winners == 0, 1, -1) * \
+                (self.pots[fold_tables] - imbalances[folded]) / 2
+            self.hand_over[fold_tables] = True
+
+        # both all-in, or betting round over, or next player
+        runout = ~folded & self.someone_is_all_in[tables] & \
+            (self.imbalances[tables] == 0)
+        round_over = ~folded & ~runout & (self.nb_actions[tables] >= 2) & \
+            (self.imbalances[tables] == 0)
+        next_player = ~folded & ~runout & ~round_over
+        self.is_action_on_hero[tables[next_player]] = \
+            ~self.is_action_on_hero[tables[next_player]]
+        if round_over.any():
+            self._next_stage(tables[round_over])
+        showdown = runout | (round_over & (self.stages[tables] == 4))
+        if showdown.any():
+            self._showdown(tables[showdown], rewards)
+
+    def _next_stage(self, tables):
+        """ Move on to the next betting round, big blind acting first """
+        self.stages[tables] += 1
+        self.imbalances[tables] = 0
+        self.nb_actions[tables] = 0
+        self.is_action_on_hero[tables] = self.hero_is_big_blind[tables]
+
+    def _showdown(self, tables, rewards):
+        """
+        Run out the board and award the pot to the best hand, or split it
+
+        Args:
+            tables (np.ndarray): indices of the tables
+            rewards (np.ndarray): rewards of hero of all tables
+        """
+        self.stages[tables] = 4
+        cards = self.cards[tables]
+        strengths_bb = evaluate_batch(np.hstack([cards[:, 0:2],
+                                                 cards[:, 4:9]]))
+        strengths_sb = evaluate_batch(cards[:, 2:9])
+        # +1 if big blind wins, -1 if small blind wins, 0 if split
+        winner = np.sign(strengths_bb.astype(np.int64) - strengths_sb)
+        hero_sign = np.where(self.hero_is_big_blind[tables], winner, -winner)
+        pots = self.pots[tables]
+        self.stacks[tables, 0] += np.where(
+            hero_sign > 0, pots, np.where(hero_sign == 0, pots // 2, 0))
+        self.stacks[tables, 1] += np.where(
+            hero_sign < 0, pots, np.where(hero_sign == 0, pots // 2, 0))
+        rewards[tables] = hero_sign * (pots - self.imbalances[tables]) / 2
+        self.hand_over[tables] = True
+
+    def _start_games(self, tables):
+        """ Reset stacks and hand count of some tables for a new game """
+        self.stacks[tables] = self.starting_stack
+        self.hand_number[tables] = 0
+
+    def _deal(self, tables):
+        """
+        Deal a new hand on some tables, changing positions and posting the
+        blinds, the small blind acting first
+        """
+        self.hand_number[tables] += 1
+        self.hero_is_big_blind[tables] = ~self.hero_is_big_blind[tables]
+        # nine distinct cards per table
+        self.cards[tables] = np.argsort(
+            self.rng.random((len(tables), 52)), axis=1)[:, :9]
+        self.stages[tables] = 0
+        self.pots[tables] = 0
+        self.nb_actions[tables] = 0
+        self.sequences[tables] = 0
+        self.someone_is_all_in[tables] = False
+        self.hand_over[tables] = False
+        self.is_action_on_hero[tables] = ~self.hero_is_big_blind[tables]
+
+        # blinds, a player not covering its blind being all-in
+        bb_player = np.where(self.hero_is_big_blind[tables], 0, 1)
+        bb_stacks = self.stacks[tables, bb_player]
+        sb_stacks = self.stacks[tables, 1 - bb_player]
+        short_sb = sb_stacks <= self.small_blind
+        short_bb = ~short_sb & (bb_stacks <= self.big_blind)
+        sb_posts = np.where(short_sb, np.minimum(sb_stacks, bb_stacks),
+                            np.minimum(self.small_blind, bb_stacks))
+        bb_posts = np.where(short_sb, sb_posts,
+                            np.where(short_bb, np.maximum(bb_stacks, sb_posts),
+                                     self.big_blind))
+        self.stacks[tables, bb_player] -= bb_posts
+        self.stacks[tables, 1 - bb_player] -= sb_posts
+        self.pots[tables] = bb_posts + sb_posts
+        self.imbalances[tables] = bb_posts - sb_posts
+        self.someone_is_all_in[tables] = short_sb | short_bb
+
+    def _deal_until_hero_acts(self, tables):
+        """
+        Deal new hands on some tables, starting games over when needed, until
+        hero has an action to take on each of them. Hands over before hero
+        acts, e.g. villain folding its small blind, are not rewarded to the
+        agent, as in run_games, but their chips change hands.
+        """
+        rewards = np.zeros(self.nb_tables)
+        while len(tables):
+            games_over = (self.hand_number[tables] >= self.max_nb_hands) | \
+                (self.stacks[tables] == 0).any(axis=1)
+            self.games_over[tables[games_over]] = True
+            self._start_games(tables[games_over])
+            self._deal(tables)
+            # both all-in from the blinds
+            runout = self.someone_is_all_in[tables] & \
+                (self.imbalances[tables] == 0)
+            if runout.any():
+                self._showdown(tables[runout], rewards)
+            self._play_villain(rewards)
+            tables = tables[self.hand_over[tables]]
+
+    def _play_villain(self, rewards):
+        """
+        Let the villain act on every table where it is its turn, until it is
+        hero's turn or the hand is over
+
+        Args:
+            rewards (np.ndarray): rewards of hero of all tables
+        """
+        tables = np.flatnonzero(~self.hand_over & ~self.is_action_on_hero)
+        while len(tables):
+            actions = np.asarray(self.villain_policy(
+                self.observe(tables, of_hero=False),
+                self.legal_actions(tables)))
+            self._apply_moves(tables, self._to_moves(tables, actions),
+                              rewards)
+            tables = np.flatnonzero(~self.hand_over &
+                                    ~self.is_action_on_hero)
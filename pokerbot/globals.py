@@ -1,5 +1,4 @@
 
-import csv
 import os
 from itertools import islice
 
@@ -9,6 +8,11 @@ POKERBOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # File paths
 DATAFILES_DIR = os.path.join(POKERBOT_DIR, 'pokerbot', 'datafiles')
 MODELS_DIR = os.path.join(POKERBOT_DIR, 'pokerbot', 'agent', 'models')
+PREFLOP_EQUITY_FILE = os.path.join(DATAFILES_DIR, 'preflop_equity.npy')
+EVALUATOR_TABLE_FILE = os.path.join(DATAFILES_DIR, 'evaluator_{}.npy')
+BUCKETS_FILE = os.path.join(DATAFILES_DIR, 'buckets_{}.npy')
+FLOP_EQUITY_FILE = os.path.join(DATAFILES_DIR, 'flop_equity.npy')
+ISOMORPHISM_TABLE_FILE = os.path.join(DATAFILES_DIR, 'isomorphism_{}.npy')
 
 # come up with a list of all the straights possible with a 52-card deck
 STRAIGHTS = [set(islice(range(2, 15), k, k + 5, 1))
@@ -32,14 +36,8 @@ HUMAN_READABLE_RANKINGS = {1: "High card", 2: "One pair", 3: "Two pairs",
                            7: "Full house", 8: "Four of a kind",
                            9: "Straight flush"}
 
-# Probability that your private hand (two cards) will end up being the best
-# hand - from http://www.natesholdem.com/pre-flop-odds.php#Qx
-reader = csv.reader(open(os.path.join(DATAFILES_DIR,
-                                      'preflop_prob_best_hand_showdown.csv'), 'r'))
-PRE_FLOP_WINNING_PROB = {}
-for row in reader:
-    k, v = row
-    PRE_FLOP_WINNING_PROB[k] = float(v)
+# number of ranks needed to break ties between hands of the same ranking
+TIEBREAKER_LENGTHS = {1: 5, 2: 4, 3: 3, 4: 3, 5: 1, 6: 5, 7: 2, 8: 2, 9: 1}
 
 # sequence of actions Id
 SEQUENCE_ACTIONS_ID = {
@@ -69,3 +67,19 @@ SEQUENCE_ACTIONS_ID = {
     "CBBBF": 23,
     "CBBBC": 24,
 }
+
+# normalization of states, card numerical ids and action sequence ids being
+# divided by their maximum
+NB_CARDS = 52
+MAX_SEQUENCE_ID = max(SEQUENCE_ACTIONS_ID.values())
+
+# actions a player can take, in the order of their integer codes
+ACTIONS = ('check', 'call', 'bet', 'raise', 'all-in', 'fold')
+ACTION_IDS = {action: code for code, action in enumerate(ACTIONS)}
+CHECK, CALL, BET, RAISE, ALL_IN, FOLD = range(len(ACTIONS))
+
+# names of the legal actions of each legal-action bitmask, bit i being set
+# when action of code i is legal, as shown to players
+ACTIONS_BY_MASK = tuple([action for code, action in enumerate(ACTIONS)
+                         if mask >> code & 1]
+                        for mask in range(1 << len(ACTIONS)))
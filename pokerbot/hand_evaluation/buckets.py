@@ -0,0 +1,520 @@
+import os
+import logging
+import multiprocessing
+import numpy as np
+
+from .equity_cache import EquityCache
+from .evaluator import _get_array_tables
+from .hand_potential import enumerate_outcomes
+from .isomorphism import HOLE_COMBOS, COMBO_INDEX, PERMUTED_CARDS, \
+    BINOMIALS, NB_CANONICAL_TURNS, NB_CANONICAL_TURN_HANDS, hand_index, \
+    _build_board_tables, _get_flop_tables, _get_turn_tables
+from .preflop import COMBO_CLASSES, CLASS_SIZES, NB_PREFLOP_CLASSES
+from .river_index import RiverIndex
+from ..flow_control.card import CARDS
+from ..globals import BUCKETS_FILE
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+# Card abstraction: every situation of a street is mapped to one of K
+# buckets, bucket 0 holding the weakest situations and bucket K - 1 the
+# strongest
+# - pre flop, flop and turn: situations are clustered by the distribution
+# of their equity against a random hand one card later (the river equity
+# for a turn situation, the turn equity over the next card on the flop,
+# the flop equity pre flop), so that made hands and draws of the same
+# average strength fall into different buckets
+# - river: no card is left to come, situations are split into buckets of
+# equal frequency by their equity at showdown (expected hand strength)
+
+# number of buckets of the shipped tables
+NB_BUCKETS = 8
+
+# number of bins of the equity histograms over [0, 1]
+NB_EQUITY_BINS = 20
+
+# maximum number of Lloyd iterations of k-means, and relative decrease of
+# the inertia under which it stops
+NB_KMEANS_ITERATIONS = 50
+KMEANS_TOLERANCE = 1e-5
+
+# number of histograms drawn to seed k-means, and number of histograms
+# assigned per task of the process pool
+NB_SEEDING_SAMPLES = 20000
+KMEANS_CHUNK_SIZE = 500000
+
+# number of random situations sampled to place river boundaries
+NB_BOUNDARY_SAMPLES = 50000
+
+# number of river equities kept by bucket_id
+NB_CACHED_EQUITIES = 100000
+
+# streets of the tables of bucket ids, by number of board cards
+TABLE_STREETS = {0: 'preflop', 3: 'flop', 4: 'turn'}
+
+# lazily loaded bucket tables
+_BUCKETS = {}
+
+# exact river equities, ties counting for half, computed by bucket_id
+_EQUITY_CACHE = EquityCache(max_size=NB_CACHED_EQUITIES)
+
+
+def _equity_histograms(equities, valid):
+    """
+    Histogram and mean of the equities of situations over the outcomes of
+    the next card
+
+    Args:
+        equities (np.ndarray): equity of each situation after each next card,
+        shape [nb next cards, nb situations]
+        valid (np.ndarray): whether the next card can be dealt in each
+        situation, same shape
+
+    Returns:
+        (np.ndarray): number of next cards in each equity bin, shape
+        [nb situations, NB_EQUITY_BINS]
+        (np.ndarray): mean equity of each situation over the next cards
+    """
+    equities = np.where(valid, equities, 0)
+    bins = np.minimum((equities * NB_EQUITY_BINS).astype(np.int64),
+                      NB_EQUITY_BINS - 1)
+    nb_situations = equities.shape[1]
+    keys = np.arange(nb_situations) * NB_EQUITY_BINS + bins
+    histograms = np.bincount(keys[valid],
+                             minlength=nb_situations * NB_EQUITY_BINS)\
+        .reshape(nb_situations, NB_EQUITY_BINS)
+    return histograms, equities.sum(axis=0) / valid.sum(axis=0)
+
+
+def _turn_histograms(turn_idx):
+    """
+    Histogram of the river equities of every situation of a canonical turn,
+    every river being evaluated for all combos at once
+
+    Args:
+        turn_idx (int): canonical turn index in [0-16431]
+
+    Returns:
+        (np.ndarray): uint8 number of rivers in each equity bin, shape
+        [nb situations of the turn, NB_EQUITY_BINS]
+        (np.ndarray): equity of each situation, ties counting for half
+    """
+    tables = _get_turn_tables()
+    turn = tables['boards'][turn_idx].tolist()
+    start, end = tables['offsets'][turn_idx:turn_idx + 2]
+    combos = tables['situation_combos'][start:end].astype(np.int64)
+    rivers = np.array([card_id for card_id in range(52)
+                       if card_id not in turn])
+    equities = np.zeros((len(rivers), len(combos)))
+    for river_idx, river in enumerate(rivers.tolist()):
+        wins, ties, available = RiverIndex(turn + [river]).range_outcomes()
+        equities[river_idx] = (wins[combos] + ties[combos] / 2) / \
+            np.maximum(available[combos], 1)
+    valid = (HOLE_COMBOS[combos] != rivers[:, None, None]).all(axis=2)
+    histograms, means = _equity_histograms(equities, valid)
+    return histograms.astype(np.uint8), means
+
+
+def _flop_histograms(turn_equities, turn_local_index):
+    """
+    Histogram of the turn equities of every flop situation, over the next
+    card
+
+    Args:
+        turn_equities (np.ndarray): equity of each turn situation
+        turn_local_index (np.ndarray): local index of the turn situations,
+        see _build_board_tables
+
+    Returns:
+        (np.ndarray): uint8 number of turn cards in each equity bin, shape
+        [1286792, NB_EQUITY_BINS]
+        (np.ndarray): equity of each flop situation
+    """
+    flop_tables = _get_flop_tables()
+    turn_tables = _get_turn_tables()
+    histograms = np.zeros((flop_tables['offsets'][-1], NB_EQUITY_BINS),
+                          dtype=np.uint8)
+    equities = np.zeros(flop_tables['offsets'][-1])
+    for flop_idx, flop in enumerate(flop_tables['boards'].tolist()):
+        start, end = flop_tables['offsets'][flop_idx:flop_idx + 2]
+        cards = HOLE_COMBOS[flop_tables['situation_combos'][start:end]]
+        next_cards = [card_id for card_id in range(52) if card_id not in flop]
+        turns = np.sort(np.column_stack(
+            [np.tile(flop, (len(next_cards), 1)), next_cards]), axis=1)
+        turn_idx, permutation_idx = turn_tables['index'][
+            BINOMIALS[turns, np.arange(1, 5)].sum(axis=1)].T.astype(np.int64)
+        # hole cards in the frame of the canonical turn
+        permuted = PERMUTED_CARDS[permutation_idx[:, None, None], cards]
+        local_index = turn_local_index[
+            turn_idx[:, None], COMBO_INDEX[permuted[..., 0], permuted[..., 1]]]
+        valid = local_index >= 0
+        next_equities = turn_equities[
+            turn_tables['offsets'][turn_idx][:, None] + local_index]
+        histograms[start:end], equities[start:end] = _equity_histograms(
+            next_equities, valid)
+    return histograms, equities
+
+
+def _preflop_histograms(flop_equities, flop_weights):
+    """
+    Histogram of the flop equities of every pre flop class, over the flops
+
+    Args:
+        flop_equities (np.ndarray): equity of each flop situation
+        flop_weights (np.ndarray): number of (hole cards, flop) pairs each
+        flop situation stands for
+
+    Returns:
+        (np.ndarray): weighted histograms, shape [169, NB_EQUITY_BINS]
+        (np.ndarray): equity of each class
+    """
+    tables = _get_flop_tables()
+    # pairs of a flop situation stand for combos of the same class
+    classes = COMBO_CLASSES[tables['situation_combos'][:].astype(np.int64)]
+    bins = np.minimum((flop_equities * NB_EQUITY_BINS).astype(np.int64),
+                      NB_EQUITY_BINS - 1)
+    histograms = np.bincount(classes * NB_EQUITY_BINS + bins,
+                             weights=flop_weights,
+                             minlength=NB_PREFLOP_CLASSES * NB_EQUITY_BINS)\
+        .reshape(NB_PREFLOP_CLASSES, NB_EQUITY_BINS)
+    equities = np.bincount(classes, weights=flop_weights * flop_equities,
+                           minlength=NB_PREFLOP_CLASSES) / \
+        np.bincount(classes, weights=flop_weights,
+                    minlength=NB_PREFLOP_CLASSES)
+    return histograms, equities
+
+
+def _situation_weights(tables, local_index):
+    """
+    Number of (hole cards, board) pairs each situation of a street stands
+    for
+
+    Args:
+        tables (dict): tables of the street, see _build_board_tables
+        local_index (np.ndarray): local index of its situations
+
+    Returns:
+        (np.ndarray): weight of each situation
+    """
+    orbit_sizes = np.bincount(tables['index'][:, 0],
+                              minlength=len(tables['boards']))
+    live = local_index >= 0
+    situations = (tables['offsets'][:-1, None] + local_index)[live]
+    return np.bincount(situations, weights=np.broadcast_to(
+        orbit_sizes[:, None], live.shape)[live],
+        minlength=tables['offsets'][-1])
+
+
+def _cumulative_distributions(histograms):
+    """
+    Cumulative distributions of histograms, the L2 distance between them
+    approximating the earth mover's distance between the histograms
+
+    Args:
+        histograms (np.ndarray): histograms, shape [N, nb bins]
+
+    Returns:
+        (np.ndarray): float64 cumulative distributions, shape [N, nb bins]
+    """
+    cumulative = np.cumsum(histograms, axis=1, dtype=np.float64)
+    return cumulative / cumulative[:, -1:]
+
+
+def _assign_clusters(task):
+    """
+    Nearest center of each histogram of a chunk, and the weighted sums
+    needed to move the centers
+
+    Args:
+        task (tuple): histograms of the chunk, their weights, and the
+        cumulative distributions of the centers
+
+    Returns:
+        (np.ndarray): index of the nearest center of each histogram
+        (np.ndarray): weighted sum of the cumulative distributions assigned
+        to each center, shape [nb centers, nb bins]
+        (np.ndarray): weight assigned to each center
+        (float): weighted squared distance of the histograms to their center
+    """
+    histograms, weights, centers = task
+    points = _cumulative_distributions(histograms)
+    distances = (points ** 2).sum(axis=1)[:, None] - \
+        2 * points.dot(centers.T) + (centers ** 2).sum(axis=1)
+    labels = distances.argmin(axis=1)
+    nb_centers = len(centers)
+    sums = np.stack([np.bincount(labels, weights=weights * points[:, column],
+                                 minlength=nb_centers)
+                     for column in range(points.shape[1])], axis=1)
+    inertia = weights.dot(np.maximum(
+        distances[np.arange(len(labels)), labels], 0))
+    return labels, sums, np.bincount(labels, weights=weights,
+                                     minlength=nb_centers), float(inertia)
+
+
+def cluster_histograms(histograms, weights, nb_clusters, seed=0, pool=None):
+    """
+    Weighted k-means of equity histograms, in L2 distance between their
+    cumulative distributions. Centers are seeded with k-means++ on a
+    weighted sample of the histograms, then moved by Lloyd iterations whose
+    assignment steps are spread over a pool of processes.
+
+    Args:
+        histograms (np.ndarray): histograms, shape [N, nb bins]
+        weights (np.ndarray): weight of each histogram
+        nb_clusters (int): number of clusters
+        seed (int): seed of the sampled centers
+        pool (multiprocessing.Pool): pool assigning the histograms, default
+        None assigns them in this process
+
+    Returns:
+        (np.ndarray): cluster of each histogram in [0, nb_clusters - 1]
+    """
+    random_state = np.random.RandomState(seed)
+    weights = np.asarray(weights, dtype=np.float64)
+    samples = _cumulative_distributions(histograms[random_state.choice(
+        len(histograms), NB_SEEDING_SAMPLES, p=weights / weights.sum())])
+    centers = [samples[random_state.randint(len(samples))]]
+    distances = ((samples - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, nb_clusters):
+        centers.append(samples[random_state.choice(
+            len(samples), p=distances / distances.sum())])
+        distances = np.minimum(distances,
+                               ((samples - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    chunks = [slice(start, start + KMEANS_CHUNK_SIZE)
+              for start in range(0, len(histograms), KMEANS_CHUNK_SIZE)]
+    previous_inertia = np.inf
+    for iteration in range(NB_KMEANS_ITERATIONS):
+        tasks = [(histograms[chunk], weights[chunk], centers)
+                 for chunk in chunks]
+        results = pool.map(_assign_clusters, tasks) if pool is not None \
+            else list(map(_assign_clusters, tasks))
+        labels = np.concatenate([result[0] for result in results])
+        sums = sum(result[1] for result in results)
+        cluster_weights = sum(result[2] for result in results)
+        inertia = sum(result[3] for result in results)
+        # empty clusters keep their center
+        filled = cluster_weights > 0
+        centers[filled] = sums[filled] / cluster_weights[filled, None]
+        logging.debug('k-means iteration {}, inertia {:.6g}'
+                      .format(iteration, inertia))
+        if previous_inertia - inertia <= KMEANS_TOLERANCE * inertia:
+            break
+        previous_inertia = inertia
+    return labels
+
+
+def _ordered_buckets(labels, equities, weights, nb_buckets):
+    """
+    Renumber clusters by increasing mean equity
+
+    Args:
+        labels (np.ndarray): cluster of each situation
+        equities (np.ndarray): equity of each situation
+        weights (np.ndarray): weight of each situation
+        nb_buckets (int): number of clusters
+
+    Returns:
+        (np.ndarray): uint8 bucket of each situation, the higher the
+        stronger
+    """
+    cluster_weights = np.bincount(labels, weights=weights,
+                                  minlength=nb_buckets)
+    mean_equities = np.bincount(labels, weights=weights * equities,
+                                minlength=nb_buckets) / \
+        np.maximum(cluster_weights, 1)
+    ranks = np.empty(nb_buckets, dtype=np.uint8)
+    ranks[np.argsort(mean_equities, kind='stable')] = np.arange(nb_buckets)
+    return ranks[labels]
+
+
+def _sampled_equity(task):
+    """
+    Exact equity against a random hand of a random situation
+
+    Args:
+        task (tuple): number of board cards and seed of the situation
+
+    Returns:
+        (float): equity, ties counting for half
+    """
+    nb_board_cards, seed = task
+    card_ids = np.random.RandomState(seed).choice(52, 2 + nb_board_cards,
+                                                  replace=False)
+    cards = [CARDS[card_id] for card_id in card_ids.tolist()]
+    win, tie, _ = enumerate_outcomes(cards[:2], cards[2:])
+    return win + tie / 2
+
+
+def sample_boundaries(nb_board_cards, nb_buckets=NB_BUCKETS,
+                      nb_samples=NB_BOUNDARY_SAMPLES, seed=0, pool=None):
+    """
+    Boundaries between equal-frequency buckets of the equity of a street
+    too large to tabulate, placed on the exact equities of randomly sampled
+    situations
+
+    Args:
+        nb_board_cards (int): 4 for the turn, 5 for the river
+        nb_buckets (int): number of buckets
+        nb_samples (int): number of situations sampled
+        seed (int): seed of the sampled situations
+        pool (multiprocessing.Pool): pool computing the equities, default
+        None computes them in this process
+
+    Returns:
+        (np.ndarray): nb_buckets - 1 increasing boundaries
+    """
+    seeds = np.random.SeedSequence([seed, nb_board_cards]).generate_state(
+        nb_samples)
+    tasks = [(nb_board_cards, int(sample_seed)) for sample_seed in seeds]
+    sampled_equities = pool.map(_sampled_equity, tasks, chunksize=100) \
+        if pool is not None else list(map(_sampled_equity, tasks))
+    return np.quantile(sampled_equities,
+                       np.arange(1, nb_buckets) / nb_buckets)
+
+
+def build_bucket_tables(nb_buckets=NB_BUCKETS, nb_workers=None,
+                        nb_boundary_samples=NB_BOUNDARY_SAMPLES, seed=0):
+    """
+    Compute the bucket of every situation, spreading the work over a pool
+    of processes
+    - turn: every river of the 16,432 canonical turns is evaluated, giving
+    the histogram of river equities of each of the 13,960,050 canonical
+    (hole cards, turn) situations
+    - flop: histogram of the turn equities of each of the 1,286,792
+    canonical (hole cards, flop) situations over the turn cards
+    - pre flop: histogram of the flop equities of each of the 169 classes
+    over the flops
+    - the histograms of each street are clustered with k-means, weighted by
+    the number of situations they stand for, and clusters are numbered by
+    increasing equity
+    - river: boundaries between buckets of equal frequency, placed on the
+    exact equities of randomly sampled situations, since the river is too
+    large to tabulate
+
+    Args:
+        nb_buckets (int): number of buckets per street, at most 256
+        nb_workers (int): number of processes, default None uses all cores
+        nb_boundary_samples (int): number of situations sampled to place
+        river boundaries
+        seed (int): seed of k-means and of the sampled situations
+
+    Returns:
+        (dict): 'preflop', 'flop' and 'turn' uint8 bucket ids, in the order
+        of hand_index, and 'river' boundaries, nb_buckets - 1 equities
+    """
+    assert 2 <= nb_buckets <= 256, \
+        "Number of buckets must be in [2-256], {} was passed on" \
+        .format(nb_buckets)
+    # build shared tables once, forked workers inherit them
+    flop_tables = _get_flop_tables()
+    turn_tables = _get_turn_tables()
+    turn_local_index = _build_board_tables(4)['local_index']
+    _get_array_tables()
+    with multiprocessing.Pool(nb_workers) as pool:
+        turn_histograms = np.zeros((NB_CANONICAL_TURN_HANDS, NB_EQUITY_BINS),
+                                   dtype=np.uint8)
+        turn_equities = np.zeros(NB_CANONICAL_TURN_HANDS)
+        for turn_idx, (histograms, equities) in enumerate(pool.imap(
+                _turn_histograms, range(NB_CANONICAL_TURNS), chunksize=16)):
+            start, end = turn_tables['offsets'][turn_idx:turn_idx + 2]
+            turn_histograms[start:end] = histograms
+            turn_equities[start:end] = equities
+            if turn_idx % 1000 == 0:
+                logging.info('{} turns out of {} run out'
+                             .format(turn_idx, NB_CANONICAL_TURNS))
+        flop_histograms, flop_equities = _flop_histograms(turn_equities,
+                                                          turn_local_index)
+        flop_weights = _situation_weights(flop_tables,
+                                          flop_tables['local_index'])
+        preflop_histograms, preflop_equities = _preflop_histograms(
+            flop_equities, flop_weights)
+        turn_weights = _situation_weights(turn_tables, turn_local_index)
+        del turn_local_index
+
+        bucket_tables = {}
+        for street, histograms, equities, weights in (
+                ('preflop', preflop_histograms, preflop_equities,
+                 CLASS_SIZES.astype(np.float64)),
+                ('flop', flop_histograms, flop_equities, flop_weights),
+                ('turn', turn_histograms, turn_equities, turn_weights)):
+            logging.info('Clustering {} situations'.format(street))
+            labels = cluster_histograms(histograms, weights, nb_buckets,
+                                        seed, pool)
+            bucket_tables[street] = _ordered_buckets(labels, equities,
+                                                     weights, nb_buckets)
+        bucket_tables['river'] = sample_boundaries(
+            5, nb_buckets, nb_boundary_samples, seed, pool).astype(np.float32)
+    return bucket_tables
+
+
+def save_bucket_tables(bucket_tables, bucket_file=BUCKETS_FILE):
+    """
+    Store bucket tables as .npy files, one per table
+
+    Args:
+        bucket_tables (dict): tables as returned by build_bucket_tables
+        bucket_file (str): path template of the files, formatted with the
+        table name, default is the shipped datafiles
+    """
+    for name, table in bucket_tables.items():
+        np.save(bucket_file.format(name), table)
+    _BUCKETS.clear()
+
+
+def load_bucket_tables():
+    """
+    Returns the shipped bucket tables, memory-mapped on first use
+
+    Returns:
+        (dict): 'preflop', 'flop' and 'turn' bucket ids, and 'river'
+        boundaries
+    """
+    if not _BUCKETS:
+        for name in ('preflop', 'flop', 'turn', 'river'):
+            path = BUCKETS_FILE.format(name)
+            if not os.path.exists(path):
+                raise IOError('Bucket table {} not found, build it with '
+                              'python -m pokerbot.hand_evaluation.buckets'
+                              .format(path))
+            _BUCKETS[name] = np.load(path, mmap_mode='r')
+    return _BUCKETS
+
+
+def bucket_id(hole_cards, community_cards=None):
+    """
+    Bucket of a situation, a table lookup pre flop, on the flop and on the
+    turn. The river is not tabulated: the exact equity of the situation is
+    computed on the fly, cached by canonical situation, and searched among
+    the river boundaries.
+
+    Args:
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of Card objects, representing board
+        cards, default is an empty list
+
+    Returns:
+        (int): bucket id in [0, NB_BUCKETS - 1], the higher the stronger
+    """
+    if community_cards is None:
+        community_cards = []
+    tables = load_bucket_tables()
+    hole_ids = [card.id for card in hole_cards]
+    board_ids = [card.id for card in community_cards]
+    if len(board_ids) < 5:
+        index = hand_index(hole_ids, board_ids)
+        return int(tables[TABLE_STREETS[len(board_ids)]][index])
+    equity = _EQUITY_CACHE.get(hole_cards, community_cards)
+    if equity is None:
+        win, tie, _ = enumerate_outcomes(hole_cards, community_cards)
+        equity = win + tie / 2
+        _EQUITY_CACHE.put(hole_cards, community_cards, equity)
+    return int(np.searchsorted(tables['river'], equity, side='right'))
+
+
+if __name__ == '__main__':
+    # regenerate the shipped tables, e.g.
+    # python -m pokerbot.hand_evaluation.buckets
+    save_bucket_tables(build_bucket_tables())
@@ -0,0 +1,193 @@
+import logging
+import numpy as np
+
+from collections import OrderedDict
+from itertools import combinations
+
+from .evaluator import evaluate_batch, straight_draw_batch
+from .isomorphism import HOLE_COMBOS, COMBO_INDEX
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+# maximum number of boards whose draw analysis is kept in memory
+MAX_CACHED_BOARDS = 1000
+
+# number of (turn, river) runouts evaluated at once on the flop
+RUNOUT_CHUNK_SIZE = 128
+
+# lazily computed draw analyses, least recently used first
+_BOARD_DRAWS = OrderedDict()
+
+
+def _count_bits(masks):
+    """ Number of bits set in each of an array of 13-bit masks """
+    return sum((masks >> bit) & 1 for bit in range(13))
+
+
+def _board_rankings(boards):
+    """
+    Ranking of the best hand of each board alone, boards of less than five
+    cards only making pairs, two pairs, three or four of a kind
+
+    Args:
+        boards (np.ndarray): card ids of shape [N, k], with 3 <= k <= 5
+
+    Returns:
+        (np.ndarray): ranking of each board, from 1 to 9
+    """
+    if boards.shape[1] == 5:
+        return evaluate_batch(boards) >> 20
+    ranks = boards >> 2
+    # number of cards of the board sharing the rank of each card
+    rank_counts = (ranks[:, :, None] == ranks[:, None, :]).sum(axis=2)
+    max_count = rank_counts.max(axis=1)
+    nb_paired_cards = (rank_counts == 2).sum(axis=1)
+    return np.select([max_count == 4, max_count == 3, nb_paired_cards == 4,
+                      nb_paired_cards == 2], [8, 4, 3, 2], default=1)
+
+
+def analyze_draws(board_ids):
+    """
+    Outs and draws of all 1326 holdings on a flop or a turn, in one
+    vectorized pass over every holding and every card still to come. An
+    out is a card improving the ranking of the best hand over the ranking
+    of the board alone, e.g. from one pair to two pairs or from a flush
+    draw to a flush. Cards only improving the board, e.g. pairing it, help
+    every holding alike and are not outs.
+
+    Args:
+        board_ids (list): card ids of the 3 or 4 board cards
+
+    Returns:
+        (dict): arrays of length 1326, in the order of HOLE_COMBOS, with
+        zeros for holdings using a board card
+        - live (bool): holding does not use a board card
+        - ranking (int8): ranking of the best hand now, from 1 to 9
+        - outs (int8): number of next cards improving the ranking over the
+        board's
+        - improve_next (float32): probability of improving over the board
+        on the next card
+        - improve_by_river (float32): probability of improving over the
+        board by the river
+        - flush_draw (bool): four cards of a suit, at least one of them
+        in the holding
+        - backdoor_flush_draw (bool): three cards of a suit on the flop, at
+        least one of them in the holding
+        - straight_draw_ranks (int8): number of ranks completing a
+        straight, but not with the board alone, 1 for a gutshot, 2 for an
+        open-ended straight draw
+    """
+    if len(board_ids) not in (3, 4):
+        raise ValueError('Draws are only analyzed on the flop and the turn, '
+                         '{} board cards were passed on'
+                         .format(len(board_ids)))
+    board = np.array(board_ids, dtype=np.int64)
+    live = np.flatnonzero(~np.isin(HOLE_COMBOS, board).any(axis=1))
+    holdings = HOLE_COMBOS[live]
+    nb_live = len(live)
+    cards = np.hstack([holdings, np.tile(board, (nb_live, 1))])
+    ranking = evaluate_batch(cards) >> 20
+    # ranks the holding is ahead of the board alone
+    lead = ranking - _board_rankings(board[None, :])[0]
+
+    # every (holding, next card) pair, the next card being unseen
+    unseen = np.ones((nb_live, 52), dtype=bool)
+    unseen[:, board] = False
+    unseen[np.arange(nb_live), holdings[:, 0]] = False
+    unseen[np.arange(nb_live), holdings[:, 1]] = False
+    holding_idx, next_cards = np.nonzero(unseen)
+    next_ranking = evaluate_batch(np.hstack(
+        [cards[holding_idx], next_cards[:, None]])) >> 20
+    next_board_ranking = np.zeros(52, dtype=np.int64)
+    off_board = np.setdiff1d(np.arange(52), board)
+    next_board_ranking[off_board] = _board_rankings(np.hstack(
+        [np.tile(board, (len(off_board), 1)), off_board[:, None]]))
+    improved = next_ranking - next_board_ranking[next_cards] > \
+        lead[holding_idx]
+    outs = np.bincount(holding_idx, weights=improved, minlength=nb_live)
+    nb_unseen = 52 - 2 - len(board_ids)
+    improve_next = outs / nb_unseen
+
+    if len(board_ids) == 3:
+        # every (holding, turn and river) triple on the flop, by chunks of
+        # runouts to bound memory
+        runouts = np.array(list(combinations(range(52), 2)), dtype=np.int64)
+        runouts = runouts[~np.isin(runouts, board).any(axis=1)]
+        runout_board_ranking = _board_rankings(np.hstack(
+            [np.tile(board, (len(runouts), 1)), runouts]))
+        holding_masks = (1 << holdings[:, 0]) | (1 << holdings[:, 1])
+        runout_masks = (1 << runouts[:, 0]) | (1 << runouts[:, 1])
+        improvements = np.zeros(nb_live)
+        for start in range(0, len(runouts), RUNOUT_CHUNK_SIZE):
+            chunk = slice(start, start + RUNOUT_CHUNK_SIZE)
+            holding_idx, runout_idx = np.nonzero(
+                (holding_masks[:, None] & runout_masks[None, chunk]) == 0)
+            final_ranking = evaluate_batch(np.hstack(
+                [cards[holding_idx], runouts[chunk][runout_idx]])) >> 20
+            improved = final_ranking - runout_board_ranking[chunk][
+                runout_idx] > lead[holding_idx]
+            improvements += np.bincount(holding_idx, weights=improved,
+                                        minlength=nb_live)
+        improve_by_river = improvements / (nb_unseen * (nb_unseen - 1) / 2)
+    else:
+        improve_by_river = improve_next
+
+    # draws from suit counts and ranks held, involving the holding: suits
+    # are counted for the hole cards only, and ranks completing a straight
+    # with the board alone are left out
+    suit_counts = np.zeros((nb_live, 4), dtype=np.int64)
+    for column in range(cards.shape[1]):
+        suit_counts[np.arange(nb_live), cards[:, column] & 3] += 1
+    hole_suit_counts = suit_counts[np.arange(nb_live)[:, None],
+                                   holdings & 3]
+    rank_masks = np.bitwise_or.reduce(1 << (cards >> 2), axis=1)
+    board_draw_mask = straight_draw_batch(
+        np.bitwise_or.reduce(1 << (board >> 2)))
+
+    draws = {'live': np.zeros(len(HOLE_COMBOS), dtype=bool),
+             'ranking': np.zeros(len(HOLE_COMBOS), dtype=np.int8),
+             'outs': np.zeros(len(HOLE_COMBOS), dtype=np.int8),
+             'improve_next': np.zeros(len(HOLE_COMBOS), dtype=np.float32),
+             'improve_by_river': np.zeros(len(HOLE_COMBOS), dtype=np.float32),
+             'flush_draw': np.zeros(len(HOLE_COMBOS), dtype=bool),
+             'backdoor_flush_draw': np.zeros(len(HOLE_COMBOS), dtype=bool),
+             'straight_draw_ranks': np.zeros(len(HOLE_COMBOS), dtype=np.int8)}
+    draws['live'][live] = True
+    draws['ranking'][live] = ranking
+    draws['outs'][live] = outs
+    draws['improve_next'][live] = improve_next
+    draws['improve_by_river'][live] = improve_by_river
+    draws['flush_draw'][live] = (hole_suit_counts == 4).any(axis=1)
+    draws['backdoor_flush_draw'][live] = (len(board_ids) == 3) & \
+        (hole_suit_counts == 3).any(axis=1)
+    draws['straight_draw_ranks'][live] = _count_bits(
+        straight_draw_batch(rank_masks) & ~board_draw_mask)
+    return draws
+
+
+def get_draws(hole_cards, community_cards):
+    """
+    Outs and draws of one holding, read from the analysis of its board,
+    which is computed once per board and kept in a bounded
+    least-recently-used cache
+
+    Args:
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of 3 or 4 Card objects, representing
+        board cards
+
+    Returns:
+        (dict): outs and draws of the holding, see analyze_draws
+    """
+    key = tuple(sorted(card.id for card in community_cards))
+    draws = _BOARD_DRAWS.get(key)
+    if draws is None:
+        draws = analyze_draws(key)
+        _BOARD_DRAWS[key] = draws
+        if len(_BOARD_DRAWS) > MAX_CACHED_BOARDS:
+            _BOARD_DRAWS.popitem(last=False)
+    else:
+        _BOARD_DRAWS.move_to_end(key)
+    combo = COMBO_INDEX[hole_cards[0].id, hole_cards[1].id]
+    return {name: values[combo].item() for name, values in draws.items()}
@@ -0,0 +1,117 @@
+import logging
+
+from collections import OrderedDict
+
+from .isomorphism import canonical_form
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+
+class EquityCache(object):
+    """
+    Bounded least-recently-used cache of win rates, keyed on the
+    suit-canonical (hole cards, board) situation, so that situations that
+    only differ by suits share one entry
+
+    Attributes:
+        max_size (int): maximum number of situations kept in the cache
+        entries (OrderedDict): canonical situation -> (win rate, number of
+        samples behind it, None if exact), least recently used first
+        hits (int): number of lookups answered by the cache
+        misses (int): number of lookups that were not
+        evictions (int): number of entries dropped to respect max_size
+    """
+
+    def __init__(self, max_size=100000):
+        """
+        Instantiate an empty cache of a given maximum size
+        e.g. EquityCache(max_size=50000)
+        """
+        assert max_size > 0, "Cache size must be positive, {} was passed on"\
+            .format(max_size)
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def get_key(hole_cards, community_cards):
+        """
+        Canonical key of a situation, the order of board cards is ignored
+
+        Args:
+            hole_cards (list): list of two Card objects
+            community_cards (list): list of Card objects
+
+        Returns:
+            (tuple): canonical hole card ids and board card ids
+        """
+        return canonical_form([card.id for card in hole_cards],
+                              [card.id for card in community_cards],
+                              ordered_board=False)
+
+    def get(self, hole_cards, community_cards, nb_simulations=None):
+        """
+        Look up the win rate of a situation
+
+        Args:
+            hole_cards (list): list of two Card objects
+            community_cards (list): list of Card objects
+            nb_simulations (int): minimum number of samples the cached
+            estimate must rely on, default None only accepts exact values
+
+        Returns:
+            (float): cached win rate, None if missing or not precise enough
+        """
+        key = self.get_key(hole_cards, community_cards)
+        entry = self.entries.get(key)
+        if entry is not None:
+            win_rate, nb_samples = entry
+            if nb_samples is None or (nb_simulations is not None and
+                                      nb_samples >= nb_simulations):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return win_rate
+        self.misses += 1
+        return None
+
+    def put(self, hole_cards, community_cards, win_rate, nb_samples=None):
+        """
+        Store the win rate of a situation, evicting the least recently used
+        entry if the cache is full
+
+        Args:
+            hole_cards (list): list of two Card objects
+            community_cards (list): list of Card objects
+            win_rate (float): win rate of the situation
+            nb_samples (int): number of samples behind the estimate, default
+            None for an exact value
+        """
+        key = self.get_key(hole_cards, community_cards)
+        self.entries[key] = (win_rate, nb_samples)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def hit_rate(self):
+        """ Returns the share of lookups answered by the cache """
+        nb_lookups = self.hits + self.misses
+        return self.hits / nb_lookups if nb_lookups else 0.0
+
+    def clear(self):
+        """ Empty the cache and reset its counters """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return "EquityCache(size={}/{}, hits={}, misses={}, evictions={})"\
+            .format(len(self), self.max_size, self.hits, self.misses,
+                    self.evictions)
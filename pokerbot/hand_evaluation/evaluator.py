@@ -0,0 +1,408 @@
+import os
+import logging
+import numpy as np
+
+from itertools import combinations_with_replacement
+
+from ..globals import TIEBREAKER_LENGTHS, EVALUATOR_TABLE_FILE
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+# Cards are identified by an integer id in [0-51], id = 4 * (rank - 2) + suit
+# where suits are ordered C, D, H, S - i.e. Card.id
+
+# each rank (resp. suit) owns 3 bits in the rank (resp. suit) key, adding
+# the keys of up to 7 cards counts the cards of each rank (resp. suit)
+RANK_KEYS = [1 << (3 * (card_id >> 2)) for card_id in range(52)]
+SUIT_KEYS = [1 << (3 * (card_id & 3)) for card_id in range(52)]
+RANK_KEYS_ARRAY = np.array(RANK_KEYS, dtype=np.int64)
+SUIT_KEYS_ARRAY = np.array(SUIT_KEYS, dtype=np.int64)
+
+# 13-bit masks of ranks making a straight, from the highest to the wheel
+STRAIGHT_MASKS = [(0b11111 << (high - 6), high) for high in range(14, 5, -1)]
+STRAIGHT_MASKS.append((0b1000000001111, 5))
+
+# lookup tables, shipped in datafiles and loaded on first use
+TABLE_NAMES = ('rank_keys', 'rank_strengths', 'flush_suit', 'flush',
+               'straight_draw')
+_TABLES = {}
+
+
+def pack_strength(ranking, tiebreaker):
+    """
+    Pack a ranking and its tiebreaker into one comparable integer
+
+    Args:
+        ranking (int): ranking of poker hand on a scale from 1 to 9
+        tiebreaker (list): list of integers representing, in decreasing
+        order of importance, ranking of cards relevant for tiebreaking
+
+    Returns:
+        (int): strength of the hand, the higher the better
+    """
+    strength = ranking
+    for i in range(5):
+        strength = (strength << 4) | (tiebreaker[i]
+                                      if i < len(tiebreaker) else 0)
+    return strength
+
+
+def strength_to_ranking(strength):
+    """
+    Unpack an integer strength into a ranking and its tiebreaker
+
+    Args:
+        strength (int): strength of the hand as returned by evaluate_cards
+
+    Returns:
+        (int): ranking of poker hand on a scale from 1 to 9
+        (list): list of integers representing, in decreasing order of
+        importance, ranking of cards relevant for tiebreaking
+    """
+    ranking = strength >> 20
+    tiebreaker = [(strength >> (16 - 4 * i)) & 15
+                  for i in range(TIEBREAKER_LENGTHS[ranking])]
+    return ranking, tiebreaker
+
+
+def _highest_straight(rank_mask):
+    """
+    Find the highest straight contained in a 13-bit mask of ranks
+
+    Args:
+        rank_mask (int): bit r - 2 is set if rank r is present
+
+    Returns:
+        (int): rank of the highest card of the straight, 0 if no straight
+    """
+    for straight_mask, high in STRAIGHT_MASKS:
+        if rank_mask & straight_mask == straight_mask:
+            return high
+    return 0
+
+
+def _flush_strength(rank_mask):
+    """
+    Evaluate the best five cards of a single suit
+
+    Args:
+        rank_mask (int): bit r - 2 is set if rank r is present in the suit
+
+    Returns:
+        (int): strength of the best straight flush or flush, 0 if there are
+        less than five cards
+    """
+    ranks = [rank for rank in range(14, 1, -1) if rank_mask >> (rank - 2) & 1]
+    if len(ranks) < 5:
+        return 0
+    high = _highest_straight(rank_mask)
+    if high:
+        return pack_strength(9, [high])
+    return pack_strength(6, ranks[:5])
+
+
+def _rank_strength(counts):
+    """
+    Evaluate the best five cards ignoring suits
+
+    Args:
+        counts (list): number of cards of each rank, indexed by rank - 2
+
+    Returns:
+        (int): strength of the best combination that is not a flush
+    """
+    # ranks grouped by multiplicity, in decreasing order
+    ranks = [rank for rank in range(14, 1, -1) if counts[rank - 2]]
+    quads = [rank for rank in ranks if counts[rank - 2] >= 4]
+    trips = [rank for rank in ranks if counts[rank - 2] == 3]
+    pairs = [rank for rank in ranks if counts[rank - 2] == 2]
+
+    if quads:
+        kicker = [rank for rank in ranks if rank != quads[0]]
+        return pack_strength(8, [quads[0]] + kicker[:1])
+    if trips and (len(trips) > 1 or pairs):
+        best_pair = max(trips[1:] + pairs)
+        return pack_strength(7, [trips[0], best_pair])
+    high = _highest_straight(sum(1 << (rank - 2) for rank in ranks))
+    if high:
+        return pack_strength(5, [high])
+    if trips:
+        kickers = [rank for rank in ranks if rank != trips[0]]
+        return pack_strength(4, [trips[0]] + kickers[:2])
+    if len(pairs) > 1:
+        kicker = [rank for rank in ranks if rank not in pairs[:2]]
+        return pack_strength(3, pairs[:2] + kicker[:1])
+    if pairs:
+        kickers = [rank for rank in ranks if rank != pairs[0]]
+        return pack_strength(2, [pairs[0]] + kickers[:3])
+    return pack_strength(1, ranks[:5])
+
+
+def _build_tables():
+    """
+    Build the lookup tables used by the evaluation functions
+    - rank keys: sorted rank keys of any 2 to 7 ranks, to be searched with
+    np.searchsorted
+    - rank strengths: strength for each of the sorted rank keys
+    - flush suit table: suit key -> suit with at least 5 cards, or -1
+    - flush table: 13-bit mask of ranks -> strength of the flush
+    - straight draw table: 13-bit mask of ranks -> mask of the ranks that
+    would complete a straight, 0 if a straight is already made
+
+    Returns:
+        (dict): table name -> numpy array, see TABLE_NAMES
+    """
+    logging.debug('Building hand evaluation lookup tables')
+    rank_table = {}
+    for nb_cards in range(2, 8):
+        for ranks in combinations_with_replacement(range(13), nb_cards):
+            counts = [0] * 13
+            for rank in ranks:
+                counts[rank] += 1
+            if max(counts) > 4:
+                continue
+            rank_key = sum(count << (3 * rank)
+                           for rank, count in enumerate(counts))
+            rank_table[rank_key] = _rank_strength(counts)
+    rank_keys = sorted(rank_table)
+
+    flush_suit_table = []
+    for suit_key in range(1 << 12):
+        suit_counts = [(suit_key >> (3 * suit)) & 7 for suit in range(4)]
+        flush_suit_table.append(
+            suit_counts.index(max(suit_counts))
+            if max(suit_counts) >= 5 else -1)
+
+    flush_table = [_flush_strength(rank_mask)
+                   for rank_mask in range(1 << 13)]
+
+    straight_draw_table = []
+    for rank_mask in range(1 << 13):
+        draw_mask = 0
+        if not _highest_straight(rank_mask):
+            for rank in range(13):
+                if _highest_straight(rank_mask | (1 << rank)):
+                    draw_mask |= 1 << rank
+        straight_draw_table.append(draw_mask)
+
+    return {'rank_keys': np.array(rank_keys, dtype=np.int64),
+            'rank_strengths': np.array([rank_table[rank_key]
+                                        for rank_key in rank_keys],
+                                       dtype=np.int32),
+            'flush_suit': np.array(flush_suit_table, dtype=np.int8),
+            'flush': np.array(flush_table, dtype=np.int32),
+            'straight_draw': np.array(straight_draw_table, dtype=np.int16)}
+
+
+def save_tables(table_file=EVALUATOR_TABLE_FILE):
+    """
+    Build the lookup tables and store them as .npy files, one per table,
+    to be memory-mapped at run time
+
+    Args:
+        table_file (str): path template of the files, formatted with the
+        table name, default is the shipped datafiles
+    """
+    for name, table in _build_tables().items():
+        np.save(table_file.format(name), table)
+    _TABLES.clear()
+
+
+def _get_array_tables():
+    """
+    Returns lookup tables as numpy arrays: rank keys, rank strengths, flush
+    suit table and flush table. On first use the shipped files are
+    memory-mapped read-only, so that startup is immediate and forked
+    workers share the same pages; the tables are built in memory if the
+    files are missing.
+    """
+    if not _TABLES:
+        paths = [EVALUATOR_TABLE_FILE.format(name) for name in TABLE_NAMES]
+        if all(os.path.exists(path) for path in paths):
+            for name, path in zip(TABLE_NAMES, paths):
+                _TABLES[name] = np.load(path, mmap_mode='r')
+        else:
+            logging.warning('Evaluator tables not found in {}, building '
+                            'them'.format(os.path.dirname(paths[0])))
+            _TABLES.update(_build_tables())
+    return _TABLES['rank_keys'], _TABLES['rank_strengths'], \
+        _TABLES['flush_suit'], _TABLES['flush']
+
+
+def _get_tables():
+    """
+    Returns lookup tables as python objects, the fastest for evaluating one
+    hand at a time: rank key -> strength dict, flush suit list and flush
+    list, converted from the array tables on first use
+    """
+    if 'rank' not in _TABLES:
+        rank_keys, rank_strengths, flush_suit_array, flush_array = \
+            _get_array_tables()
+        _TABLES['rank'] = dict(zip(rank_keys.tolist(),
+                                   rank_strengths.tolist()))
+        _TABLES['flush_suit_list'] = flush_suit_array.tolist()
+        _TABLES['flush_list'] = flush_array.tolist()
+        _TABLES['straight_draw_list'] = _TABLES['straight_draw'].tolist()
+    return _TABLES['rank'], _TABLES['flush_suit_list'], _TABLES['flush_list']
+
+
+def evaluate_card_ids(card_ids):
+    """
+    Evaluate the best five-card combination among 5, 6 or 7 cards using
+    precomputed lookup tables
+
+    Args:
+        card_ids (list): list of integer card ids in [0-51]
+
+    Returns:
+        (int): strength of the best combination, the higher the better;
+        ranking and tiebreaker can be recovered with strength_to_ranking
+    """
+    assert 5 <= len(card_ids) <= 7, \
+        "Incorrect number of cards to evaluate, {} was passed on" \
+        .format(len(card_ids))
+    rank_table, flush_suit_table, flush_table = _get_tables()
+
+    rank_key = 0
+    suit_key = 0
+    for card_id in card_ids:
+        rank_key += RANK_KEYS[card_id]
+        suit_key += SUIT_KEYS[card_id]
+    strength = rank_table[rank_key]
+
+    # with at most 7 cards only one suit can make a flush
+    flush_suit = flush_suit_table[suit_key]
+    if flush_suit >= 0:
+        rank_mask = 0
+        for card_id in card_ids:
+            if card_id & 3 == flush_suit:
+                rank_mask |= 1 << (card_id >> 2)
+        strength = max(strength, flush_table[rank_mask])
+    return strength
+
+
+def evaluate_keys(rank_key, suit_key, suit_rank_masks):
+    """
+    Evaluate the best combination of 2 to 7 cards from their running keys,
+    so that a hand can be updated one card at a time. With less than five
+    cards only pairs, trips and quads count, and missing kickers are 0.
+
+    Args:
+        rank_key (int): sum of RANK_KEYS of the cards
+        suit_key (int): sum of SUIT_KEYS of the cards
+        suit_rank_masks (list): for each suit, 13-bit mask of its ranks
+
+    Returns:
+        (int): strength of the best combination, same scale as
+        evaluate_card_ids
+    """
+    rank_table, flush_suit_table, flush_table = _get_tables()
+    strength = rank_table[rank_key]
+    flush_suit = flush_suit_table[suit_key]
+    if flush_suit >= 0:
+        strength = max(strength, flush_table[suit_rank_masks[flush_suit]])
+    return strength
+
+
+def straight_draw_mask(rank_mask):
+    """
+    Ranks that would complete a straight
+
+    Args:
+        rank_mask (int): bit r - 2 is set if rank r is present
+
+    Returns:
+        (int): bit r - 2 is set if adding rank r makes a straight, 0 if a
+        straight is already made
+    """
+    _get_tables()
+    return _TABLES['straight_draw_list'][rank_mask]
+
+
+def straight_draw_batch(rank_masks):
+    """
+    Ranks that would complete a straight, for many rank masks at once
+
+    Args:
+        rank_masks (np.ndarray): integer array of 13-bit rank masks
+
+    Returns:
+        (np.ndarray): masks of the ranks completing a straight, same shape
+    """
+    _get_array_tables()
+    return _TABLES['straight_draw'][rank_masks]
+
+
+def evaluate_cards(cards):
+    """
+    Evaluate the best five-card combination among 5, 6 or 7 Card objects
+
+    Args:
+        cards (list): list of Card objects
+
+    Returns:
+        (int): strength of the best combination, the higher the better
+    """
+    return evaluate_card_ids([card.id for card in cards])
+
+
+def evaluate_batch(cards):
+    """
+    Evaluate the best five-card combination of many hands at once, with
+    vectorized lookups into the precomputed tables
+
+    Args:
+        cards (np.ndarray): integer card ids in [0-51] of shape [N, k],
+        with 5 <= k <= 7 distinct cards per row
+
+    Returns:
+        (np.ndarray): int32 strengths of shape [N], same scale as
+        evaluate_card_ids
+    """
+    cards = np.asarray(cards, dtype=np.int64)
+    assert cards.ndim == 2 and 5 <= cards.shape[1] <= 7, \
+        "Incorrect shape of cards to evaluate, {} was passed on" \
+        .format(cards.shape)
+    rank_keys, rank_strengths, flush_suit_array, flush_array = \
+        _get_array_tables()
+
+    rank_key = RANK_KEYS_ARRAY[cards].sum(axis=1)
+    strength = rank_strengths[np.searchsorted(rank_keys, rank_key)]
+
+    # only rows with five cards or more of the same suit need a flush lookup
+    flush_suit = flush_suit_array[SUIT_KEYS_ARRAY[cards].sum(axis=1)]
+    has_flush = np.flatnonzero(flush_suit >= 0)
+    if has_flush.size:
+        flush_cards = cards[has_flush]
+        in_suit = (flush_cards & 3) == flush_suit[has_flush, None]
+        rank_mask = np.bitwise_or.reduce(
+            np.where(in_suit, 1 << (flush_cards >> 2), 0), axis=1)
+        strength[has_flush] = np.maximum(strength[has_flush],
+                                         flush_array[rank_mask])
+    return strength
+
+
+def compare_batch(hole_cards1, hole_cards2, boards):
+    """
+    Compare many pairs of hands at showdown at once
+
+    Args:
+        hole_cards1 (np.ndarray): card ids of first hands, shape [N, 2]
+        hole_cards2 (np.ndarray): card ids of second hands, shape [N, 2]
+        boards (np.ndarray): card ids of the boards, shape [N, 3 to 5]
+
+    Returns:
+        (np.ndarray): int8 array of shape [N], 1 if first hand wins,
+        -1 if second hand wins, 0 for a draw
+    """
+    boards = np.asarray(boards)
+    strength1 = evaluate_batch(np.hstack([hole_cards1, boards]))
+    strength2 = evaluate_batch(np.hstack([hole_cards2, boards]))
+    return np.sign(strength1 - strength2).astype(np.int8)
+
+
+if __name__ == '__main__':
+    # regenerate the shipped tables, e.g.
+    # python -m pokerbot.hand_evaluation.evaluator
+    save_tables()
@@ -0,0 +1,115 @@
+import os
+import logging
+import multiprocessing
+import numpy as np
+
+from .evaluator import _get_array_tables
+from .isomorphism import NB_CANONICAL_FLOPS, hand_index, _get_flop_tables
+from .range_equity import NB_COMBOS, range_vs_range_equity
+from ..flow_control.card import CARDS
+from ..globals import FLOP_EQUITY_FILE
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+# lazily loaded equity table
+_FLOP_EQUITY = {}
+
+
+def _flop_equities(flop_idx):
+    """
+    Equity against a random hand of every combo on a canonical flop
+
+    Args:
+        flop_idx (int): canonical flop index in [0-1754]
+
+    Returns:
+        (np.ndarray): equity of the 1326 combos, nan if impossible
+    """
+    flop = _get_flop_tables()['boards'][flop_idx]
+    equities, _ = range_vs_range_equity(
+        np.ones(NB_COMBOS), np.ones(NB_COMBOS),
+        [CARDS[card_id] for card_id in flop.tolist()])
+    return equities
+
+
+def build_flop_equity_table(nb_workers=None):
+    """
+    Compute the exact all-in equity against a random hand of each of the
+    1,286,792 canonical (hole cards, flop) situations, every canonical flop
+    being fully run out by a pool of processes
+
+    Args:
+        nb_workers (int): number of processes, default None uses all cores
+
+    Returns:
+        (np.ndarray): float64 equity of each situation, in the order of
+        hand_index
+    """
+    # build shared tables once, forked workers inherit them
+    tables = _get_flop_tables()
+    _get_array_tables()
+    equity_table = np.zeros(tables['offsets'][-1])
+    with multiprocessing.Pool(nb_workers) as pool:
+        for flop_idx, equities in enumerate(pool.imap(
+                _flop_equities, range(NB_CANONICAL_FLOPS))):
+            live = tables['local_index'][flop_idx] >= 0
+            equity_table[tables['offsets'][flop_idx] +
+                         tables['local_index'][flop_idx, live]] = \
+                equities[live]
+            if flop_idx % 100 == 0:
+                logging.info('{} flops out of {} run out'
+                             .format(flop_idx, NB_CANONICAL_FLOPS))
+    return equity_table
+
+
+def save_flop_equity_table(equity_table, path=FLOP_EQUITY_FILE):
+    """
+    Store the equity table as a compact float16 .npy artifact
+
+    Args:
+        equity_table (np.ndarray): equity of the 1,286,792 situations
+        path (str): destination file, default is the shipped datafile
+    """
+    np.save(path, equity_table.astype(np.float16))
+    _FLOP_EQUITY.clear()
+
+
+def load_flop_equity_table():
+    """
+    Returns the shipped equity table, memory-mapped on first use
+
+    Returns:
+        (np.ndarray): float16 equity of each canonical situation, in the
+        order of hand_index
+    """
+    if 'table' not in _FLOP_EQUITY:
+        if not os.path.exists(FLOP_EQUITY_FILE):
+            raise IOError('Flop equity table {} not found, build it with '
+                          'python -m pokerbot.hand_evaluation.flop_equity'
+                          .format(FLOP_EQUITY_FILE))
+        _FLOP_EQUITY['table'] = np.load(FLOP_EQUITY_FILE, mmap_mode='r')
+    return _FLOP_EQUITY['table']
+
+
+def flop_win_rate(hole_cards, community_cards):
+    """
+    Heads-up all-in equity of hole cards against a random hand on the flop
+
+    Args:
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of three Card objects, representing
+        the flop
+
+    Returns:
+        (float): equity of hero, ties counting for half
+    """
+    return float(load_flop_equity_table()[hand_index(
+        [card.id for card in hole_cards],
+        [card.id for card in community_cards])])
+
+
+if __name__ == '__main__':
+    # regenerate the shipped artifact, e.g.
+    # python -m pokerbot.hand_evaluation.flop_equity
+    save_flop_equity_table(build_flop_equity_table())
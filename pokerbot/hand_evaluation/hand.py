@@ -4,6 +4,11 @@ import logging
 from collections import Counter
 from itertools import combinations
 
+from ..flow_control.card import CardSet
+from .evaluator import evaluate_cards, evaluate_keys, straight_draw_mask, \
+    strength_to_ranking, RANK_KEYS, SUIT_KEYS
+from .isomorphism import preflop_class
+from .preflop import PREFLOP_CLASS_NAMES
 from ..globals import STRAIGHTS, HUMAN_READABLE_RANKINGS
 
 logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
@@ -90,6 +95,22 @@ def evaluate_hand_ranking(hand):
         return 1, tiebreaker  # , "High card"
 
 
+def showdown(hand1, hand2):
+    """
+    Compares two class.Hand objects at showdown based on their integer
+    strengths only, without looking at the cards making them
+
+    Args:
+        hand1 (class.Hand): class object Hand
+        hand2 (class.Hand): class object Hand
+
+    Returns:
+        (int): 1 if hand1 wins, -1 if hand2 wins, 0 for a draw
+    """
+    return (hand1.best_strength > hand2.best_strength) - \
+        (hand1.best_strength < hand2.best_strength)
+
+
 def compare_two_hands(hand1, hand2):
     """
     Compares two class.Hand objects based on their resp. best combination
@@ -102,20 +123,7 @@ def compare_two_hands(hand1, hand2):
     Returns:
         (str): describing outcome: ["hand1","hand2","draw"]
     """
-    if hand1.best_rank > hand2.best_rank:
-        return "hand1"
-    elif hand1.best_rank < hand2.best_rank:
-        return "hand2"
-    else:
-        i = 0
-        while i < len(hand1.best_tiebreaker):
-            if hand1.best_tiebreaker[i] > hand2.best_tiebreaker[i]:
-                return "hand1"
-            elif hand1.best_tiebreaker[i] < hand2.best_tiebreaker[i]:
-                return "hand2"
-            else:
-                i += 1
-        return "draw"
+    return ("draw", "hand1", "hand2")[showdown(hand1, hand2)]
 
 
 def tie_breaking(hands, tiebreakers):
@@ -156,13 +164,33 @@ class Hand(object):
     Hand object for a given player that integrate private and communal cards
     when available. Include methods to assess strength of the hand.
 
+    The strength of the hand is kept up to date incrementally: each card
+    added updates running rank and suit keys, and the best rank, tiebreaker
+    and draws are then read from lookup tables, on every street.
+
     Attributes:
         private_cards (list): list of two Card objects given pre flop
+        preflop_class (int): pre flop class of the private cards in
+        [0-168], the index of every pre flop table
         public_cards (list): list of Card objects given post flop
-        best_rank (list): rank of best combination at the moment of evaluation
-        best_combination (list): best combination at the moment of evaluation
-        best_tiebreaker (list): tiebreaker for best combination at the
-        moment of evaluation
+        card_set (class.CardSet): private and public cards as a bitmask
+        rank_key (int): running sum of the rank keys of the cards
+        suit_key (int): running sum of the suit keys of the cards
+        suit_rank_masks (list): for each suit, 13-bit mask of its ranks
+        public_rank_mask (int): 13-bit mask of the ranks of public cards
+        best_rank (int): ranking of the best combination so far
+        best_combination (list): the five cards making the best combination
+        so far, only looked for when read
+        best_tiebreaker (list): tiebreaker for best combination so far
+        best_strength (int): comparable integer strength of the best
+        combination so far
+        flush_draw (bool): four cards of a suit, at least one of them
+        private, with cards still to come
+        backdoor_flush_draw (bool): three cards of a suit on the flop, at
+        least one of them private
+        straight_draw_ranks (int): number of ranks that would complete a
+        straight with cards still to come, but not with public cards alone,
+        1 for a gutshot, 2 for an open-ended straight draw
     """
 
     def __init__(self, private_cards):
@@ -170,59 +198,110 @@ class Hand(object):
         Instantiate a hand object based on private cards
         e.g. Hand([Card(14,"C"),Card(13,"C")])
         """
+        self.card_set = CardSet()
+        self.suit_rank_masks = [0, 0, 0, 0]
+        self.reset(private_cards)
+
+    def reset(self, private_cards):
+        """
+        Method to re-initialise the hand in place with new private cards,
+        so that it can be reused from one hand played to the next
+
+        Args:
+            private_cards (list): list of two Card objects
+        """
         self.private_cards = private_cards
+        self.preflop_class = preflop_class([private_cards[0].id,
+                                            private_cards[1].id])
         self.public_cards = []
-        self.best_rank = []
-        self.best_combination = []
+        self.card_set.mask = 0
+        self.rank_key = 0
+        self.suit_key = 0
+        self.suit_rank_masks[:] = (0, 0, 0, 0)
+        self.public_rank_mask = 0
+        self.best_rank = 0
+        self._best_combination = None
         self.best_tiebreaker = []
+        self.best_strength = 0
+        self.flush_draw = False
+        self.backdoor_flush_draw = False
+        self.straight_draw_ranks = 0
+        self._ingest_cards(private_cards)
+
+    def _ingest_cards(self, cards):
+        """
+        Update running keys with new cards, then best combination and draws
+
+        Args:
+            cards (list): list containing one or several Card objects
+        """
+        for card in cards:
+            self.card_set.add(card)
+            self.rank_key += RANK_KEYS[card.id]
+            self.suit_key += SUIT_KEYS[card.id]
+            self.suit_rank_masks[card.id & 3] |= 1 << (card.id >> 2)
+
+        self.best_strength = evaluate_keys(self.rank_key, self.suit_key,
+                                           self.suit_rank_masks)
+        best_rank, best_tiebreaker = strength_to_ranking(self.best_strength)
+        self.best_rank = best_rank
+        self.best_tiebreaker = [best_tiebreaker]
+        self._best_combination = None
+
+        # draws only matter with cards still to come, and must involve the
+        # private cards: suits are counted for the private cards only, and
+        # ranks completing a straight with public cards alone are left out
+        nb_cards = len(self.private_cards) + len(self.public_cards)
+        private_suit_counts = [(self.suit_key >> (3 * (card.id & 3))) & 7
+                               for card in self.private_cards]
+        rank_mask = self.suit_rank_masks[0] | self.suit_rank_masks[1] | \
+            self.suit_rank_masks[2] | self.suit_rank_masks[3]
+        if nb_cards < 7:
+            self.flush_draw = 4 in private_suit_counts
+            self.backdoor_flush_draw = nb_cards == 5 and \
+                3 in private_suit_counts
+            self.straight_draw_ranks = bin(
+                straight_draw_mask(rank_mask) &
+                ~straight_draw_mask(self.public_rank_mask)).count("1")
+        else:
+            self.flush_draw = False
+            self.backdoor_flush_draw = False
+            self.straight_draw_ranks = 0
 
     def add_public_cards(self, public_cards):
         """
-        Method to ingest public cards
+        Method to ingest public cards, updating the strength of the hand
 
         Args:
             public_cards (list): list containing one or several Card objects
         """
         self.public_cards = self.public_cards + public_cards
+        for card in public_cards:
+            self.public_rank_mask |= 1 << (card.id >> 2)
+        self._ingest_cards(public_cards)
 
     def update_best_combination(self):
         """
-        Method to evaluate best combination and update corresponding
-        attributes based on private and public cards collected so far
+        Method to check the hand can be evaluated at showdown. Strength,
+        rank and tiebreaker are always up to date, and the five cards making
+        the best combination are only looked for when best_combination is
+        read, e.g. for a human-readable hand history
         """
         assert self.public_cards  # check list is not empty
 
-        logging.debug('Evaluating best combination, based on cards')
-        # number of combinations
-        hands = list(combinations(self.private_cards + self.public_cards, 5))
-        logging.debug('{} combinations to evaluate'.format(len(hands)))
-
-        # evaluate possible hands
-        hand_evaluations = [evaluate_hand_ranking(hand) for hand in hands]
-        hand_rankings = [hand_evaluation[0]
-                         for hand_evaluation in hand_evaluations]
-
-        # select hands with best rankings
-        best_rank = max(hand_rankings)
-        best_hands_index = [idx for idx, rank in enumerate(hand_rankings)
-                            if rank == best_rank]
-        best_hands = [hands[idx] for idx in best_hands_index]
-        best_hands_tiebreakers = [hand_evaluations[idx][1]
-                                  for idx in best_hands_index]
-
-        # tiebreak only if necessary
-        if len(best_hands) == 1:
-            self.best_rank = best_rank
-            self.best_combination = best_hands
-            self.best_tiebreaker = best_hands_tiebreakers
-        else:
-            logging.debug('Tiebreaking best combination, among {} candidates'
-                          .format(len(best_hands)))
-            best_hand, best_tiebreaker = \
-                tie_breaking(best_hands, best_hands_tiebreakers)
-            self.best_rank = best_rank
-            self.best_combination = best_hand
-            self.best_tiebreaker = best_tiebreaker
+    @property
+    def best_combination(self):
+        """ List containing the five cards making the best combination """
+        if self._best_combination is None:
+            logging.debug('Evaluating best combination, based on cards')
+            cards = self.private_cards + self.public_cards
+            # retrieve the five cards making the current strength, none
+            # before the flop
+            best_hand = next((hand for hand in combinations(cards, 5)
+                              if evaluate_cards(hand) == self.best_strength),
+                             None)
+            self._best_combination = [best_hand] if best_hand else []
+        return self._best_combination
 
     def pretty_str_best_combination(self):
         """ Returns pretty card representation for the best_combination """
@@ -235,7 +314,8 @@ class Hand(object):
 
     def get_simp_preflop_rep(self):
         """
-        Method to give a simplified representation of private cards
+        Method to give a simplified representation of private cards, for
+        display only, tables being indexed by preflop_class
         169 possible outputs
 
         Returns:
@@ -244,21 +324,7 @@ class Hand(object):
         e.g. Hand([Card(14,"C"),Card(13,"C")]).get_simp_preflop_rep()
         returns "AKs"
         """
-        card1 = self.private_cards[0]
-        card2 = self.private_cards[1]
-        # pocket pairs
-        if card1.rank == card2.rank:
-            return card1.pretty_rank + card2.pretty_rank
-        elif card1.rank > card2.rank:
-            if card1.suit == card2.suit:
-                return card1.pretty_rank + card2.pretty_rank + "s"
-            else:
-                return card1.pretty_rank + card2.pretty_rank + "o"
-        else:
-            if card1.suit == card2.suit:
-                return card2.pretty_rank + card1.pretty_rank + "s"
-            else:
-                return card2.pretty_rank + card1.pretty_rank + "o"
+        return PREFLOP_CLASS_NAMES[self.preflop_class]
 
     def __repr__(self):
         """ Pretty card representation of all cards in hand """
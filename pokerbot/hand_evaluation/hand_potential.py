@@ -1,32 +1,271 @@
 
 import random
+import multiprocessing
+import numpy as np
 
-from ..flow_control.deck import Deck
-from ..hand_evaluation.hand import Hand, compare_two_hands
+from itertools import combinations
+from statistics import NormalDist
+
+from ..flow_control.card import CARDS, CardSet
+from ..hand_evaluation.evaluator import evaluate_cards, evaluate_batch, \
+    _get_array_tables
+from ..hand_evaluation.river_index import get_river_index
+
+# above this number of (runout, opponent holding) states, estimate_win_rate
+# samples instead of enumerating: turn (45,540) and river (990) are
+# enumerated, flop (1,070,190) and pre-flop are sampled
+MAX_EXACT_STATES = 50000
+
+# maximum number of hands evaluated per batch during enumeration
+ENUMERATION_BATCH_SIZE = 200000
+
+# number of simulations per independently seeded block when sampling with a
+# seed or several workers; blocks, not workers, own the random streams
+SAMPLING_BLOCK_SIZE = 10000
 
 
 # Estimate the ratio of winning games given the current state of the game
-def estimate_win_rate(nb_simulations, hole_cards, community_cards=None):
+def estimate_win_rate(nb_simulations, hole_cards, community_cards=None,
+                      exact=None, cache=None, seed=None, nb_workers=1,
+                      tie_weight=1):
     """
     Estimate the win rate of a given hand, given the community cards,
-    estimation is done with Monte Carlo simulations
+    estimation is done with Monte Carlo simulations, or by enumerating every
+    opponent holding and runout when the state space is small enough
 
     Args:
         nb_simulations (int): number of MC simulations
         hole_cards (list): list of two Card objects
         community_cards (list): list of Card objects, representing board
         cards, default is an empty list
+        exact (bool): True to enumerate, False to sample, default None
+        chooses enumeration if there are at most MAX_EXACT_STATES states
+        cache (class.EquityCache): cache looked up before, and filled after,
+        computing the win rate, only to be shared by calls with the same
+        tie_weight, default None
+        seed (int): seed of the simulations, the estimate only depends on it
+        and not on nb_workers, default None uses the global numpy random
+        state
+        nb_workers (int): number of processes sharing the simulations,
+        default 1
+        tie_weight (float): share of a win a draw counts for, default 1
+        counts draws as wins, 0.5 gives the equity
 
     Returns:
-        (float): win rate estimated using MC simulations
+        (float): win rate (wins and weighted draws) estimated using MC
+        simulations, or exact win rate if enumerated
     """
     # default community cards to empty list
     if community_cards is None:
         community_cards = []
-    # estimate the win count by doing Monte Carlo simulation,
-    win_count = sum([monte_carlo_simulation(hole_cards, community_cards)
-                     for _ in range(nb_simulations)])
-    return 1.0 * win_count / nb_simulations
+    if exact is None:
+        exact = (len(community_cards) >= 3 and
+                 count_states(hole_cards, community_cards) <= MAX_EXACT_STATES)
+    if cache is not None:
+        win_rate = cache.get(hole_cards, community_cards,
+                             None if exact else nb_simulations)
+        if win_rate is not None:
+            return win_rate
+    if exact:
+        win_rate, tie_rate, _ = enumerate_outcomes(hole_cards,
+                                                   community_cards)
+        win_rate += tie_weight * tie_rate
+    else:
+        if seed is None and nb_workers == 1:
+            # estimate the win count by doing all simulations at once
+            wins, ties = sample_outcomes(nb_simulations, hole_cards,
+                                         community_cards)
+        else:
+            wins, ties = parallel_sample_outcomes(
+                nb_simulations, hole_cards, community_cards, seed=seed,
+                nb_workers=nb_workers)
+        win_rate = 1.0 * (wins + tie_weight * ties) / nb_simulations
+    if cache is not None:
+        cache.put(hole_cards, community_cards, win_rate,
+                  None if exact else nb_simulations)
+    return win_rate
+
+
+def estimate_win_rate_adaptive(max_simulations, hole_cards,
+                               community_cards=None, thresholds=(),
+                               precision=None, confidence=0.99,
+                               initial_simulations=32, cache=None,
+                               random_state=np.random, tie_weight=1):
+    """
+    Estimate the win rate of a given hand with as few Monte Carlo
+    simulations as needed: simulations are run in batches of doubling size,
+    and sampling stops as soon as the confidence interval of the estimate
+    excludes every decision threshold, or is narrower than the target
+    precision. Small state spaces are enumerated exactly, as in
+    estimate_win_rate.
+
+    Args:
+        max_simulations (int): maximum number of MC simulations
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of Card objects, representing board
+        cards, default is an empty list
+        thresholds (tuple): win rates the decision depends on, e.g.
+        (0.5, 0.8), default empty
+        precision (float): target half-width of the confidence interval,
+        default None
+        confidence (float): confidence level of the interval, default 0.99
+        initial_simulations (int): size of the first batch, default 32
+        cache (class.EquityCache): cache looked up before, and filled after,
+        computing the win rate, only to be shared by calls with the same
+        tie_weight, default None
+        random_state (np.random.RandomState): source of randomness,
+        default is the global numpy random state
+        tie_weight (float): share of a win a draw counts for, default 1
+        counts draws as wins, 0.5 gives the equity
+
+    Returns:
+        (float): win rate (wins and weighted draws)
+        (float): standard error of the estimate, 0 if exact
+        (int): number of simulations run, 0 if exact or cached
+    """
+    if community_cards is None:
+        community_cards = []
+    if len(community_cards) >= 3 and \
+            count_states(hole_cards, community_cards) <= MAX_EXACT_STATES:
+        return estimate_win_rate(max_simulations, hole_cards,
+                                 community_cards, exact=True,
+                                 cache=cache, tie_weight=tie_weight), 0.0, 0
+    if cache is not None:
+        win_rate = cache.get(hole_cards, community_cards, max_simulations)
+        if win_rate is not None:
+            standard_error = np.sqrt(win_rate * (1 - win_rate) /
+                                     max_simulations)
+            return win_rate, float(standard_error), 0
+
+    z_score = NormalDist().inv_cdf(0.5 + confidence / 2)
+    successes = nb_samples = 0
+    batch_size = initial_simulations
+    while True:
+        batch_size = min(batch_size, max_simulations - nb_samples)
+        wins, ties = sample_outcomes(batch_size, hole_cards,
+                                     community_cards,
+                                     random_state=random_state)
+        successes += wins + tie_weight * ties
+        nb_samples += batch_size
+        win_rate = successes / nb_samples
+        # shrink towards 1/2 so that a run of identical outcomes does not
+        # give a zero standard error
+        shrunk_rate = (successes + 0.5) / (nb_samples + 1)
+        standard_error = np.sqrt(shrunk_rate * (1 - shrunk_rate) / nb_samples)
+        half_width = z_score * standard_error
+        if nb_samples >= max_simulations:
+            break
+        if precision is not None and half_width <= precision:
+            break
+        if thresholds and all(abs(win_rate - threshold) > half_width
+                              for threshold in thresholds):
+            break
+        batch_size = nb_samples
+    if cache is not None and nb_samples >= max_simulations:
+        cache.put(hole_cards, community_cards, win_rate, nb_samples)
+    return win_rate, float(standard_error), nb_samples
+
+
+def sample_outcomes(nb_simulations, hole_cards, community_cards,
+                    random_state=np.random):
+    """
+    Draw all missing community cards and opponent hole cards of every
+    simulation in one vectorized step over the live cards, and evaluate all
+    showdowns in batch
+
+    Args:
+        nb_simulations (int): number of MC simulations
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of Card objects, representing board
+        random_state (np.random.RandomState): source of randomness,
+        default is the global numpy random state
+
+    Returns:
+        (int): number of simulations won by hero
+        (int): number of simulations ending in a draw
+    """
+    dead_cards = CardSet(hole_cards + community_cards)
+    live_cards = np.array([card.id for card in CARDS
+                           if card not in dead_cards], dtype=np.int64)
+    hero_cards = np.array([card.id for card in hole_cards], dtype=np.int64)
+    board = np.array([card.id for card in community_cards], dtype=np.int64)
+
+    # the k smallest of N x L uniform draws pick k distinct live cards per
+    # simulation: the first two go to the opponent, the rest to the board
+    nb_drawn_cards = 5 - len(community_cards) + 2
+    draws = random_state.random_sample((nb_simulations, len(live_cards)))
+    drawn_cards = live_cards[np.argpartition(
+        draws, nb_drawn_cards - 1, axis=1)[:, :nb_drawn_cards]]
+    boards = np.hstack([np.tile(board, (nb_simulations, 1)),
+                        drawn_cards[:, 2:]])
+
+    hero_strength = evaluate_batch(
+        np.hstack([np.tile(hero_cards, (nb_simulations, 1)), boards]))
+    villain_strength = evaluate_batch(np.hstack([drawn_cards[:, :2], boards]))
+    return int(np.count_nonzero(hero_strength > villain_strength)), \
+        int(np.count_nonzero(hero_strength == villain_strength))
+
+
+def _sample_block(task):
+    """
+    Run one block of simulations in a worker process
+
+    Args:
+        task (tuple): number of simulations, hole card ids, board card ids
+        and np.random.SeedSequence of the block
+
+    Returns:
+        (int): number of simulations won by hero
+        (int): number of simulations ending in a draw
+    """
+    nb_simulations, hole_ids, board_ids, seed_sequence = task
+    random_state = np.random.RandomState(np.random.MT19937(seed_sequence))
+    return sample_outcomes(nb_simulations,
+                           [CARDS[card_id] for card_id in hole_ids],
+                           [CARDS[card_id] for card_id in board_ids],
+                           random_state=random_state)
+
+
+def parallel_sample_outcomes(nb_simulations, hole_cards, community_cards,
+                             seed=None, nb_workers=None,
+                             block_size=SAMPLING_BLOCK_SIZE):
+    """
+    Shard simulations into blocks of fixed size, each with its own random
+    stream spawned from the seed, run them on a process pool and merge the
+    counts. Since blocks do not depend on the number of workers, the counts
+    are identical for a given seed whatever the number of workers.
+
+    Args:
+        nb_simulations (int): number of MC simulations
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of Card objects, representing board
+        seed (int): root seed of the random streams, default None draws
+        fresh entropy
+        nb_workers (int): number of processes, 1 runs the blocks in the
+        current process, default None uses all cores
+        block_size (int): number of simulations per block
+
+    Returns:
+        (int): number of simulations won by hero
+        (int): number of simulations ending in a draw
+    """
+    block_sizes = [block_size] * (nb_simulations // block_size)
+    if nb_simulations % block_size:
+        block_sizes.append(nb_simulations % block_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(block_sizes))
+    hole_ids = [card.id for card in hole_cards]
+    board_ids = [card.id for card in community_cards]
+    tasks = [(size, hole_ids, board_ids, seed_sequence)
+             for size, seed_sequence in zip(block_sizes, seed_sequences)]
+
+    if nb_workers == 1:
+        results = [_sample_block(task) for task in tasks]
+    else:
+        # build lookup tables once, forked workers inherit them
+        _get_array_tables()
+        with multiprocessing.Pool(nb_workers) as pool:
+            results = pool.map(_sample_block, tasks)
+    return sum(wins for wins, _ in results), sum(ties for _, ties in results)
 
 
 def monte_carlo_simulation(hole_cards, community_cards):
@@ -45,30 +284,194 @@ def monte_carlo_simulation(hole_cards, community_cards):
         MC randomly drawn parameters
     """
     # start from remaining cards
-    remaining_cards = Deck().get_remaining_cards(hole_cards + community_cards)
+    dead_cards = CardSet(hole_cards + community_cards)
+    remaining_cards = [card for card in CARDS if card not in dead_cards]
 
-    # draw missing community cards randomly
+    # draw missing community cards and opponent cards randomly
     nb_missing_community_cards = 5 - len(community_cards)
-    missing_community_cards = random.sample(remaining_cards,
-                                            nb_missing_community_cards)
-    remaining_cards = [card for card in remaining_cards
-                       if card not in missing_community_cards]
-
-    # draw opponent cards randomly
-    opponent_hole_cards = random.sample(remaining_cards, 2)
+    drawn_cards = random.sample(remaining_cards,
+                                nb_missing_community_cards + 2)
+    missing_community_cards = drawn_cards[2:]
+    opponent_hole_cards = drawn_cards[:2]
 
-    # update hands accordingly
+    # evaluate both hands straight from the lookup tables
     public_cards = community_cards + missing_community_cards
-    opponent_hand = Hand(opponent_hole_cards)
-    opponent_hand.add_public_cards(public_cards)
-    opponent_hand.update_best_combination()
-    hero_hand = Hand(hole_cards)
-    hero_hand.add_public_cards(public_cards)
-    hero_hand.update_best_combination()
+    opponent_strength = evaluate_cards(opponent_hole_cards + public_cards)
+    hero_strength = evaluate_cards(hole_cards + public_cards)
 
     # evaluate winner
-    winner = compare_two_hands(hero_hand, opponent_hand)
-    if winner == 'hand2':
+    if hero_strength < opponent_strength:
         return 0
     else:
         return 1
+
+
+def count_states(hole_cards, community_cards):
+    """
+    Number of (runout, opponent holding) combinations left to enumerate
+
+    Args:
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of Card objects, representing board
+
+    Returns:
+        (int): number of equally likely states
+    """
+    nb_live_cards = 52 - len(hole_cards) - len(community_cards)
+    nb_missing_community_cards = 5 - len(community_cards)
+    return _binomial(nb_live_cards, nb_missing_community_cards) * \
+        _binomial(nb_live_cards - nb_missing_community_cards, 2)
+
+
+def _binomial(n, k):
+    """ Number of ways to choose k items among n """
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+def _enumerate_transitions(hole_cards, community_cards):
+    """
+    Enumerate every opponent holding and every runout of the board once,
+    counting how the hero's situation against the opponent on the current
+    board (ahead, tied, behind) turns into the showdown outcome
+
+    Args:
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of 3 to 5 Card objects, representing
+        board cards
+
+    Returns:
+        (np.ndarray): int64 matrix of shape [3, 3], number of (opponent
+        holding, runout) states going from the current situation (rows) to
+        the showdown outcome (columns), both ordered ahead, tied, behind
+    """
+    if len(community_cards) < 3:
+        raise ValueError('Exact enumeration is only available post flop, '
+                         '{} community cards were passed on'
+                         .format(len(community_cards)))
+    dead_cards = CardSet(hole_cards + community_cards)
+    live_cards = np.array([card.id for card in CARDS
+                           if card not in dead_cards], dtype=np.int64)
+    hero_cards = np.array([card.id for card in hole_cards], dtype=np.int64)
+    board = np.array([card.id for card in community_cards], dtype=np.int64)
+
+    # every opponent holding and every way to complete the board
+    nb_missing_community_cards = 5 - len(community_cards)
+    holdings = np.array(list(combinations(live_cards, 2)), dtype=np.int64)
+    runouts = list(combinations(live_cards, nb_missing_community_cards))
+    runouts = np.array(runouts, dtype=np.int64).reshape(
+        len(runouts), nb_missing_community_cards)
+
+    # situation against each holding on the current board: 0 ahead, 1 tied,
+    # 2 behind
+    current_strength = evaluate_batch(
+        np.hstack([holdings, np.tile(board, (len(holdings), 1))]))
+    hero_current_strength = evaluate_batch(
+        np.concatenate([hero_cards, board])[None, :])[0]
+    current = 1 - np.sign(hero_current_strength - current_strength)
+
+    transitions = np.zeros(9, dtype=np.int64)
+    chunk_size = max(1, ENUMERATION_BATCH_SIZE // len(holdings))
+    for start in range(0, len(runouts), chunk_size):
+        chunk = runouts[start:start + chunk_size]
+        boards = np.hstack([np.tile(board, (len(chunk), 1)), chunk])
+        hero_strength = evaluate_batch(
+            np.hstack([np.tile(hero_cards, (len(chunk), 1)), boards]))
+        # pair every runout with the holdings that do not use its cards
+        conflicts = (holdings[None, :, :, None] ==
+                     chunk[:, None, None, :]).any(axis=(2, 3))
+        runout_idx, holding_idx = np.nonzero(~conflicts)
+        villain_strength = evaluate_batch(
+            np.hstack([holdings[holding_idx], boards[runout_idx]]))
+        final = 1 - np.sign(hero_strength[runout_idx] - villain_strength)
+        transitions += np.bincount(3 * current[holding_idx] + final,
+                                   minlength=9)
+    return transitions.reshape(3, 3)
+
+
+def enumerate_outcomes(hole_cards, community_cards):
+    """
+    Compute the exact probabilities of winning, tying and losing against a
+    random opponent hand, by enumerating every runout of the board and every
+    opponent holding. Only available post flop. On the river, the sorted
+    holdings of the board are searched instead, see RiverIndex.
+
+    Args:
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of 3 to 5 Card objects, representing
+        board cards
+
+    Returns:
+        (float): probability of winning at showdown
+        (float): probability of splitting the pot
+        (float): probability of losing at showdown
+    """
+    if len(community_cards) == 5:
+        return get_river_index([card.id for card in community_cards])\
+            .outcomes([card.id for card in hole_cards])
+    wins, ties, losses = _enumerate_transitions(
+        hole_cards, community_cards).sum(axis=0).tolist()
+    total = wins + ties + losses
+    return wins / total, ties / total, losses / total
+
+
+def hand_potential(hole_cards, community_cards):
+    """
+    Compute exactly the hand strength and the positive and negative
+    potentials of a hand against a random opponent hand, in a single
+    enumeration of every opponent holding and runout. Only available post
+    flop; on the river both potentials are 0.
+
+    - hand strength (HS): probability of being ahead now, ties counting
+    for half
+    - positive potential (PPot): probability of ending ahead when currently
+    behind, ties counting for half
+    - negative potential (NPot): probability of ending behind when
+    currently ahead, ties counting for half
+
+    Args:
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of 3 to 5 Card objects, representing
+        board cards
+
+    Returns:
+        (float): hand strength
+        (float): positive potential
+        (float): negative potential
+    """
+    transitions = _enumerate_transitions(hole_cards, community_cards)
+    (ahead_ahead, ahead_tied, ahead_behind), \
+        (tied_ahead, tied_tied, tied_behind), \
+        (behind_ahead, behind_tied, behind_behind) = transitions.tolist()
+    ahead, tied, behind = transitions.sum(axis=1).tolist()
+
+    hand_strength = (ahead + tied / 2) / (ahead + tied + behind)
+    behind_weight = behind + tied / 2
+    positive_potential = (behind_ahead + behind_tied / 2 + tied_ahead / 2) \
+        / behind_weight if behind_weight else 0.0
+    ahead_weight = ahead + tied / 2
+    negative_potential = (ahead_behind + ahead_tied / 2 + tied_behind / 2) \
+        / ahead_weight if ahead_weight else 0.0
+    return hand_strength, positive_potential, negative_potential
+
+
+def effective_hand_strength(hole_cards, community_cards):
+    """
+    Effective hand strength, the probability of being ahead now and staying
+    ahead, or being behind now and drawing ahead:
+    EHS = HS * (1 - NPot) + (1 - HS) * PPot
+
+    Args:
+        hole_cards (list): list of two Card objects
+        community_cards (list): list of 3 to 5 Card objects, representing
+        board cards
+
+    Returns:
+        (float): effective hand strength
+    """
+    hand_strength, positive_potential, negative_potential = \
+        hand_potential(hole_cards, community_cards)
+    return hand_strength * (1 - negative_potential) + \
+        (1 - hand_strength) * positive_potential
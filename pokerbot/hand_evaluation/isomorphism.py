@@ -0,0 +1,417 @@
+import os
+import logging
+import numpy as np
+
+from itertools import combinations, permutations
+from math import comb
+
+from ..globals import ISOMORPHISM_TABLE_FILE
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+# Cards are identified by their integer id in [0-51], see Card.id
+# Two situations are isomorphic if one can be obtained from the other by
+# renaming suits, e.g. (AcKc, 2c7cQh) and (AhKh, 2h7hQs)
+
+# the 24 ways of renaming the 4 suits
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+
+# the 1326 two-card combos, and their index in a 52x52 table
+HOLE_COMBOS = np.array(list(combinations(range(52), 2)), dtype=np.int64)
+COMBO_INDEX = np.full((52, 52), -1, dtype=np.int64)
+COMBO_INDEX[HOLE_COMBOS[:, 0], HOLE_COMBOS[:, 1]] = np.arange(1326)
+COMBO_INDEX[HOLE_COMBOS[:, 1], HOLE_COMBOS[:, 0]] = np.arange(1326)
+# pairs of combos sharing at least one card, a combo conflicting with itself
+CONFLICTING_COMBOS = np.nonzero((HOLE_COMBOS[:, None, :, None] ==
+                                 HOLE_COMBOS[None, :, None, :]).any(
+    axis=(2, 3)))
+
+# card id of every card under every suit permutation, shape [24, 52]
+PERMUTED_CARDS = np.array([[(card_id & ~3) | permutation[card_id & 3]
+                            for card_id in range(52)]
+                           for permutation in SUIT_PERMUTATIONS],
+                          dtype=np.int64)
+_PERMUTED_LISTS = PERMUTED_CARDS.tolist()
+
+NB_PREFLOP_CLASSES = 169
+NB_CANONICAL_FLOPS = 1755
+NB_CANONICAL_FLOP_HANDS = 1286792
+NB_CANONICAL_TURNS = 16432
+NB_CANONICAL_TURN_HANDS = 13960050
+
+# binomial coefficients C(n, k) for n in [0-52] and k in [0-5], ranking
+# sets of board cards in colexicographic order
+BINOMIALS = np.array([[comb(n, k) for k in range(6)] for n in range(53)],
+                     dtype=np.int64)
+_BINOMIAL_LISTS = BINOMIALS.tolist()
+
+# streets whose boards are indexed, by number of board cards
+BOARD_STREETS = {3: 'flop', 4: 'turn'}
+
+# tables shipped for the boards of each street, see _build_board_tables:
+# turns have too many situations for a dense local index, their canonical
+# hole cards are looked up among the situations of their board instead
+BOARD_TABLE_NAMES = {3: ('index', 'boards', 'offsets', 'local_index',
+                         'situation_combos'),
+                     4: ('index', 'boards', 'offsets', 'stabilizers',
+                         'situation_combos')}
+
+# lazily loaded flop and turn tables
+_BOARD_TABLES = {3: {}, 4: {}}
+
+
+def canonical_form(hole_ids, board_ids=(), ordered_board=True):
+    """
+    Canonical representative of a situation up to suit renaming. Each suit
+    gets a signature, the ranks it holds on the flop, turn, river and in the
+    hole cards, and suits are renamed by decreasing signature. Suits with
+    the same signature hold the same ranks, so the order among them does
+    not matter.
+
+    Args:
+        hole_ids (list): card ids of the hole cards
+        board_ids (list): card ids of the board cards, default empty
+        ordered_board (bool): if False the board is treated as a set, i.e.
+        which card came on the turn or river is ignored, default True
+
+    Returns:
+        (tuple): canonical hole card ids, sorted
+        (tuple): canonical board card ids, flop (or whole board) sorted
+    """
+    if ordered_board:
+        rounds = (board_ids[:3], board_ids[3:4], board_ids[4:5], hole_ids)
+    else:
+        rounds = (board_ids, (), (), hole_ids)
+    signatures = [[0, 0, 0, 0] for _ in range(4)]
+    for round_idx, cards in enumerate(rounds):
+        for card_id in cards:
+            signatures[card_id & 3][round_idx] |= 1 << (card_id >> 2)
+    new_suits = [0, 0, 0, 0]
+    for new_suit, suit in enumerate(sorted(range(4),
+                                           key=signatures.__getitem__,
+                                           reverse=True)):
+        new_suits[suit] = new_suit
+    board = [(card_id & ~3) | new_suits[card_id & 3] for card_id in board_ids]
+    nb_sorted = 3 if ordered_board else len(board)
+    return tuple(sorted((card_id & ~3) | new_suits[card_id & 3]
+                        for card_id in hole_ids)), \
+        tuple(sorted(board[:nb_sorted]) + board[nb_sorted:])
+
+
+def preflop_index(hole_ids):
+    """
+    Index of the hole cards among the 169 pre flop classes, laid out as the
+    usual 13x13 grid: aces first, suited hands above the diagonal, pocket
+    pairs on it and offsuit hands below it
+
+    Args:
+        hole_ids (list): card ids of the two hole cards
+
+    Returns:
+        (int): class index in [0-168]
+    """
+    high, low = max(hole_ids) >> 2, min(hole_ids) >> 2
+    row, column = 12 - high, 12 - low
+    if (hole_ids[0] & 3) == (hole_ids[1] & 3):
+        return 13 * row + column
+    return 13 * column + row
+
+
+def preflop_from_index(index):
+    """
+    Representative hole cards of a pre flop class
+
+    Args:
+        index (int): class index in [0-168]
+
+    Returns:
+        (tuple): card ids of two hole cards of that class
+    """
+    row, column = divmod(index, 13)
+    if row < column:
+        # suited, both clubs
+        return 4 * (12 - column), 4 * (12 - row)
+    # pocket pair or offsuit, clubs and diamonds
+    return 4 * (12 - row) + 1, 4 * (12 - column)
+
+
+# pre flop class of every ordered pair of card ids, -1 for twice the same
+# card, so that the class of hole cards is a single lookup
+PREFLOP_CLASSES = np.full((52, 52), -1, dtype=np.int64)
+for _first, _second in HOLE_COMBOS.tolist():
+    PREFLOP_CLASSES[_first, _second] = PREFLOP_CLASSES[_second, _first] = \
+        preflop_index([_first, _second])
+_PREFLOP_CLASS_LISTS = PREFLOP_CLASSES.tolist()
+
+
+def preflop_class(hole_ids):
+    """
+    Pre flop class of hole cards, read from PREFLOP_CLASSES
+
+    Args:
+        hole_ids (list): card ids of the two hole cards
+
+    Returns:
+        (int): class index in [0-168], same as preflop_index
+    """
+    return _PREFLOP_CLASS_LISTS[hole_ids[0]][hole_ids[1]]
+
+
+def board_rank(board_ids):
+    """
+    Colexicographic rank of a set of distinct board cards, a dense index in
+    [0, C(52, k)) among the sets of k cards
+
+    Args:
+        board_ids (list): card ids of the board cards
+
+    Returns:
+        (int): rank of the set of board cards
+    """
+    return sum(_BINOMIAL_LISTS[card_id][rank]
+               for rank, card_id in enumerate(sorted(board_ids), 1))
+
+
+def _build_board_tables(nb_board_cards):
+    """
+    Build the tables used to index boards of a street and (hole cards,
+    board) situations, with vectorized passes over every board and every
+    suit permutation
+    - index: colexicographic rank of the board -> (canonical board index,
+    index of the suit permutation mapping the board onto its canonical
+    form), shape [C(52, k), 2]
+    - boards: canonical board card ids, sorted, shape [nb boards, k]
+    - offsets: index of the first situation of each canonical board
+    - stabilizers: for each canonical board, bitmask of the suit
+    permutations leaving it unchanged
+    - local index: for each canonical board, combo index of the hole cards
+    -> rank of their canonical form among the board's situations, or -1
+    - situation combos: combo index of the canonical hole cards of every
+    situation, the inverse table of hand_index
+
+    Canonical boards are the lexicographically smallest renaming of their
+    cards, numbered in order of first appearance among the sorted
+    combinations of cards, and each board is mapped by the first suit
+    permutation reaching its canonical form.
+
+    Args:
+        nb_board_cards (int): 3 for flops, 4 for turns
+
+    Returns:
+        (dict): tables described above
+    """
+    logging.debug('Building isomorphism tables of {}-card boards'
+                  .format(nb_board_cards))
+    boards = np.array(list(combinations(range(52), nb_board_cards)),
+                      dtype=np.int64)
+    # lexicographic key of each sorted board under each suit permutation
+    digits = 52 ** np.arange(nb_board_cards - 1, -1, -1)
+    keys = np.stack([np.sort(permuted[boards], axis=1).dot(digits)
+                     for permuted in PERMUTED_CARDS])
+    unique_keys, first_boards, inverse = np.unique(
+        keys.min(axis=0), return_index=True, return_inverse=True)
+    order = np.argsort(first_boards)
+    numbers = np.empty(len(order), dtype=np.int64)
+    numbers[order] = np.arange(len(order))
+    canonical_keys = unique_keys[order]
+    canonical_boards = canonical_keys[:, None] // digits % 52
+
+    index = np.zeros((len(boards), 2), dtype=np.int16)
+    ranks = BINOMIALS[boards, np.arange(1, nb_board_cards + 1)].sum(axis=1)
+    index[ranks, 0] = numbers[inverse.ravel()]
+    index[ranks, 1] = keys.argmin(axis=0)
+
+    # canonical hole cards: smallest combo index over the suit permutations
+    # leaving the canonical board unchanged
+    canonical_combos = np.tile(np.arange(1326, dtype=np.int16),
+                               (len(canonical_boards), 1))
+    stabilizers = np.zeros(len(canonical_boards), dtype=np.int32)
+    for permutation_idx, permuted in enumerate(PERMUTED_CARDS):
+        stabilized = np.sort(permuted[canonical_boards], axis=1)\
+            .dot(digits) == canonical_keys
+        stabilizers[stabilized] |= 1 << permutation_idx
+        permuted_combos = COMBO_INDEX[permuted[HOLE_COMBOS[:, 0]],
+                                      permuted[HOLE_COMBOS[:, 1]]]
+        canonical_combos[stabilized] = np.minimum(
+            canonical_combos[stabilized], permuted_combos)
+    on_board = np.zeros((len(canonical_boards), 52), dtype=bool)
+    np.put_along_axis(on_board, canonical_boards, True, axis=1)
+    live = ~(on_board[:, HOLE_COMBOS[:, 0]] | on_board[:, HOLE_COMBOS[:, 1]])
+
+    # situations are numbered by board, then by canonical combo
+    board_numbers = np.nonzero(live)[0]
+    situation_keys, situations = np.unique(
+        board_numbers * 1326 + canonical_combos[live], return_inverse=True)
+    offsets = np.zeros(len(canonical_boards) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(situation_keys // 1326,
+                                        minlength=len(canonical_boards)))
+    local_index = np.full((len(canonical_boards), 1326), -1, dtype=np.int16)
+    local_index[live] = situations.ravel() - offsets[board_numbers]
+    return {'index': index,
+            'boards': canonical_boards.astype(np.int8),
+            'offsets': offsets,
+            'stabilizers': stabilizers,
+            'local_index': local_index,
+            'situation_combos': (situation_keys % 1326).astype(np.int16)}
+
+
+def save_isomorphism_tables(table_file=ISOMORPHISM_TABLE_FILE):
+    """
+    Build the flop and turn tables and store them as .npy files, one per
+    table, to be memory-mapped at run time
+
+    Args:
+        table_file (str): path template of the files, formatted with the
+        street and table name, default is the shipped datafiles
+    """
+    for nb_board_cards, street in BOARD_STREETS.items():
+        tables = _build_board_tables(nb_board_cards)
+        for name in BOARD_TABLE_NAMES[nb_board_cards]:
+            np.save(table_file.format(street + '_' + name), tables[name])
+        _BOARD_TABLES[nb_board_cards].clear()
+
+
+def _get_board_tables(nb_board_cards):
+    """
+    Returns the tables of the boards of a street. On first use the shipped
+    files are memory-mapped read-only, so that startup is immediate and
+    forked workers share the same pages; the tables are built in memory if
+    the files are missing.
+
+    Args:
+        nb_board_cards (int): 3 for flops, 4 for turns
+    """
+    tables = _BOARD_TABLES[nb_board_cards]
+    if not tables:
+        names = BOARD_TABLE_NAMES[nb_board_cards]
+        paths = [ISOMORPHISM_TABLE_FILE.format(
+            BOARD_STREETS[nb_board_cards] + '_' + name) for name in names]
+        if all(os.path.exists(path) for path in paths):
+            for name, path in zip(names, paths):
+                tables[name] = np.load(path, mmap_mode='r')
+        else:
+            logging.warning('Isomorphism tables not found in {}, building '
+                            'them'.format(os.path.dirname(paths[0])))
+            tables.update(_build_board_tables(nb_board_cards))
+    return tables
+
+
+def _get_flop_tables():
+    """ Returns flop tables, see _get_board_tables """
+    return _get_board_tables(3)
+
+
+def _get_turn_tables():
+    """ Returns turn tables, see _get_board_tables """
+    return _get_board_tables(4)
+
+
+def flop_index(flop_ids):
+    """
+    Index of a flop among the 1755 canonical flops
+
+    Args:
+        flop_ids (list): card ids of the three flop cards
+
+    Returns:
+        (int): canonical flop index in [0-1754]
+    """
+    return int(_get_flop_tables()['index'][board_rank(flop_ids), 0])
+
+
+def flop_from_index(index):
+    """
+    Canonical flop of a given index
+
+    Args:
+        index (int): canonical flop index in [0-1754]
+
+    Returns:
+        (tuple): card ids of the three flop cards
+    """
+    return tuple(_get_flop_tables()['boards'][index].tolist())
+
+
+def hand_index(hole_ids, board_ids=()):
+    """
+    Dense index of a (hole cards, board) situation among its isomorphism
+    classes - 169 pre flop, 1,286,792 on the flop, 13,960,050 on the turn
+
+    Args:
+        hole_ids (list): card ids of the two hole cards
+        board_ids (list): card ids of the board, empty, a flop or a turn
+
+    Returns:
+        (int): index of the situation
+    """
+    if len(board_ids) == 0:
+        return preflop_class(hole_ids)
+    if len(board_ids) not in BOARD_STREETS:
+        raise ValueError('Situations can only be indexed pre flop, on the '
+                         'flop and on the turn, {} board cards were passed '
+                         'on'.format(len(board_ids)))
+    if len(set(board_ids)) != len(board_ids):
+        raise ValueError('Board cards must be distinct, {} was passed on'
+                         .format(list(board_ids)))
+    tables = _get_board_tables(len(board_ids))
+    board_idx, permutation_idx = tables['index'][board_rank(board_ids)]
+    permuted = _PERMUTED_LISTS[permutation_idx]
+    first, second = permuted[hole_ids[0]], permuted[hole_ids[1]]
+    combo = COMBO_INDEX[first, second]
+    # dead combos, sharing a card with the board or with themselves, have
+    # no situation
+    local_index = -1
+    if combo >= 0 and len(board_ids) == 3:
+        local_index = tables['local_index'][board_idx, combo]
+    elif combo >= 0:
+        # canonical hole cards: smallest combo over the suit permutations
+        # leaving the canonical turn unchanged
+        stabilizers = int(tables['stabilizers'][board_idx])
+        for stabilizer_idx, stabilizer in enumerate(_PERMUTED_LISTS):
+            if stabilizers >> stabilizer_idx & 1:
+                combo = min(combo, COMBO_INDEX[stabilizer[first],
+                                               stabilizer[second]])
+        start, end = tables['offsets'][board_idx:board_idx + 2]
+        situation_combos = tables['situation_combos'][start:end]
+        local_index = int(np.searchsorted(situation_combos, combo))
+        if local_index == len(situation_combos) or \
+                situation_combos[local_index] != combo:
+            local_index = -1
+    if local_index < 0:
+        raise ValueError('Hole cards {} cannot be dealt on board {}'
+                         .format(list(hole_ids), list(board_ids)))
+    return int(tables['offsets'][board_idx] + local_index)
+
+
+def hand_from_index(index, nb_board_cards=0):
+    """
+    Canonical (hole cards, board) situation of a given index
+
+    Args:
+        index (int): index of the situation, as returned by hand_index
+        nb_board_cards (int): 0 for pre flop, 3 for the flop, 4 for the
+        turn, default 0
+
+    Returns:
+        (tuple): card ids of the two hole cards
+        (tuple): card ids of the board
+    """
+    if nb_board_cards == 0:
+        return preflop_from_index(index), ()
+    if nb_board_cards not in BOARD_STREETS:
+        raise ValueError('Situations can only be indexed pre flop, on the '
+                         'flop and on the turn, {} board cards were passed '
+                         'on'.format(nb_board_cards))
+    tables = _get_board_tables(nb_board_cards)
+    board_idx = int(np.searchsorted(tables['offsets'], index,
+                                    side='right')) - 1
+    combo = tables['situation_combos'][index]
+    return tuple(HOLE_COMBOS[combo].tolist()), \
+        tuple(tables['boards'][board_idx].tolist())
+
+
+if __name__ == '__main__':
+    # regenerate the shipped tables, e.g.
+    # python -m pokerbot.hand_evaluation.isomorphism
+    save_isomorphism_tables()
@@ -0,0 +1,82 @@
+import logging
+import numpy as np
+
+from itertools import combinations
+
+from .isomorphism import HOLE_COMBOS
+from .river_index import RiverIndex
+from ..flow_control.card import CARDS, CardSet
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+# A range is a weight vector of length 1326 over the two-card combos, in
+# the order of HOLE_COMBOS (see COMBO_INDEX to find the index of a combo)
+NB_COMBOS = len(HOLE_COMBOS)
+
+
+def range_vs_range_equity(hero_range, villain_range, community_cards=None,
+                          nb_runouts=None, random_state=None):
+    """
+    Showdown equity of every combo of a hero range against a villain range,
+    given the board, card conflicts being removed
+
+    Args:
+        hero_range (np.ndarray): weights of the 1326 hero combos
+        villain_range (np.ndarray): weights of the 1326 villain combos
+        community_cards (list): list of Card objects, representing board
+        cards, default is an empty list
+        nb_runouts (int): number of random runouts of the board to sample,
+        default None enumerates every runout, which is only available post
+        flop
+        random_state (np.random.RandomState): source of randomness for
+        sampled runouts, default is the global numpy random state
+
+    Returns:
+        (np.ndarray): equity of each hero combo, ties counting for half,
+        nan for combos that are impossible or have no villain combo left
+        (float): equity of the hero range as a whole
+    """
+    if community_cards is None:
+        community_cards = []
+    if random_state is None:
+        random_state = np.random
+    hero_range = np.asarray(hero_range, dtype=np.float64)
+    villain_range = np.asarray(villain_range, dtype=np.float64)
+    assert hero_range.shape == villain_range.shape == (NB_COMBOS,), \
+        "Ranges must be weight vectors of length {}".format(NB_COMBOS)
+
+    board = np.array([card.id for card in community_cards], dtype=np.int64)
+    dead_cards = CardSet(community_cards)
+    live_cards = np.array([card.id for card in CARDS
+                           if card not in dead_cards], dtype=np.int64)
+    nb_missing_community_cards = 5 - len(community_cards)
+    if nb_runouts is not None:
+        runouts = [random_state.choice(live_cards, nb_missing_community_cards,
+                                       replace=False)
+                   for _ in range(nb_runouts)]
+    elif len(community_cards) >= 3:
+        runouts = combinations(live_cards, nb_missing_community_cards)
+    else:
+        raise ValueError('Enumerating runouts is only available post flop, '
+                         '{} community cards were passed on, sample runouts '
+                         'with nb_runouts instead'
+                         .format(len(community_cards)))
+
+    # accumulate outcomes over runouts, each (runout, villain combo) pair
+    # weighing the villain weight
+    shares = np.zeros(NB_COMBOS)
+    available = np.zeros(NB_COMBOS)
+    for runout in runouts:
+        wins, ties, runout_available = RiverIndex(
+            np.concatenate([board, np.asarray(runout, dtype=np.int64)])
+            .tolist(), villain_range).range_outcomes()
+        shares += wins + 0.5 * ties
+        available += runout_available
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        equities = np.where(available > 0, shares / available, np.nan)
+    hero_available = hero_range.dot(available)
+    equity = hero_range.dot(shares) / hero_available \
+        if hero_available > 0 else float('nan')
+    return equities, float(equity)
@@ -0,0 +1,174 @@
+import logging
+import numpy as np
+
+from collections import OrderedDict
+
+from .evaluator import evaluate_batch
+from .isomorphism import HOLE_COMBOS, COMBO_INDEX
+
+logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
+                    level=logging.INFO)
+
+# maximum number of boards whose uniform-range index is kept in memory
+MAX_CACHED_INDICES = 1000
+
+# lazily built indices of uniform ranges, least recently used first
+_UNIFORM_INDICES = OrderedDict()
+
+
+class RiverIndex(object):
+    """
+    Index of the opponent holdings on a complete board: all live combos are
+    evaluated and sorted by strength once, along with cumulated opponent
+    weights, in total and per card. The weight of the holdings a hand
+    beats, ties or can face is then found by binary search, holdings
+    sharing a card with the hand being removed.
+
+    Attributes:
+        board_ids (tuple): card ids of the five board cards
+        combos (np.ndarray): combo index of the live combos, sorted by
+        strength
+        strengths (np.ndarray): sorted strengths of the live combos
+        combo_strengths (np.ndarray): strength of each of the 1326 combos,
+        -1 for combos using a board card
+        cumulated (np.ndarray): cumulated opponent weight of the sorted
+        combos, shape [nb live combos + 1, 53]: columns 0-51 only count
+        combos holding that card, column 52 counts them all
+        combo_weights (np.ndarray): opponent weight of each of the 1326
+        combos, 0 for combos using a board card
+    """
+
+    def __init__(self, board_ids, villain_range=None):
+        """
+        Instantiate the index of a board against an opponent range
+        e.g. RiverIndex([0, 13, 26, 39, 51])
+
+        Args:
+            board_ids (list): card ids of the five board cards
+            villain_range (np.ndarray): weights of the 1326 opponent combos,
+            default None for a uniform range
+        """
+        assert len(board_ids) == 5, \
+            "River index needs 5 board cards, {} were passed on" \
+            .format(len(board_ids))
+        self.board_ids = tuple(board_ids)
+        board = np.array(board_ids, dtype=np.int64)
+        live = np.flatnonzero(~np.isin(HOLE_COMBOS, board).any(axis=1))
+        strengths = evaluate_batch(np.hstack(
+            [HOLE_COMBOS[live], np.tile(board, (len(live), 1))]))
+        order = np.argsort(strengths, kind='stable')
+        self.combos = live[order]
+        self.strengths = strengths[order]
+        self.combo_strengths = np.full(len(HOLE_COMBOS), -1, dtype=np.int32)
+        self.combo_strengths[self.combos] = self.strengths
+
+        nb_live = len(live)
+        if villain_range is None:
+            weights = np.ones(nb_live)
+        else:
+            weights = np.asarray(villain_range, dtype=np.float64)[self.combos]
+        cards = HOLE_COMBOS[self.combos]
+        card_weights = np.zeros((nb_live, 53))
+        card_weights[np.arange(nb_live), cards[:, 0]] = weights
+        card_weights[np.arange(nb_live), cards[:, 1]] = weights
+        card_weights[:, 52] = weights
+        self.cumulated = np.vstack([np.zeros(53),
+                                    np.cumsum(card_weights, axis=0)])
+        self.combo_weights = np.zeros(len(HOLE_COMBOS))
+        self.combo_weights[self.combos] = weights
+
+    def _weights_around(self, strengths, first_cards, second_cards,
+                        own_weights):
+        """
+        Opponent weight below, equal to and compatible with given hands
+
+        Args:
+            strengths (np.ndarray): strengths of the hands on the board
+            first_cards (np.ndarray): card id of their first hole card
+            second_cards (np.ndarray): card id of their second hole card
+            own_weights (np.ndarray): opponent weight of the hands
+            themselves, removed once as they hold both cards
+
+        Returns:
+            (np.ndarray): opponent weight beaten by each hand
+            (np.ndarray): opponent weight tied by each hand
+            (np.ndarray): opponent weight compatible with each hand
+        """
+        below = self.cumulated[np.searchsorted(self.strengths, strengths,
+                                               side='left')]
+        equal = self.cumulated[np.searchsorted(self.strengths, strengths,
+                                               side='right')] - below
+        total = self.cumulated[-1]
+        rows = np.arange(len(strengths))
+        wins = below[:, 52] - below[rows, first_cards] - \
+            below[rows, second_cards]
+        ties = equal[:, 52] - equal[rows, first_cards] - \
+            equal[rows, second_cards] + own_weights
+        available = total[52] - total[first_cards] - total[second_cards] + \
+            own_weights
+        return wins, ties, available
+
+    def outcomes(self, hole_ids):
+        """
+        Probabilities of winning, tying and losing against the opponent
+        range at showdown
+
+        Args:
+            hole_ids (list): card ids of the two hole cards, not on the board
+
+        Returns:
+            (float): probability of winning at showdown
+            (float): probability of splitting the pot
+            (float): probability of losing at showdown
+        """
+        combo = COMBO_INDEX[hole_ids[0], hole_ids[1]]
+        wins, ties, available = self._weights_around(
+            self.combo_strengths[[combo]], HOLE_COMBOS[[combo], 0],
+            HOLE_COMBOS[[combo], 1], self.combo_weights[[combo]])
+        wins, ties, available = float(wins[0]), float(ties[0]), \
+            float(available[0])
+        return wins / available, ties / available, \
+            (available - wins - ties) / available
+
+    def range_outcomes(self):
+        """
+        Outcomes of every combo against the opponent range at showdown
+
+        Returns:
+            (np.ndarray): opponent weight beaten by each combo, shape [1326],
+            0 for combos using a board card
+            (np.ndarray): opponent weight tied by each combo
+            (np.ndarray): opponent weight compatible with each combo
+        """
+        cards = HOLE_COMBOS[self.combos]
+        nb_combos = len(HOLE_COMBOS)
+        wins = np.zeros(nb_combos)
+        ties = np.zeros(nb_combos)
+        available = np.zeros(nb_combos)
+        wins[self.combos], ties[self.combos], available[self.combos] = \
+            self._weights_around(self.strengths, cards[:, 0], cards[:, 1],
+                                 self.combo_weights[self.combos])
+        return wins, ties, available
+
+
+def get_river_index(board_ids):
+    """
+    Index of a board against a uniform opponent range, built once per board
+    and kept in a bounded least-recently-used cache
+
+    Args:
+        board_ids (list): card ids of the five board cards
+
+    Returns:
+        (class.RiverIndex): index of the board
+    """
+    key = tuple(sorted(board_ids))
+    index = _UNIFORM_INDICES.get(key)
+    if index is None:
+        index = RiverIndex(key)
+        _UNIFORM_INDICES[key] = index
+        if len(_UNIFORM_INDICES) > MAX_CACHED_INDICES:
+            _UNIFORM_INDICES.popitem(last=False)
+    else:
+        _UNIFORM_INDICES.move_to_end(key)
+    return index
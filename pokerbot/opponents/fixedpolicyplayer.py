@@ -1,10 +1,15 @@
 
+import os
 import logging
 import numpy as np
 
 from ..flow_control.player import Player
-from ..hand_evaluation.hand_potential import estimate_win_rate
-from ..globals import PRE_FLOP_WINNING_PROB
+from ..hand_evaluation.hand_potential import estimate_win_rate_adaptive
+from ..hand_evaluation.equity_cache import EquityCache
+from ..hand_evaluation.flop_equity import flop_win_rate
+from ..hand_evaluation.preflop import PREFLOP_CLASS_NAMES, \
+    preflop_class_win_rate
+from ..globals import FLOP_EQUITY_FILE
 
 logging.basicConfig(format='%(asctime)s:%(levelname)s:%(message)s',
                     level=logging.INFO)
@@ -71,9 +76,10 @@ class StartingHandPlayer(Player):
         logging.debug('Action is on {}'.format(self.name))
         logging.debug('{} has a stack of {}$'.format(self.name, self.stack))
         if hand_hist:
-            simp_pre_flop_hand = hand_hist['preflop']['simp_rep']
-            p = PRE_FLOP_WINNING_PROB[simp_pre_flop_hand]
-            logging.debug('{} has {}'.format(self.name, simp_pre_flop_hand))
+            class_id = hand_hist['preflop']['class_id']
+            p = preflop_class_win_rate(class_id)
+            logging.debug('{} has {}'.format(self.name,
+                                             PREFLOP_CLASS_NAMES[class_id]))
             logging.debug('p = {}'.format(p))
             # # select actions based on win rate at the beginning
             # if p < 0.5:
@@ -128,9 +134,36 @@ class StrengthHandPlayer(Player):
     Namely by assessing strength of hand given all visible cards
 
     Inherits from the Player class
-    Only method to take action has been added
+    Only method to take action has been added, win rates are kept in an
+    equity cache shared across hands. On every street, the win rate is the
+    equity against a random hand, ties counting for half as in the pre-flop
+    and flop tables
+
+    Attributes:
+        equity_cache (class.EquityCache): cache of computed win rates
+        use_flop_table (bool): whether flop win rates are read from the flop
+        equity table, or sampled until clear of the thresholds
+        nb_simulations (int): number of MC simulations run so far
     """
 
+    # win rates the choice of action depends on
+    THRESHOLDS = (0.5, 0.8)
+
+    def __init__(self, stack, name, cache_size=100000, use_flop_table=None):
+        """
+        Instantiating the object using a numeric stack, a name, the maximum
+        number of situations kept in the equity cache and whether to read
+        flop win rates from the flop equity table, default None reads them
+        if the table is shipped
+        e.g. StrengthHandPlayer(100,"Joe")
+        """
+        super(StrengthHandPlayer, self).__init__(stack, name)
+        self.equity_cache = EquityCache(max_size=cache_size)
+        if use_flop_table is None:
+            use_flop_table = os.path.exists(FLOP_EQUITY_FILE)
+        self.use_flop_table = use_flop_table
+        self.nb_simulations = 0
+
     def take_action(self, actions, hand_hist=None):
         """
         Getting action from player by assessing strength of starting hand
@@ -146,26 +179,35 @@ class StrengthHandPlayer(Player):
         logging.debug('{} has a stack of {}$'.format(self.name, self.stack))
         if hand_hist:
             # get relevant info from hand history
-            simp_pre_flop_hand = hand_hist['preflop']['simp_rep']
+            class_id = hand_hist['preflop']['class_id']
             hole_cards = hand_hist['preflop']['hole_cards']
             community_cards = hand_hist['community_cards']
             nb_simulations = 1000
-            # if stage is pre-flop, agent rely on lookup table for win rate
-            if community_cards:
-                p = estimate_win_rate(nb_simulations,
-                                      hole_cards,
-                                      community_cards=community_cards)
+            # if stage is pre-flop or flop, agent rely on lookup tables for
+            # win rate, otherwise win rate is enumerated on the turn and
+            # river, or sampled until p is clearly on one side of the
+            # decision thresholds
+            if not community_cards:
+                p = preflop_class_win_rate(class_id)
+            elif len(community_cards) == 3 and self.use_flop_table:
+                p = flop_win_rate(hole_cards, community_cards)
             else:
-                p = PRE_FLOP_WINNING_PROB[simp_pre_flop_hand]
-            logging.debug('{} has {}'.format(self.name, simp_pre_flop_hand))
+                p, _, nb_samples = estimate_win_rate_adaptive(
+                    nb_simulations, hole_cards,
+                    community_cards=community_cards,
+                    thresholds=self.THRESHOLDS, cache=self.equity_cache,
+                    tie_weight=0.5)
+                self.nb_simulations += nb_samples
+            logging.debug('{} has {}'.format(self.name,
+                                             PREFLOP_CLASS_NAMES[class_id]))
             logging.debug('p = {}'.format(p))
             # select actions based on win rate
-            if p < 0.5:
+            if p < self.THRESHOLDS[0]:
                 if 'check' in actions:
                     choice = 'check'
                 else:
                     choice = 'fold'
-            elif p < 0.8:
+            elif p < self.THRESHOLDS[1]:
                 if 'call' in actions:
                     choice = 'call'
                 elif 'bet' in actions:
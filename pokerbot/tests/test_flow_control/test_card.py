@@ -0,0 +1,38 @@
+import pickle
+import pytest
+
+from pokerbot import Card, CardSet, CARDS, Deck
+
+
+def test_cards_are_interned():
+    assert Card(14, "C") is Card(14, "C")
+    assert pickle.loads(pickle.dumps(Card(14, "C"))) is Card(14, "C")
+
+
+def test_card_ids():
+    assert [card.id for card in CARDS] == list(range(52))
+    assert Card(2, "C").id == 0
+    assert Card(14, "S").id == 51
+    assert repr(Card(14, "C")) == 'A♧'
+
+
+def test_invalid_card():
+    with pytest.raises(ValueError):
+        Card(15, "C")
+
+
+def test_card_set():
+    card_set = CardSet([Card(14, "C"), Card(13, "C")])
+    assert Card(14, "C") in card_set
+    assert Card(14, "D") not in card_set
+    assert len(card_set) == 2
+    card_set.remove(Card(14, "C"))
+    card_set.add(Card(2, "S"))
+    assert card_set.cards() == [Card(2, "S"), Card(13, "C")]
+    assert len(CardSet.full() - card_set) == 50
+
+
+def test_get_remaining_cards():
+    remaining = Deck().get_remaining_cards([Card(14, "C"), Card(13, "C")])
+    assert len(remaining) == 50
+    assert Card(14, "C") not in remaining
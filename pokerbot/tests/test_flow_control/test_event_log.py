@@ -0,0 +1,99 @@
+from pokerbot import CARDS, EventLog, HandHistory, preflop_class
+
+
+def _started_log(capacity=64):
+    log = EventLog(capacity=capacity)
+    log.start(7, True, 2, 1, ('Hero', 'Villain'), (100, 100),
+              [CARDS[card_id] for card_id in range(9)])
+    return log
+
+
+def test_record_events():
+    log = _started_log()
+    log.record('call', 1)
+    log.record('check', 0)
+    log.record('flop')
+    log.record('bet', 0, 2)
+    log.record('fold', 1)
+    log.record('win', 0, 6)
+    assert log.street == 1
+    assert log.events() == [('pre-flop', 1, 'call', 0),
+                            ('pre-flop', 0, 'check', 0),
+                            ('flop', -1, 'flop', 0),
+                            ('flop', 0, 'bet', 2),
+                            ('flop', 1, 'fold', 0),
+                            ('flop', 0, 'win', 6)]
+    assert log.board() == [CARDS[4], CARDS[5], CARDS[6]]
+
+
+def test_to_text():
+    log = _started_log()
+    log.record('raise', 1, 2)
+    log.record('fold', 0)
+    log.record('win', 1, 4)
+    text = log.to_text(1)
+    assert "***** Hand #7 history\n" in text
+    assert "Position: Small Blind\n" in text
+    assert "Dealing private cards to Villain: {}\n" \
+        .format([CARDS[2], CARDS[3]]) in text
+    assert text.endswith("Villain raises 2\nHero folds\n"
+                         "Villain wins the pot: +4$\n")
+
+
+def test_showdown_text():
+    log = _started_log()
+    for street in ('flop', 'turn', 'river'):
+        log.record(street)
+    log.record('showdown', amount=4)
+    log.record('split', amount=4)
+    text = log.to_text(0)
+    assert "***** Dealing river: {} - {} - {}\n".format(
+        log.board(1), [CARDS[7]], [CARDS[8]]) in text
+    assert "Pot size: 4\n" in text
+    assert "best hand is" in text
+    assert text.endswith("Splitting the pot\n")
+
+
+def test_to_json():
+    log = _started_log()
+    log.record('call', 1)
+    log.record('flop')
+    json_hist = log.to_json(0)
+    assert json_hist['position'] == {'Big Blind'}
+    assert json_hist['preflop']['hole_cards'] == [CARDS[0], CARDS[1]]
+    assert json_hist['preflop']['class_id'] == preflop_class([0, 1])
+    assert json_hist['community_cards'] == [CARDS[4], CARDS[5], CARDS[6]]
+    assert json_hist['actions'] == [('pre-flop', 'Small Blind', 'call', 0)]
+
+
+def test_grow_and_copy():
+    log = _started_log(capacity=2)
+    for _ in range(5):
+        log.record('check', 0)
+    assert log.nb_events == 5
+    copied = log.copy()
+    log.start(8, True, 2, 1, ('Hero', 'Villain'), (100, 100),
+              [CARDS[card_id] for card_id in range(9)])
+    assert log.nb_events == 0
+    assert len(copied.events()) == 5
+    assert str(HandHistory(copied, 0)).count("Hero checks\n") == 5
+
+
+def test_to_json_is_extended():
+    log = _started_log()
+    log.record('call', 1)
+    first = log.to_json(0)
+    log.record('check', 0)
+    log.record('flop')
+    log.record('bet', 0, 2)
+    second = log.to_json(0)
+    # earlier renders are left as they were
+    assert len(first['actions']) == 1
+    assert first['community_cards'] == []
+    assert second == log.copy().to_json(0)
+    assert second['actions'][-1] == ('flop', 'Big Blind', 'bet', 2)
+    # a new hand starts a new history
+    log.start(8, True, 2, 1, ('Hero', 'Villain'), (100, 100),
+              [CARDS[card_id] for card_id in range(9, 18)])
+    assert log.to_json(0)['actions'] == []
+    assert log.to_json(0)['preflop']['hole_cards'] == [CARDS[9], CARDS[10]]
@@ -0,0 +1,87 @@
+import random
+import numpy as np
+import pytest
+
+from pokerbot import HuGame, Player, RandomPlayer
+from pokerbot.globals import CHECK, CALL, RAISE, FOLD
+
+
+class FoldingPlayer(Player):
+    """ Player folding whenever it can """
+
+    def take_action(self, actions, hand_hist=None):
+        return 'fold' if 'fold' in actions else 'check'
+
+
+def _play_hands(env, nb_hands):
+    hands = []
+    for _ in range(nb_hands):
+        state, hand_over = env.initial_step()
+        hands.append(env.current_hand)
+        while not hand_over:
+            state, reward, game_over, hand_over, info = env.step(
+                random.choice(env.current_hand.possible_actions))
+    return hands
+
+
+def test_hand_is_reused():
+    random.seed(0)
+    env = HuGame(100, 20, RandomPlayer(1000, 'Hero'),
+                 RandomPlayer(1000, 'Villain'), True)
+    hands = _play_hands(env, 10)
+    assert all(hand is hands[0] for hand in hands)
+    assert env.current_hand.hand_nb == 10
+    assert env.player_hero.stack + env.player_villain.stack == 2000
+    # each hand history is kept apart from the reused event log
+    assert len(env.hero_game_history) == 10
+    for hand_number, history in enumerate(env.hero_game_history, 1):
+        assert "***** Hand #{} history\n".format(hand_number) in str(history)
+
+
+def test_opponent_folds_small_blind():
+    random.seed(0)
+    env = HuGame(100, 20, RandomPlayer(1000, 'Hero'),
+                 FoldingPlayer(1000, 'Villain'), True)
+    env.hero_is_big_blind = False
+    state, hand_over = env.initial_step()
+    assert hand_over
+    assert env.player_hero.stack == 1010
+    assert str(env.hero_game_history[-1]).endswith(
+        "Villain folds\nHero wins the pot: +30$\n")
+
+
+def test_normalized_state_buffer():
+    random.seed(0)
+    env = HuGame(100, 20, RandomPlayer(1000, 'Hero'),
+                 FoldingPlayer(1000, 'Villain'), True)
+    env.hero_is_big_blind = True
+    state, hand_over = env.initial_step()
+    # state is the buffer of the hand, updated in place
+    assert state is env.current_hand.state_SB
+    assert state.dtype == np.float32
+    assert ((state >= 0) & (state <= 1)).all()
+    assert state[3] == np.float32(
+        env.current_hand.handSB.private_cards[0].numerical_id / 52)
+    # villain checks behind, sequence 'CC'
+    state, reward, game_over, hand_over, info = env.step('call')
+    assert state[14] == np.float32(40 / 2000)
+    assert state[10] == np.float32(5 / 24)
+
+
+def test_legal_actions_mask():
+    random.seed(0)
+    env = HuGame(100, 20, RandomPlayer(1000, 'Hero'),
+                 FoldingPlayer(1000, 'Villain'), True)
+    env.hero_is_big_blind = True
+    state, hand_over = env.initial_step()
+    assert not hand_over
+    hand = env.current_hand
+    # small blind facing the big blind
+    assert hand.legal_actions == 1 << CALL | 1 << RAISE | 1 << FOLD
+    assert hand.possible_actions == ['call', 'raise', 'fold']
+    with pytest.raises(AssertionError):
+        env.step(CHECK)
+    # action codes and names are interchangeable
+    state, reward, game_over, hand_over, info = env.step(RAISE)
+    assert hand_over
+    assert reward == 20
@@ -0,0 +1,59 @@
+import numpy as np
+
+from pokerbot import VecHuGame
+from pokerbot.flow_control.vecgame import PASSIVE, FOLD_OR_CHECK
+
+
+def test_reset():
+    env = VecHuGame(64, 10, 20, 1000, seed=0)
+    observations, legal_actions = env.reset()
+    assert observations.shape == (64, 15)
+    assert legal_actions.shape == (64, 3)
+    assert observations.dtype == np.float32
+    assert (observations[:, 3:5] > 0).all()
+    assert (observations[:, 3:5] <= 1).all()
+    assert (observations[:, 5:10] == 0).all()
+    # fish villain limps from the small blind, hero has nothing to call
+    is_big_blind = env.hero_is_big_blind
+    assert np.allclose(observations[:, 14],
+                       np.where(is_big_blind, 40, 30) / 2000)
+    assert (legal_actions[is_big_blind] == [True, True, False]).all()
+    assert (legal_actions[~is_big_blind] == [True, True, True]).all()
+
+
+def test_fold_or_check():
+    env = VecHuGame(64, 10, 20, 1000, seed=0)
+    env.reset()
+    was_big_blind = env.hero_is_big_blind.copy()
+    _, rewards, dones, _ = env.step(np.full(64, FOLD_OR_CHECK))
+    # hero folds its small blind, or checks and sees the flop
+    assert (dones == ~was_big_blind).all()
+    assert (rewards[dones] == -10).all()
+    assert np.allclose(env.final_observations[dones, 0], 990 / 2000)
+    assert (env.final_observations[~dones, 5:8] > 0).all()
+
+
+def test_chips_are_conserved():
+    env = VecHuGame(32, 20, 20, 200, seed=1)
+    env.reset()
+    rng = np.random.default_rng(0)
+    nb_hands = 0
+    for _ in range(300):
+        _, rewards, dones, _ = env.step(rng.integers(0, 3, 32))
+        assert (env.stacks.sum(axis=1) + env.pots == 400).all()
+        assert (env.stacks >= 0).all()
+        assert (rewards[~dones] == 0).all()
+        nb_hands += dones.sum()
+    assert nb_hands > 300
+
+
+def test_showdown_with_passive_players():
+    env = VecHuGame(16, 10, 20, 1000, seed=2)
+    env.reset()
+    dones = np.zeros(16, dtype=bool)
+    while not dones.all():
+        _, rewards, step_dones, _ = env.step(np.full(16, PASSIVE))
+        dones |= step_dones
+        # checked down, the pot is only made of the blinds
+        assert set(np.abs(rewards[step_dones]).tolist()) <= {0, 20}
+    assert (env.final_observations[step_dones, 5:10] > 0).all()
@@ -0,0 +1,92 @@
+import numpy as np
+
+from pokerbot import Card, bucket_id
+from pokerbot.flow_control.card import CARDS
+from pokerbot.hand_evaluation.buckets import NB_BUCKETS, NB_EQUITY_BINS, \
+    cluster_histograms, load_bucket_tables, _equity_histograms, \
+    _turn_histograms, _EQUITY_CACHE
+from pokerbot.hand_evaluation.flop_equity import load_flop_equity_table
+from pokerbot.hand_evaluation.hand_potential import enumerate_outcomes
+from pokerbot.hand_evaluation.isomorphism import NB_CANONICAL_TURN_HANDS, \
+    hand_from_index, _get_turn_tables
+
+
+def test_equity_histograms():
+    equities = np.array([[0.0, 0.5], [1.0, 0.5], [0.2, 0.9]])
+    valid = np.array([[True, True], [True, False], [False, True]])
+    histograms, means = _equity_histograms(equities, valid)
+    assert histograms.shape == (2, NB_EQUITY_BINS)
+    assert histograms[0, 0] == histograms[0, -1] == 1
+    assert histograms[1, NB_EQUITY_BINS // 2] == 1
+    assert histograms[1, int(0.9 * NB_EQUITY_BINS)] == 1
+    assert np.allclose(means, [0.5, 0.7])
+
+
+def test_turn_histograms():
+    histograms, equities = _turn_histograms(100)
+    offset = _get_turn_tables()['offsets'][100]
+    # every river that can be dealt is counted
+    assert histograms.dtype == np.uint8
+    assert np.all(histograms.sum(axis=1) == 46)
+    for local_index in (0, len(equities) - 1):
+        hole, board = hand_from_index(int(offset + local_index), 4)
+        win, tie, _ = enumerate_outcomes([CARDS[card_id] for card_id in hole],
+                                         [CARDS[card_id] for card_id in board])
+        assert abs(equities[local_index] - (win + tie / 2)) < 1e-9
+
+
+def test_cluster_histograms():
+    # draws and made hands of the same mean equity are told apart
+    draws = np.zeros((50, 4))
+    draws[:, 0] = draws[:, 3] = 5
+    made_hands = np.zeros((60, 4))
+    made_hands[:, 1] = made_hands[:, 2] = 5
+    histograms = np.vstack([draws, made_hands])
+    labels = cluster_histograms(histograms, np.ones(len(histograms)), 2)
+    assert len(set(labels[:50])) == len(set(labels[50:])) == 1
+    assert labels[0] != labels[-1]
+
+
+def test_shipped_bucket_tables():
+    tables = load_bucket_tables()
+    assert all(isinstance(table, np.memmap) for table in tables.values())
+    assert tables['preflop'].shape == (169,)
+    assert tables['flop'].shape == (1286792,)
+    assert tables['turn'].shape == (NB_CANONICAL_TURN_HANDS,)
+    assert tables['turn'].dtype == np.uint8
+    assert tables['river'].shape == (NB_BUCKETS - 1,)
+    assert np.all(np.diff(tables['river']) >= 0)
+    for street in ('preflop', 'flop', 'turn'):
+        assert np.bincount(tables[street]).size == NB_BUCKETS
+    # buckets are numbered by increasing equity
+    flop_equities = load_flop_equity_table().astype(np.float64)
+    mean_equities = np.bincount(tables['flop'], weights=flop_equities) / \
+        np.bincount(tables['flop'])
+    assert np.all(np.diff(mean_equities) > 0)
+
+
+def test_bucket_id():
+    aces = [Card(14, "C"), Card(14, "D")]
+    rags = [Card(7, "S"), Card(2, "H")]
+    assert bucket_id(aces) == NB_BUCKETS - 1
+    assert bucket_id(rags) == 0
+    board = [Card(14, "H"), Card(14, "S"), Card(3, "D")]
+    assert bucket_id(aces, board) == NB_BUCKETS - 1
+    assert bucket_id(rags, board) < NB_BUCKETS // 2
+    assert bucket_id(aces, board + [Card(9, "C")]) == NB_BUCKETS - 1
+    assert bucket_id(rags, board + [Card(9, "C")]) < NB_BUCKETS // 2
+    assert bucket_id(rags, board + [Card(9, "C"), Card(10, "C")]) == 0
+
+
+def test_river_equities_are_cached():
+    _EQUITY_CACHE.clear()
+    board = [Card(14, "H"), Card(14, "S"), Card(3, "D"), Card(9, "C"),
+             Card(5, "H")]
+    bucket = bucket_id([Card(14, "C"), Card(13, "D")], board)
+    # same situation up to suits
+    isomorphic_board = [Card(14, "D"), Card(14, "S"), Card(3, "H"),
+                        Card(9, "C"), Card(5, "D")]
+    assert bucket_id([Card(14, "C"), Card(13, "H")],
+                     isomorphic_board) == bucket
+    assert _EQUITY_CACHE.hits == 1
+    assert len(_EQUITY_CACHE) == 1
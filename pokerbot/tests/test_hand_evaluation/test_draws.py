@@ -0,0 +1,97 @@
+import pytest
+
+from collections import Counter
+from itertools import combinations
+
+from pokerbot import Card, Deck, Hand, evaluate_cards, analyze_draws, get_draws
+from pokerbot.hand_evaluation.isomorphism import COMBO_INDEX
+
+
+flop = [Card(14, "C"), Card(9, "C"), Card(5, "H")]
+turn = flop + [Card(8, "S")]
+
+
+# boards on which the draws are made by the board alone
+flush_board = [Card(14, "C"), Card(9, "C"), Card(5, "C"), Card(2, "C")]
+straight_board = [Card(9, "H"), Card(8, "D"), Card(7, "S"), Card(6, "C")]
+
+
+@pytest.mark.parametrize("hole_cards", [[Card(13, "C"), Card(12, "C")],
+                                        [Card(7, "D"), Card(6, "D")],
+                                        [Card(5, "D"), Card(5, "S")],
+                                        [Card(11, "D"), Card(3, "H")]])
+@pytest.mark.parametrize("board", [flop, turn, flush_board[:3],
+                                   flush_board, straight_board])
+def test_draws_match_hand(hole_cards, board):
+    hand = Hand(hole_cards)
+    hand.add_public_cards(board)
+    draws = get_draws(hole_cards, board)
+    assert draws['live']
+    assert draws['ranking'] == evaluate_cards(hole_cards + board) >> 20
+    assert draws['flush_draw'] == hand.flush_draw
+    assert draws['backdoor_flush_draw'] == hand.backdoor_flush_draw
+    assert draws['straight_draw_ranks'] == hand.straight_draw_ranks
+
+
+def board_ranking(board):
+    if len(board) == 5:
+        return evaluate_cards(board) >> 20
+    counts = list(Counter(card.rank for card in board).values())
+    if 4 in counts:
+        return 8
+    if 3 in counts:
+        return 4
+    return counts.count(2) + 1
+
+
+@pytest.mark.parametrize("hole_cards", [[Card(13, "C"), Card(12, "C")],
+                                        [Card(10, "D"), Card(2, "S")],
+                                        [Card(9, "D"), Card(9, "H")]])
+def test_outs_brute_force(hole_cards):
+    lead = (evaluate_cards(hole_cards + turn) >> 20) - board_ranking(turn)
+    outs = sum((evaluate_cards(hole_cards + turn + [card]) >> 20) -
+               board_ranking(turn + [card]) > lead
+               for card in Deck().get_remaining_cards(hole_cards + turn))
+    draws = get_draws(hole_cards, turn)
+    assert draws['outs'] == outs
+    assert draws['improve_next'] == pytest.approx(outs / 46)
+    assert draws['improve_by_river'] == draws['improve_next']
+
+
+def test_draws_from_the_board_alone():
+    draws = get_draws([Card(7, "D"), Card(3, "H")], flush_board)
+    assert not draws['flush_draw']
+    draws = get_draws([Card(7, "D"), Card(3, "H")], flush_board[:3])
+    assert not draws['backdoor_flush_draw']
+    draws = get_draws([Card(7, "D"), Card(3, "H")], straight_board)
+    assert draws['straight_draw_ranks'] == 0
+    draws = get_draws([Card(10, "C"), Card(3, "H")],
+                      flush_board[:3] + [Card(2, "D")])
+    assert draws['flush_draw']
+
+
+def test_board_pairing_cards_are_not_outs():
+    # flush draw, and pairs of kings or queens, cards pairing the board
+    # improve every holding
+    draws = get_draws([Card(13, "C"), Card(12, "C")], turn)
+    assert draws['outs'] == 9 + 3 + 3
+
+
+def test_dead_combos_and_board_size():
+    draws = analyze_draws([card.id for card in flop])
+    assert not draws['live'][COMBO_INDEX[flop[0].id, Card(2, "S").id]]
+    assert draws['live'].sum() == 1176
+    with pytest.raises(ValueError):
+        analyze_draws([card.id for card in turn + [Card(2, "S")]])
+
+
+def test_improve_by_river_brute_force():
+    hole_cards = [Card(5, "C"), Card(5, "S")]
+    lead = (evaluate_cards(hole_cards + flop) >> 20) - board_ranking(flop)
+    runouts = list(combinations(
+        Deck().get_remaining_cards(hole_cards + flop), 2))
+    improvements = sum(
+        (evaluate_cards(hole_cards + flop + list(runout)) >> 20) -
+        board_ranking(flop + list(runout)) > lead for runout in runouts)
+    assert get_draws(hole_cards, flop)['improve_by_river'] == \
+        pytest.approx(improvements / len(runouts))
@@ -0,0 +1,36 @@
+from pokerbot import Card, EquityCache, estimate_win_rate
+
+hole_cards = [Card(14, "C"), Card(13, "C")]
+board = [Card(2, "C"), Card(7, "C"), Card(12, "H"), Card(5, "D")]
+# same situation with hearts and clubs swapped, turn and flop shuffled
+isomorphic_hole_cards = [Card(13, "H"), Card(14, "H")]
+isomorphic_board = [Card(5, "D"), Card(12, "C"), Card(7, "H"), Card(2, "H")]
+
+
+def test_isomorphic_situations_hit():
+    cache = EquityCache(max_size=10)
+    win_rate = estimate_win_rate(1000, hole_cards, board, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert estimate_win_rate(1000, isomorphic_hole_cards, isomorphic_board,
+                             cache=cache) == win_rate
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate() == 0.5
+
+
+def test_sampled_estimates_need_enough_samples():
+    cache = EquityCache(max_size=10)
+    cache.put(hole_cards, board[:3], 0.7, nb_samples=100)
+    assert cache.get(hole_cards, board[:3], nb_simulations=100) == 0.7
+    assert cache.get(hole_cards, board[:3], nb_simulations=1000) is None
+    assert cache.get(hole_cards, board[:3]) is None
+
+
+def test_least_recently_used_is_evicted():
+    cache = EquityCache(max_size=2)
+    cache.put(hole_cards, board[:3], 0.1)
+    cache.put(hole_cards, board, 0.2)
+    cache.get(hole_cards, board[:3])
+    cache.put(isomorphic_hole_cards, [Card(3, "S")] + board[:3], 0.3)
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.get(hole_cards, board) is None
+    assert cache.get(hole_cards, board[:3]) == 0.1
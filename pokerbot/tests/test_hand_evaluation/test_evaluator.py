@@ -0,0 +1,75 @@
+import random
+import numpy as np
+import pytest
+
+from itertools import combinations
+
+from pokerbot import Card, Deck, evaluate_hand_ranking, evaluate_cards, \
+    evaluate_card_ids, strength_to_ranking, evaluate_batch, compare_batch
+from pokerbot.hand_evaluation.evaluator import pack_strength, TABLE_NAMES, \
+    _build_tables, _get_array_tables
+from pokerbot.globals import EVALUATOR_TABLE_FILE
+
+
+hands = [
+    (Card(5, "C"), Card(4, "C"), Card(3, "C"), Card(2, "C"), Card(14, "C")),
+    (Card(3, "C"), Card(3, "S"), Card(3, "H"), Card(3, "D"), Card(5, "S")),
+    (Card(5, "C"), Card(5, "H"), Card(4, "H"), Card(4, "C"), Card(5, "S")),
+    (Card(14, "C"), Card(6, "C"), Card(3, "C"), Card(4, "C"), Card(5, "C")),
+    (Card(6, "C"), Card(2, "C"), Card(3, "C"), Card(4, "C"), Card(5, "S")),
+    (Card(2, "C"), Card(2, "H"), Card(2, "S"), Card(6, "C"), Card(5, "S")),
+    (Card(14, "C"), Card(2, "C"), Card(14, "H"), Card(5, "C"), Card(5, "S")),
+    (Card(14, "C"), Card(2, "C"), Card(3, "C"), Card(4, "C"), Card(4, "S")),
+    (Card(14, "C"), Card(11, "C"), Card(3, "C"), Card(4, "C"), Card(5, "S"))
+]
+
+
+def brute_force_strength(cards):
+    """ Best strength among all five-card combinations, the slow way """
+    return max(pack_strength(*evaluate_hand_ranking(hand))
+               for hand in combinations(cards, 5))
+
+
+@pytest.mark.parametrize("test_hand", hands)
+def test_evaluate_five_cards(test_hand):
+    assert strength_to_ranking(evaluate_cards(test_hand)) == \
+        evaluate_hand_ranking(test_hand)
+
+
+@pytest.mark.parametrize("nb_cards", [5, 6, 7])
+def test_evaluate_matches_brute_force(nb_cards):
+    random.seed(nb_cards)
+    for _ in range(300):
+        cards = Deck().deal_cards(nb_cards)
+        assert evaluate_cards(cards) == brute_force_strength(cards)
+
+
+def test_evaluate_rejects_wrong_number_of_cards():
+    with pytest.raises(AssertionError):
+        evaluate_cards(hands[0][:4])
+
+
+@pytest.mark.parametrize("nb_cards", [5, 6, 7])
+def test_evaluate_batch_matches_scalar(nb_cards):
+    rng = np.random.RandomState(nb_cards)
+    cards = np.array([rng.permutation(52)[:nb_cards] for _ in range(2000)])
+    assert evaluate_batch(cards).tolist() == \
+        [evaluate_card_ids(row) for row in cards.tolist()]
+
+
+def test_compare_batch():
+    hole_cards1 = np.array([[Card(5, "C").id, Card(4, "C").id],
+                            [Card(5, "C").id, Card(4, "C").id]])
+    hole_cards2 = np.array([[Card(5, "S").id, Card(4, "S").id],
+                            [Card(14, "S").id, Card(14, "D").id]])
+    boards = np.array([[Card(2, "H").id, Card(3, "C").id, Card(14, "C").id],
+                       [Card(2, "C").id, Card(3, "C").id, Card(14, "C").id]])
+    assert compare_batch(hole_cards1, hole_cards2, boards).tolist() == [0, 1]
+
+
+def test_shipped_tables_are_memory_mapped_and_up_to_date():
+    tables = dict(zip(TABLE_NAMES[:4], _get_array_tables()))
+    assert all(isinstance(table, np.memmap) for table in tables.values())
+    for name, table in _build_tables().items():
+        assert np.array_equal(np.load(EVALUATOR_TABLE_FILE.format(name)),
+                              table)
@@ -0,0 +1,30 @@
+import pytest
+
+from pokerbot import Card, enumerate_outcomes, flop_win_rate, \
+    load_flop_equity_table
+
+
+flop = [Card(14, "C"), Card(9, "C"), Card(5, "H")]
+
+
+def test_flop_equity_table():
+    table = load_flop_equity_table()
+    assert table.shape == (1286792,)
+    assert table.dtype == 'float16'
+    assert 0 <= table.min() and table.max() <= 1
+
+
+@pytest.mark.parametrize("hole_cards", [[Card(13, "C"), Card(12, "C")],
+                                        [Card(5, "C"), Card(5, "S")],
+                                        [Card(7, "D"), Card(2, "S")]])
+def test_flop_win_rate_exact(hole_cards):
+    win, tie, _ = enumerate_outcomes(hole_cards, flop)
+    assert flop_win_rate(hole_cards, flop) == \
+        pytest.approx(win + tie / 2, abs=1e-3)
+
+
+def test_flop_win_rate_isomorphic():
+    # same situation with spades and clubs swapped, cards reordered
+    assert flop_win_rate([Card(13, "C"), Card(12, "C")], flop) == \
+        flop_win_rate([Card(12, "S"), Card(13, "S")],
+                      [Card(5, "H"), Card(14, "S"), Card(9, "S")])
@@ -1,7 +1,8 @@
+import random
 import pytest
 
-from pokerbot import Card, Hand, evaluate_hand_ranking, \
-    compare_two_hands, tie_breaking
+from pokerbot import Card, Deck, Hand, evaluate_hand_ranking, \
+    compare_two_hands, tie_breaking, evaluate_cards, showdown
 
 
 hands = [
@@ -116,3 +117,73 @@ def test_tie_breaking(test_hands, test_tiebreakers,
     assert tie_breaking(test_hands, test_tiebreakers) == (best_hand,
                                                           best_tiebreaker)
 
+
+def test_incremental_strength_matches_evaluator():
+    random.seed(9)
+    for _ in range(200):
+        cards = Deck().deal_cards(7)
+        hand = Hand(cards[:2])
+        for public_cards in (cards[2:5], cards[5:6], cards[6:7]):
+            hand.add_public_cards(public_cards)
+            assert hand.best_strength == \
+                evaluate_cards(hand.private_cards + hand.public_cards)
+
+
+def test_incremental_strength_pre_flop():
+    assert Hand([Card(14, "C"), Card(14, "H")]).best_rank == 2
+    assert Hand([Card(14, "C"), Card(13, "H")]).best_rank == 1
+    assert Hand([Card(14, "C"), Card(14, "H")]).best_strength > \
+        Hand([Card(14, "C"), Card(13, "H")]).best_strength
+
+
+def test_draws():
+    hand = Hand([Card(9, "H"), Card(8, "H")])
+    hand.add_public_cards([Card(7, "H"), Card(6, "C"), Card(2, "S")])
+    assert hand.backdoor_flush_draw and not hand.flush_draw
+    assert hand.straight_draw_ranks == 2
+    hand.add_public_cards([Card(13, "H")])
+    assert hand.flush_draw and not hand.backdoor_flush_draw
+    hand.add_public_cards([Card(10, "H")])
+    assert hand.best_rank == 6
+    assert not hand.flush_draw and hand.straight_draw_ranks == 0
+
+
+def test_draws_from_the_board_alone():
+    hand = Hand([Card(7, "D"), Card(3, "H")])
+    hand.add_public_cards([Card(14, "C"), Card(9, "C"), Card(5, "C")])
+    assert not hand.backdoor_flush_draw
+    hand.add_public_cards([Card(2, "C")])
+    assert not hand.flush_draw
+    hand = Hand([Card(7, "D"), Card(3, "H")])
+    hand.add_public_cards([Card(9, "H"), Card(8, "D"), Card(7, "S"),
+                           Card(6, "C")])
+    assert hand.straight_draw_ranks == 0
+    # the ten completes the board alone, the jack only makes it higher
+    hand = Hand([Card(11, "D"), Card(3, "H")])
+    hand.add_public_cards([Card(9, "H"), Card(8, "D"), Card(7, "S"),
+                           Card(6, "C")])
+    assert hand.straight_draw_ranks == 0
+    hand = Hand([Card(11, "D"), Card(10, "H")])
+    hand.add_public_cards([Card(9, "H"), Card(8, "D"), Card(2, "S")])
+    assert hand.straight_draw_ranks == 2
+
+
+@pytest.mark.parametrize("test_hand1, test_hand2, public_cards, expected_res",
+                         test_compare_data)
+def test_showdown(test_hand1, test_hand2, public_cards, expected_res):
+    # hands of the shared test data already received public cards
+    test_hand1 = Hand(test_hand1.private_cards)
+    test_hand2 = Hand(test_hand2.private_cards)
+    test_hand1.add_public_cards(public_cards)
+    test_hand2.add_public_cards(public_cards)
+    assert showdown(test_hand1, test_hand2) == \
+        {"hand1": 1, "draw": 0, "hand2": -1}[expected_res]
+
+
+def test_best_combination_is_lazy():
+    hand = Hand([Card(14, "C"), Card(14, "H")])
+    hand.add_public_cards([Card(14, "S"), Card(3, "D"), Card(3, "C"),
+                           Card(9, "S"), Card(2, "H")])
+    assert hand._best_combination is None
+    assert sorted(card.rank for card in hand.best_combination[0]) == \
+        [3, 3, 14, 14, 14]
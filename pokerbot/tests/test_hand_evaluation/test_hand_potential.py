@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from itertools import combinations
+
+from pokerbot import Card, Deck, evaluate_cards, estimate_win_rate, \
+    enumerate_outcomes, hand_potential, effective_hand_strength, \
+    estimate_win_rate_adaptive
+
+hole_cards = [Card(14, "C"), Card(13, "C")]
+flop = [Card(2, "C"), Card(7, "C"), Card(12, "H")]
+river_board = flop + [Card(7, "D"), Card(13, "S")]
+
+
+def test_enumerate_outcomes_on_river():
+    hero_strength = evaluate_cards(hole_cards + river_board)
+    outcomes = [evaluate_cards(list(holding) + river_board)
+                for holding in combinations(
+                    Deck().get_remaining_cards(hole_cards + river_board), 2)]
+    assert len(outcomes) == 990
+    wins = sum(hero_strength > strength for strength in outcomes)
+    ties = sum(hero_strength == strength for strength in outcomes)
+    assert enumerate_outcomes(hole_cards, river_board) == \
+        (wins / 990, ties / 990, (990 - wins - ties) / 990)
+
+
+def test_estimate_win_rate_is_exact_on_turn():
+    assert estimate_win_rate(10, hole_cards, flop + [Card(3, "D")]) == \
+        sum(enumerate_outcomes(hole_cards, flop + [Card(3, "D")])[:2])
+
+
+def test_enumerate_outcomes_pre_flop():
+    with pytest.raises(ValueError):
+        enumerate_outcomes(hole_cards, [])
+
+
+def test_estimate_win_rate_sampling_close_to_exact():
+    np.random.seed(0)
+    exact_win_rate = sum(enumerate_outcomes(hole_cards, flop)[:2])
+    assert estimate_win_rate(20000, hole_cards, flop, exact=False) == \
+        pytest.approx(exact_win_rate, abs=0.015)
+
+
+def brute_force_hand_potential(hole_cards, community_cards):
+    """ HS, PPot and NPot on the turn, the slow way """
+    remaining_cards = Deck().get_remaining_cards(hole_cards + community_cards)
+    transitions = np.zeros((3, 3))
+    for holding in combinations(remaining_cards, 2):
+        holding = list(holding)
+        current = np.sign(evaluate_cards(hole_cards + community_cards) -
+                          evaluate_cards(holding + community_cards))
+        for river in remaining_cards:
+            if river in holding:
+                continue
+            board = community_cards + [river]
+            final = np.sign(evaluate_cards(hole_cards + board) -
+                            evaluate_cards(holding + board))
+            transitions[1 - current, 1 - final] += 1
+    ahead, tied, behind = transitions.sum(axis=1)
+    return ((ahead + tied / 2) / (ahead + tied + behind),
+            (transitions[2, 0] + transitions[2, 1] / 2 +
+             transitions[1, 0] / 2) / (behind + tied / 2),
+            (transitions[0, 2] + transitions[0, 1] / 2 +
+             transitions[1, 2] / 2) / (ahead + tied / 2))
+
+
+def test_hand_potential_on_turn():
+    turn_board = flop + [Card(3, "D")]
+    assert hand_potential(hole_cards, turn_board) == \
+        pytest.approx(brute_force_hand_potential(hole_cards, turn_board))
+
+
+def test_hand_potential_on_river():
+    win, tie, _ = enumerate_outcomes(hole_cards, river_board)
+    assert hand_potential(hole_cards, river_board) == \
+        pytest.approx((win + tie / 2, 0, 0))
+    assert effective_hand_strength(hole_cards, river_board) == \
+        pytest.approx(win + tie / 2)
+
+
+def test_parallel_sampling_does_not_depend_on_workers():
+    serial = estimate_win_rate(25000, hole_cards, flop, exact=False, seed=7)
+    parallel = estimate_win_rate(25000, hole_cards, flop, exact=False,
+                                 seed=7, nb_workers=2)
+    assert serial == parallel
+    assert serial != estimate_win_rate(25000, hole_cards, flop, exact=False,
+                                       seed=8)
+    exact_win_rate = sum(enumerate_outcomes(hole_cards, flop)[:2])
+    assert serial == pytest.approx(exact_win_rate, abs=0.015)
+
+
+def test_adaptive_sampling_stops_early_away_from_thresholds():
+    np.random.seed(0)
+    nuts = [Card(14, "C"), Card(14, "D")]
+    board = [Card(14, "H"), Card(14, "S"), Card(3, "D")]
+    win_rate, standard_error, nb_samples = estimate_win_rate_adaptive(
+        1000, nuts, board, thresholds=(0.5, 0.8))
+    assert win_rate > 0.8 and nb_samples < 1000
+    assert 0 < standard_error < 0.05
+
+
+def test_adaptive_sampling_precision():
+    np.random.seed(0)
+    exact_win_rate = sum(enumerate_outcomes(hole_cards, flop)[:2])
+    win_rate, standard_error, nb_samples = estimate_win_rate_adaptive(
+        100000, hole_cards, flop, precision=0.02)
+    assert nb_samples < 100000
+    assert win_rate == pytest.approx(exact_win_rate, abs=0.02)
+    # nothing to sample on the turn, the win rate is exact
+    assert estimate_win_rate_adaptive(1000, hole_cards,
+                                      flop + [Card(3, "D")])[1:] == (0.0, 0)
+
+
+def test_tie_weight():
+    board = [Card(rank, "S") for rank in (10, 11, 12, 13, 14)]
+    hole_cards = [Card(2, "C"), Card(3, "D")]
+    assert estimate_win_rate(10, hole_cards, board) == 1
+    assert estimate_win_rate(10, hole_cards, board, tie_weight=0.5) == 0.5
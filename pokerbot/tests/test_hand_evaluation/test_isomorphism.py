@@ -0,0 +1,112 @@
+import random
+import pytest
+import numpy as np
+
+from itertools import combinations
+
+from pokerbot import Card, Hand, canonical_form, hand_index, \
+    hand_from_index, flop_index, flop_from_index, preflop_class
+from pokerbot.globals import ISOMORPHISM_TABLE_FILE
+from pokerbot.hand_evaluation.isomorphism import SUIT_PERMUTATIONS, \
+    PREFLOP_CLASSES, PERMUTED_CARDS, COMBO_INDEX, preflop_index, \
+    preflop_from_index, board_rank, \
+    NB_CANONICAL_TURN_HANDS, _build_board_tables, _get_board_tables
+
+
+def rename_suits(card_ids, permutation):
+    return [(card_id & ~3) | permutation[card_id & 3] for card_id in card_ids]
+
+
+def test_number_of_classes():
+    hole_combos = list(combinations(range(52), 2))
+    assert len({canonical_form(hole) for hole in hole_combos}) == 169
+    assert len({preflop_index(hole) for hole in hole_combos}) == 169
+    flops = list(combinations(range(52), 3))
+    assert len({canonical_form((), flop) for flop in flops}) == 1755
+    assert len({flop_index(flop) for flop in flops}) == 1755
+
+
+def test_preflop_index_grid():
+    assert preflop_index([Card(14, "C").id, Card(14, "D").id]) == 0
+    assert preflop_index([Card(14, "C").id, Card(13, "C").id]) == 1
+    assert preflop_index([Card(14, "C").id, Card(13, "D").id]) == 13
+    assert preflop_index([Card(2, "C").id, Card(2, "S").id]) == 168
+    for index in range(169):
+        assert preflop_index(preflop_from_index(index)) == index
+
+
+def test_preflop_class_table():
+    for hole in combinations(range(52), 2):
+        assert preflop_class(hole) == preflop_class(hole[::-1]) == \
+            preflop_index(hole)
+    assert (PREFLOP_CLASSES.diagonal() == -1).all()
+    hand = Hand([Card(13, "D"), Card(14, "D")])
+    assert hand.preflop_class == 1
+    assert hand.get_simp_preflop_rep() == "AKs"
+
+
+@pytest.mark.parametrize("nb_board_cards", [0, 3, 4])
+def test_hand_index_is_suit_invariant(nb_board_cards):
+    random.seed(nb_board_cards)
+    for _ in range(500):
+        cards = random.sample(range(52), 2 + nb_board_cards)
+        hole, board = cards[:2], cards[2:]
+        index = hand_index(hole, board)
+        permutation = random.choice(SUIT_PERMUTATIONS)
+        assert hand_index(rename_suits(hole, permutation),
+                          rename_suits(board, permutation)) == index
+        canonical_hole, canonical_board = hand_from_index(index,
+                                                          nb_board_cards)
+        assert hand_index(canonical_hole, canonical_board) == index
+        assert canonical_form(canonical_hole, canonical_board,
+                              ordered_board=False) == \
+            canonical_form(hole, board, ordered_board=False)
+    assert flop_index(flop_from_index(1754)) == 1754
+
+
+def test_hand_index_on_river():
+    with pytest.raises(ValueError):
+        hand_index([0, 1], [2, 3, 4, 5, 6])
+
+
+@pytest.mark.parametrize("hole, board", [([0, 1], [0, 5, 9]),
+                                         ([0, 0], [4, 5, 9]),
+                                         ([0, 1], [4, 4, 9]),
+                                         ([0, 1], [1, 5, 9, 13]),
+                                         ([0, 0], [4, 5, 9, 13])])
+def test_hand_index_rejects_dead_cards(hole, board):
+    with pytest.raises(ValueError):
+        hand_index(hole, board)
+
+
+def test_board_rank():
+    ranks = [board_rank(flop) for flop in combinations(range(52), 3)]
+    assert sorted(ranks) == list(range(22100))
+
+
+@pytest.mark.parametrize("nb_board_cards, street", [(3, 'flop'),
+                                                    (4, 'turn')])
+def test_shipped_tables_are_memory_mapped_and_up_to_date(nb_board_cards,
+                                                         street):
+    tables = _get_board_tables(nb_board_cards)
+    assert all(isinstance(table, np.memmap) for table in tables.values())
+    built_tables = _build_board_tables(nb_board_cards)
+    for name, table in tables.items():
+        assert np.array_equal(table, built_tables[name])
+    assert np.load(ISOMORPHISM_TABLE_FILE.format(street + '_index'),
+                   mmap_mode='r').shape[0] == len(list(
+                       combinations(range(52), nb_board_cards)))
+    if nb_board_cards == 4:
+        # turn lookups agree with the dense local index of the builder
+        assert tables['offsets'][-1] == NB_CANONICAL_TURN_HANDS
+        random.seed(4)
+        for _ in range(200):
+            cards = random.sample(range(52), 6)
+            board_idx, permutation_idx = tables['index'][board_rank(
+                cards[2:])]
+            permuted = PERMUTED_CARDS[permutation_idx]
+            local_index = built_tables['local_index'][
+                board_idx, COMBO_INDEX[permuted[cards[0]],
+                                       permuted[cards[1]]]]
+            assert hand_index(cards[:2], cards[2:]) == \
+                tables['offsets'][board_idx] + local_index
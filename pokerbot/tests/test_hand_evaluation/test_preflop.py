@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from pokerbot import Card, load_preflop_equity_matrix, preflop_equity, \
+    preflop_win_rate, preflop_class_win_rate
+from pokerbot.hand_evaluation.preflop import preflop_class_name, \
+    build_preflop_equity_matrix, CLASS_SIZES, COMPATIBLE_MATCHUPS
+
+AA, AKs, AKo, SEVEN_TWO_OFFSUIT = 0, 1, 13, 13 * 12 + 7
+
+
+def test_preflop_class_name():
+    assert [preflop_class_name(index) for index in
+            [AA, AKs, AKo, SEVEN_TWO_OFFSUIT, 168]] == \
+        ['AA', 'AKs', 'AKo', '72o', '22']
+
+
+def test_shipped_equity_matrix():
+    matrix = load_preflop_equity_matrix()
+    assert matrix.shape == (169, 169)
+    assert np.allclose(matrix + matrix.T, 1, atol=2e-3)
+    assert preflop_equity(AA, SEVEN_TWO_OFFSUIT) == pytest.approx(0.88,
+                                                                  abs=0.01)
+    assert preflop_equity(AKs, AKo) == pytest.approx(0.52, abs=0.01)
+
+
+def test_preflop_win_rate():
+    # card removal: aces meet fewer aces than a random hand does
+    assert preflop_win_rate([Card(14, "C"), Card(14, "H")]) == \
+        pytest.approx(0.852, abs=0.003)
+    assert preflop_win_rate([Card(7, "C"), Card(2, "H")]) == \
+        pytest.approx(0.35, abs=0.01)
+    assert preflop_class_win_rate(AA) == \
+        preflop_win_rate([Card(14, "S"), Card(14, "D")])
+
+
+def test_build_preflop_equity_matrix():
+    matrix = build_preflop_equity_matrix(
+        nb_boards=20, random_state=np.random.RandomState(1))
+    assert np.allclose(matrix + matrix.T, 1)
+    assert matrix[AA, SEVEN_TWO_OFFSUIT] > 0.7
+
+
+def test_compatible_matchups():
+    assert COMPATIBLE_MATCHUPS[AA, AA] == 6
+    assert COMPATIBLE_MATCHUPS[AA, AKs] == 6 * 4 - 6 * 2
+    assert (COMPATIBLE_MATCHUPS.sum(axis=1) == CLASS_SIZES * 1225).all()
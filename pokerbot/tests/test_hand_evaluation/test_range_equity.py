@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from pokerbot import Card, enumerate_outcomes, range_vs_range_equity
+from pokerbot.hand_evaluation.isomorphism import COMBO_INDEX
+
+
+board = [Card(2, "H"), Card(7, "C"), Card(13, "D"), Card(9, "S"),
+         Card(3, "S")]
+full_range = np.ones(1326)
+
+
+@pytest.mark.parametrize("nb_board_cards", [4, 5])
+def test_range_equity_matches_enumeration(nb_board_cards):
+    hole_cards = [Card(14, "S"), Card(13, "H")]
+    win, tie, _ = enumerate_outcomes(hole_cards, board[:nb_board_cards])
+    equities, equity = range_vs_range_equity(full_range, full_range,
+                                             board[:nb_board_cards])
+    combo = COMBO_INDEX[hole_cards[0].id, hole_cards[1].id]
+    assert equities[combo] == pytest.approx(win + tie / 2)
+    assert equity == pytest.approx(0.5)
+    # combos using a board card are impossible
+    assert np.isnan(equities[COMBO_INDEX[board[0].id, board[1].id]])
+
+
+def test_range_equity_card_removal():
+    hero_range = np.zeros(1326)
+    villain_range = np.zeros(1326)
+    hero_range[COMBO_INDEX[Card(14, "S").id, Card(14, "H").id]] = 1
+    villain_range[COMBO_INDEX[Card(14, "S").id, Card(13, "S").id]] = 1
+    villain_range[COMBO_INDEX[Card(12, "C").id, Card(12, "D").id]] = 1
+    # only QQ is compatible with AsAh, and loses to it on this board
+    _, equity = range_vs_range_equity(hero_range, villain_range, board)
+    assert equity == 1
+
+
+def test_range_equity_pre_flop_requires_sampling():
+    with pytest.raises(ValueError):
+        range_vs_range_equity(full_range, full_range)
+    _, equity = range_vs_range_equity(full_range, full_range, nb_runouts=5,
+                                      random_state=np.random.RandomState(0))
+    assert equity == pytest.approx(0.5)
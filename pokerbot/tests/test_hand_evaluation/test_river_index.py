@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from itertools import combinations
+
+from pokerbot import Card, Deck, evaluate_cards, RiverIndex
+from pokerbot.hand_evaluation.isomorphism import COMBO_INDEX
+
+
+board = [Card(2, "H"), Card(7, "C"), Card(13, "D"), Card(9, "S"),
+         Card(9, "C")]
+board_ids = [card.id for card in board]
+
+
+def brute_force_outcomes(hole_cards, villain_range):
+    """ Weighted win, tie and loss probabilities, the slow way """
+    hero_strength = evaluate_cards(hole_cards + board)
+    outcomes = np.zeros(3)
+    for holding in combinations(
+            Deck().get_remaining_cards(hole_cards + board), 2):
+        weight = villain_range[COMBO_INDEX[holding[0].id, holding[1].id]]
+        difference = hero_strength - evaluate_cards(list(holding) + board)
+        outcomes[1 - int(np.sign(difference))] += weight
+    return tuple(outcomes / outcomes.sum())
+
+
+@pytest.mark.parametrize("hole_cards", [[Card(13, "S"), Card(9, "D")],
+                                        [Card(14, "S"), Card(3, "H")],
+                                        [Card(7, "S"), Card(7, "D")]])
+def test_river_index_outcomes(hole_cards):
+    villain_range = np.random.RandomState(0).random_sample(1326)
+    hole_ids = [card.id for card in hole_cards]
+    assert RiverIndex(board_ids).outcomes(hole_ids) == \
+        pytest.approx(brute_force_outcomes(hole_cards, np.ones(1326)))
+    assert RiverIndex(board_ids, villain_range).outcomes(hole_ids) == \
+        pytest.approx(brute_force_outcomes(hole_cards, villain_range))
+
+
+def test_river_index_range_outcomes():
+    index = RiverIndex(board_ids)
+    wins, ties, available = index.range_outcomes()
+    hole_ids = [Card(14, "S").id, Card(3, "H").id]
+    combo = COMBO_INDEX[hole_ids[0], hole_ids[1]]
+    assert available[combo] == 990
+    assert (wins[combo] / 990, ties[combo] / 990) == \
+        pytest.approx(index.outcomes(hole_ids)[:2])
+    assert available[COMBO_INDEX[board_ids[0], board_ids[1]]] == 0
@@ -0,0 +1,38 @@
+import numpy as np
+
+from pokerbot import CARDS, Card, StrengthHandPlayer, preflop_class
+
+
+def _hand_hist(hole_ids, board_ids):
+    return {'preflop': {'hole_cards': [CARDS[card_id]
+                                       for card_id in hole_ids],
+                        'class_id': preflop_class(hole_ids)},
+            'community_cards': [CARDS[card_id] for card_id in board_ids]}
+
+
+def test_flop_sampling_stops_early():
+    np.random.seed(0)
+    player = StrengthHandPlayer(1000, 'Villain', use_flop_table=False)
+    # aces full on the flop, far above both thresholds
+    choice = player.take_action(['check', 'bet'],
+                                _hand_hist([48, 49], [50, 0, 1]))
+    assert choice == 'bet'
+    assert 0 < player.nb_simulations < 1000
+
+
+def test_flop_table_is_not_sampled():
+    player = StrengthHandPlayer(1000, 'Villain', use_flop_table=True)
+    player.take_action(['check', 'bet'], _hand_hist([48, 49], [50, 0, 1]))
+    assert player.nb_simulations == 0
+
+
+def test_ties_count_for_half():
+    player = StrengthHandPlayer(1000, 'Villain')
+    # royal flush on the board, every showdown is split
+    board = [Card(rank, "S") for rank in (10, 11, 12, 13, 14)]
+    hole_cards = [Card(2, "C"), Card(3, "D")]
+    choice = player.take_action(
+        ['call', 'raise', 'fold'],
+        _hand_hist([card.id for card in hole_cards],
+                   [card.id for card in board]))
+    assert choice == 'call'